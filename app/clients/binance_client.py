@@ -2,27 +2,71 @@
 
 import logging
 from binance.client import Client
-from app.config import EX_API_KEY, EX_API_SECRET
+from app.clients.hedged import HedgedClient
+from app.clients.paper import PaperClient
+from app.config import (
+    EX_API_KEY, EX_API_SECRET, RECORDER_DIR, REST_TIMEOUT, HEDGE_FUTURES_URL,
+    DRY_RUN, PAPER_MARKET_DATA,
+)
+from app.services.recorder import RecordingClient
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 # 싱글톤으로 Client 인스턴스 관리
 _binance_client: Client | None = None
+_hedged: HedgedClient | None = None
 
 def get_binance_client() -> Client:
     """
     실거래용 Binance Client를 반환합니다.
     EX_API_KEY/EX_API_SECRET 환경변수가 설정되어 있지 않으면 에러를 발생시킵니다.
+    조회 호출은 HedgedClient 를 거쳐 마감 시간(및 설정 시 헤지)이 적용되고,
+    RECORDER_DIR 이 설정되어 있으면 REST 응답을 기록하는 래퍼를 씌웁니다.
+    DRY_RUN=true 면 같은 인터페이스의 모의 거래소(PaperClient)를 반환합니다.
     """
-    global _binance_client
+    global _binance_client, _hedged
+
+    if _binance_client is None and DRY_RUN:
+        _binance_client = _paper_client()
+        if RECORDER_DIR:
+            _binance_client = RecordingClient(_binance_client)
 
     if _binance_client is None:
         if not EX_API_KEY or not EX_API_SECRET:
             logger.error("Binance API 키/시크릿이 .env에 설정되지 않았습니다.")
             raise RuntimeError("Missing Binance API credentials.")
         # 실제 거래용 Client 생성
-        _binance_client = Client(EX_API_KEY, EX_API_SECRET)
+        params = {"timeout": REST_TIMEOUT}
+        primary = Client(EX_API_KEY, EX_API_SECRET, requests_params=params)
         logger.info("Initialized live Binance Client.")
 
-    return _binance_client
\ No newline at end of file
+        alternate = None
+        if HEDGE_FUTURES_URL:
+            alternate = Client(EX_API_KEY, EX_API_SECRET, requests_params=params)
+            alternate.FUTURES_URL = HEDGE_FUTURES_URL
+            logger.info(f"Hedged reads enabled via {HEDGE_FUTURES_URL}")
+
+        _hedged = HedgedClient(primary, alternate)
+        _binance_client = _hedged
+        if RECORDER_DIR:
+            _binance_client = RecordingClient(_binance_client)
+
+    return _binance_client
+
+
+def _paper_client() -> PaperClient:
+    """모의 거래소. live 면 공개 시세(키 없이도 동작)를 마감 시간이 걸린 Client 로 받음"""
+    global _hedged
+
+    market = None
+    if PAPER_MARKET_DATA == "live":
+        market = Client(EX_API_KEY, EX_API_SECRET, requests_params={"timeout": REST_TIMEOUT})
+        _hedged = market = HedgedClient(market)
+    logger.info(f"DRY_RUN: using paper trading client (market data: {PAPER_MARKET_DATA})")
+    return PaperClient(market)
+
+
+def latency_summary() -> dict:
+    """엔드포인트별 조회 지연 통계 (클라이언트 생성 전이면 빈 dict)"""
+    return _hedged.latency_summary() if _hedged else {}
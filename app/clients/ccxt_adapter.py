@@ -0,0 +1,194 @@
+# app/clients/ccxt_adapter.py
+
+import logging
+import math
+import ccxt
+from app.clients.exchange import ExchangeAdapter
+from app.services.filters import floor_qty
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# ccxt 주문 상태 → Binance 표기
+_STATUS = {"open": "NEW", "closed": "FILLED", "canceled": "CANCELED", "expired": "EXPIRED", "rejected": "REJECTED"}
+
+
+class CcxtAdapter(ExchangeAdapter):
+    """
+    ccxt 통합 API 기반 어댑터 (USDT 무기한 선물).
+    심볼은 봇과 같은 base+quote 형식(ETHUSDT)으로 받아 ccxt 통합 심볼(ETH/USDT:USDT)로 바꿉니다.
+    (거래소 고유 id 는 OKX 의 ETH-USDT-SWAP 처럼 제각각이라 쓰지 않음)
+
+    수량은 봇 쪽에서는 항상 기초자산 단위(ETH)이고, 거래소에는 계약 수로 보냅니다.
+    변환은 _to_contracts / _to_base 두 곳에서만 합니다 (contractSize ≠ 1 인 거래소 대응).
+    """
+
+    def __init__(self, exchange_id: str, api_key: str | None = None, api_secret: str | None = None,
+                 timeout_ms: int = 10000):
+        super().__init__()
+        self.name = exchange_id
+        self.exchange = getattr(ccxt, exchange_id)({
+            "apiKey":          api_key,
+            "secret":          api_secret,
+            "timeout":         timeout_ms,
+            "enableRateLimit": True,
+            "options":         {"defaultType": "swap"},
+        })
+        self._markets: dict[str, dict] = {}
+
+    # ── 종목 ─────────────────────────────────────────────
+    def _market(self, symbol: str) -> dict:
+        if not self._markets:
+            markets = self._call(self.exchange.load_markets)
+            self._markets = {
+                f"{m['base']}{m['quote']}": m for m in markets.values()
+                if m.get("swap") and m.get("linear") and m.get("settle") == m.get("quote")
+                and m.get("active", True)
+            }
+        return self._markets[symbol]
+
+    def _unified(self, symbol: str) -> str:
+        return self._market(symbol)["symbol"]
+
+    def _contract_size(self, symbol: str) -> float:
+        return float(self._market(symbol).get("contractSize") or 1)
+
+    def _to_contracts(self, symbol: str, qty: float) -> float:
+        """기초자산 수량 → 거래소 주문 수량(계약 수), 계약 단위로 내림"""
+        m = self._market(symbol)
+        step = self._contract_step(m)
+        contracts = floor_qty(qty / self._contract_size(symbol), step)
+        return round(contracts, max(int(round(-math.log10(step), 0)), 0))
+
+    def _to_base(self, symbol: str, contracts) -> float:
+        # 곱셈 오차(16.333000000000002 등) 제거
+        return round(float(contracts or 0) * self._contract_size(symbol), 12)
+
+    def _contract_step(self, m: dict) -> float:
+        amount = m["precision"]["amount"]
+        return float(amount) if self.exchange.precisionMode == ccxt.TICK_SIZE else 10 ** -amount
+
+    def symbol_filters(self, symbol: str) -> dict:
+        """수량 필터는 기초자산 단위로 (계약 단위 × contractSize)"""
+        m = self._market(symbol)
+        price = m["precision"]["price"]
+        tick_size = float(price) if self.exchange.precisionMode == ccxt.TICK_SIZE else 10 ** -price
+        contract_step = self._contract_step(m)
+        size = self._contract_size(symbol)
+        step_size = contract_step * size
+        min_contracts = float((m["limits"]["amount"] or {}).get("min") or contract_step)
+        return {
+            "step_size":       step_size,
+            "min_qty":         min_contracts * size,
+            "tick_size":       tick_size,
+            "qty_precision":   max(int(round(-math.log10(step_size), 0)), 0),
+            "price_precision": max(int(round(-math.log10(tick_size), 0)), 0),
+        }
+
+    def has_symbol(self, symbol: str) -> bool:
+        try:
+            self._market(symbol)
+            return True
+        except LookupError:
+            return False
+
+
+    # ── 시세 ─────────────────────────────────────────────
+    def ping(self) -> None:
+        self._call(self.exchange.fetch_time)
+
+    def mark_price(self, symbol: str) -> float:
+        ticker = self._call(self.exchange.fetch_ticker, self._unified(symbol))
+        return float(ticker.get("markPrice") or ticker["last"])
+
+    def prices(self, symbols: list[str]) -> dict[str, float]:
+        if len(symbols) == 1:
+            return {symbols[0]: float(self._call(self.exchange.fetch_ticker, self._unified(symbols[0]))["last"])}
+        by_unified = {self._unified(s): s for s in symbols}
+        tickers = self._call(self.exchange.fetch_tickers, list(by_unified))
+        return {by_unified[u]: float(t["last"]) for u, t in tickers.items() if u in by_unified}
+
+    def order_book(self, symbol: str, limit: int = 50) -> dict:
+        book = self._call(self.exchange.fetch_order_book, self._unified(symbol), limit)
+        return {"bids": book["bids"], "asks": book["asks"]}
+
+    # ── 계정/포지션 ──────────────────────────────────────
+    def balance(self, asset: str = "USDT") -> float:
+        return float(self._call(self.exchange.fetch_balance)["total"].get(asset, 0.0))
+
+    def set_leverage(self, symbol: str, leverage: int) -> None:
+        self._call(self.exchange.set_leverage, leverage, self._unified(symbol))
+
+    def position_amt(self, symbol: str) -> float:
+        unified = self._unified(symbol)
+        for p in self._call(self.exchange.fetch_positions, [unified]):
+            if p["symbol"] == unified and p.get("contracts"):
+                size = self._to_base(symbol, p["contracts"])
+                return size if p["side"] == "long" else -size
+        return 0.0
+
+    # ── 주문 ─────────────────────────────────────────────
+    def _order(self, symbol: str, o: dict) -> dict:
+        return {
+            "id":           o.get("id"),
+            "symbol":       symbol,
+            "side":         (o.get("side") or "").upper(),
+            "type":         (o.get("type") or "").upper(),
+            "status":       _STATUS.get(o.get("status"), o.get("status")),
+            "qty":          self._to_base(symbol, o.get("amount")),
+            "executed_qty": self._to_base(symbol, o.get("filled")),
+            "avg_price":    float(o.get("average") or 0),
+            "stop_price":   float(o.get("triggerPrice") or o.get("stopPrice") or 0),
+            "reduce_only":  bool(o.get("reduceOnly")),
+        }
+
+    def open_orders(self, symbol: str) -> list[dict]:
+        return [self._order(symbol, o) for o in self._call(self.exchange.fetch_open_orders, self._unified(symbol))]
+
+    def get_order(self, symbol: str, order_id) -> dict:
+        return self._order(symbol, self._call(self.exchange.fetch_order, order_id, self._unified(symbol)))
+
+    def cancel_order(self, symbol: str, order_id) -> None:
+        self._call(self.exchange.cancel_order, order_id, self._unified(symbol))
+
+    def ambiguous(self, error: Exception) -> bool:
+        return isinstance(error, (ccxt.RequestTimeout, ccxt.ExchangeNotAvailable)) or super().ambiguous(error)
+
+    def duplicate(self, error: Exception) -> bool:
+        return isinstance(error, ccxt.DuplicateOrderId)
+
+    def find_order(self, symbol: str, client_id: str) -> dict | None:
+        try:
+            o = self._call(self.exchange.fetch_order, None, self._unified(symbol), {"clientOrderId": client_id})
+        except ccxt.OrderNotFound:
+            return None
+        return self._order(symbol, o)
+
+    def _create(self, symbol: str, client_id: str | None, type_: str, side: str, qty: float,
+                price: float | None, params: dict) -> dict:
+        # 조건부 주문(stopLossPrice/takeProfitPrice)은 시장가여도 바로 체결되지 않음
+        immediate = params.get("timeInForce") == "IOC" or \
+            (type_ == "market" and not ("stopLossPrice" in params or "takeProfitPrice" in params))
+        if client_id:
+            params = {**params, "clientOrderId": client_id}
+        return self._submit(symbol, client_id, lambda: self._order(symbol, self._call(
+            self.exchange.create_order, self._unified(symbol), type_, side.lower(),
+            self._to_contracts(symbol, qty), price, params)), immediate)
+
+    def market_order(self, symbol: str, side: str, qty: float, reduce_only: bool = False,
+                     client_id: str | None = None) -> dict:
+        params = {"reduceOnly": True} if reduce_only else {}
+        order = self._create(symbol, client_id, "market", side, qty, None, params)
+        # 응답에 체결 정보가 없는 거래소는 한 번 더 조회
+        if not order["avg_price"]:
+            order = self.get_order(symbol, order["id"])
+        return order
+
+    def limit_ioc(self, symbol: str, side: str, qty: float, price: float,
+                  client_id: str | None = None) -> dict:
+        return self._create(symbol, client_id, "limit", side, qty, price, {"timeInForce": "IOC"})
+
+    def stop_order(self, symbol: str, side: str, qty: float, stop_price: float,
+                   take_profit: bool = False, client_id: str | None = None) -> dict:
+        params = {"reduceOnly": True, ("takeProfitPrice" if take_profit else "stopLossPrice"): stop_price}
+        return self._create(symbol, client_id, "market", side, qty, None, params)
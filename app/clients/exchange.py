@@ -0,0 +1,417 @@
+# app/clients/exchange.py
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+import requests
+from app.clients.hedged import LatencyStats
+from app.config import ORDER_RECOVERY_GRACE, ORDER_RESUBMIT_SETTLE, ORDER_FINAL_TIMEOUT
+from app.services.filters import get_symbol_filters, floor_qty
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 결과가 확정된 주문 상태
+FINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+# 사용자 스트림에서 본 clientOrderId 를 기억해 둘 개수
+_SEEN_MAX = 2000
+
+# client_order_id() 가 만든 id: 16자리 신호 키 + "-" + 주문 구간(e1, tp1, sl, close ...)
+_SIGNAL_ID = re.compile(r"[0-9a-f]{16}-[a-z0-9]+")
+
+_seen: OrderedDict[str, dict] = OrderedDict()
+_seen_cond = threading.Condition()
+
+
+def order_key(*parts) -> str:
+    """신호/포지션을 식별하는 값들 → 짧은 결정적 키 (clientOrderId 접두어)"""
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def client_order_id(key: str | None, leg: str) -> str | None:
+    """신호 키 + 주문 구간(entry, tp1, sl ...) → newClientOrderId (36자 이하)"""
+    return f"{key}-{leg}" if key else None
+
+
+def is_signal_order(cid: str | None) -> bool:
+    """신호 키로 낸 주문인지 (체결 결과는 신호 파이프라인이 직접 포지션으로 등록)"""
+    return bool(cid) and _SIGNAL_ID.fullmatch(cid) is not None
+
+
+def note_order_event(o: dict) -> None:
+    """사용자 스트림 ORDER_TRADE_UPDATE 의 주문(o)을 clientOrderId 로 기억 (모니터가 호출)"""
+    cid = o.get("c")
+    if not cid:
+        return
+    with _seen_cond:
+        _seen[cid] = o
+        _seen.move_to_end(cid)
+        while len(_seen) > _SEEN_MAX:
+            _seen.popitem(last=False)
+        _seen_cond.notify_all()
+
+
+def _seen_order(cid: str, timeout: float = 0.0) -> dict | None:
+    """스트림에서 본 주문 이벤트 (timeout 동안 기다림)"""
+    deadline = time.monotonic() + timeout
+    with _seen_cond:
+        while cid not in _seen:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            _seen_cond.wait(remaining)
+        return _seen[cid]
+
+
+def _from_event(o: dict) -> dict:
+    """스트림 주문 이벤트 → 공통 주문 형태"""
+    return {
+        "id":           o.get("i"),
+        "symbol":       o.get("s"),
+        "side":         o.get("S"),
+        "type":         o.get("ot") or o.get("o"),
+        "status":       o.get("X"),
+        "qty":          float(o.get("q", 0) or 0),
+        "executed_qty": float(o.get("z", 0) or 0),
+        "avg_price":    float(o.get("ap", 0) or 0),
+        "stop_price":   float(o.get("sp", 0) or 0),
+        "reduce_only":  bool(o.get("R")),
+    }
+
+
+class ExchangeAdapter:
+    """
+    매매 코드(switching/buy/sell/monitor/execution)가 쓰는 거래소 기능의 공통 인터페이스.
+    수량/가격은 float 로 주고받고, 주문은 아래 형태로 정규화해 돌려줍니다.
+
+        {"id", "symbol", "side", "type", "status", "qty", "executed_qty",
+         "avg_price", "stop_price", "reduce_only"}
+
+    status 는 Binance 표기(NEW / FILLED / CANCELED / EXPIRED ...)를 따릅니다.
+    하위 클래스는 REST 호출을 self._call 로 감싸 지연/에러 통계를 남깁니다 (라우팅에 사용).
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = LatencyStats()
+        self.consecutive_errors = 0
+        self.last_error_at = 0.0
+
+    def _call(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.stats.observe(time.perf_counter() - started, ok=False)
+            self.consecutive_errors += 1
+            self.last_error_at = time.time()
+            raise
+        self.stats.observe(time.perf_counter() - started, ok=True)
+        self.consecutive_errors = 0
+        return result
+
+    # ── 결과를 알 수 없는 주문 실패 복구 ──────────────────
+    def ambiguous(self, error: Exception) -> bool:
+        """주문이 들어갔는지 알 수 없는 실패인지 (타임아웃, 연결 끊김, 5xx 등)"""
+        return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+    def duplicate(self, error: Exception) -> bool:
+        """같은 clientOrderId 주문이 이미 있다는 거절인지"""
+        return False
+
+    def find_order(self, symbol: str, client_id: str) -> dict | None:
+        """clientOrderId 로 주문 조회 (없으면 None)"""
+        raise NotImplementedError
+
+    def _submit(self, symbol: str, client_id: str | None, create, immediate: bool = False) -> dict:
+        """
+        주문 제출. 결과를 알 수 없는 실패면 같은 client_id 의 주문을
+        사용자 스트림 → REST 조회 순으로 확인하고, 정말 없을 때만 같은 client_id 로 한 번 다시 보냅니다.
+        Binance 는 clientOrderId 중복을 미체결 주문 사이에서만 막으므로, 첫 주문이 이미 체결됐는데
+        조회에 늦게 잡히면 재전송이 그대로 한 번 더 체결됩니다. 그래서 다시 보내기 전에
+        ORDER_RESUBMIT_SETTLE 만큼 기다려 한 번 더 조회합니다 (_recover).
+        immediate 는 바로 결과가 나는 주문(시장가, IOC): 찾은 주문이 아직 NEW 면 미체결이 아니라
+        처리 중이므로 결과가 확정될 때까지 기다립니다 (_until_final).
+        """
+        try:
+            return create()
+        except Exception as e:
+            if not client_id or not self.ambiguous(e):
+                raise
+            logger.warning(f"Ambiguous order failure on {self.name} {client_id}: {e!r}")
+
+        started = time.perf_counter()
+        found = self._recover(symbol, client_id)
+        if found is None:
+            logger.warning(f"Order {client_id} did not land on {self.name}, resubmitting")
+            try:
+                found = create()
+            except Exception as e:
+                # 그 사이 첫 주문이 들어갔거나, 다시 보낸 주문도 결과를 모르는 경우
+                if self.duplicate(e):
+                    found = self.find_order(symbol, client_id)
+                elif self.ambiguous(e):
+                    found = self._recover(symbol, client_id)
+                if found is None:
+                    raise
+        if immediate:
+            found = self._until_final(symbol, client_id, found)
+        logger.info(f"Recovered order {client_id} on {self.name} "
+                    f"({(time.perf_counter() - started) * 1000:.1f}ms): {found['status']}")
+        return found
+
+    def _until_final(self, symbol: str, client_id: str, order: dict) -> dict:
+        """
+        시장가/IOC 주문이 NEW(또는 부분 체결)로 보이면 최종 상태가 될 때까지 스트림·REST 로 다시 확인.
+        ORDER_FINAL_TIMEOUT 안에 확정되지 않으면 체결 수량을 모르는 것이므로 예외
+        (0 체결로 보고 다른 주문을 더 내지 않도록).
+        """
+        deadline = time.monotonic() + ORDER_FINAL_TIMEOUT
+        while order["status"] not in FINAL_STATUSES:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Order {client_id} on {self.name} still {order['status']} "
+                                   f"after {ORDER_FINAL_TIMEOUT}s")
+            time.sleep(0.1)
+            event = _seen_order(client_id)
+            if event is not None and event.get("X") in FINAL_STATUSES:
+                return _from_event(event)
+            order = self.find_order(symbol, client_id) or order
+        return order
+
+    def _recover(self, symbol: str, client_id: str) -> dict | None:
+        """
+        client_id 주문을 스트림 → REST 순으로 찾음. 아직 처리 중일 수 있으니 스트림을
+        ORDER_RECOVERY_GRACE, ORDER_RESUBMIT_SETTLE 동안 차례로 지켜보며 다시 조회하고,
+        그래도 없을 때만 None (= 다시 보내도 되는 상태).
+        """
+        for wait in (0.0, ORDER_RECOVERY_GRACE, ORDER_RESUBMIT_SETTLE):
+            event = _seen_order(client_id, wait)
+            if event is not None and event.get("X") in FINAL_STATUSES:
+                return _from_event(event)
+            found = self.find_order(symbol, client_id)
+            if found is not None:
+                return found
+            if event is not None:
+                # 스트림에 보였으면 거래소에 들어간 주문: 조회가 늦더라도 다시 보내지 않음
+                return _from_event(event)
+        return None
+
+    # ── 시세/종목 ────────────────────────────────────────
+    def ping(self) -> None:
+        raise NotImplementedError
+
+    def has_symbol(self, symbol: str) -> bool:
+        raise NotImplementedError
+
+    def symbol_filters(self, symbol: str) -> dict:
+        """step_size, min_qty, tick_size, qty_precision, price_precision"""
+        raise NotImplementedError
+
+    def mark_price(self, symbol: str) -> float:
+        raise NotImplementedError
+
+    def prices(self, symbols: list[str]) -> dict[str, float]:
+        raise NotImplementedError
+
+    def last_price(self, symbol: str) -> float:
+        return self.prices([symbol])[symbol]
+
+    def order_book(self, symbol: str, limit: int = 50) -> dict:
+        """{"bids": [[가격, 수량], ...], "asks": [...]}"""
+        raise NotImplementedError
+
+    # ── 계정/포지션 ──────────────────────────────────────
+    def balance(self, asset: str = "USDT") -> float:
+        raise NotImplementedError
+
+    def set_leverage(self, symbol: str, leverage: int) -> None:
+        raise NotImplementedError
+
+    def position_amt(self, symbol: str) -> float:
+        """부호 있는 포지션 수량 (롱 > 0, 숏 < 0, 없으면 0)"""
+        raise NotImplementedError
+
+    # ── 주문 ─────────────────────────────────────────────
+    def open_orders(self, symbol: str) -> list[dict]:
+        raise NotImplementedError
+
+    def get_order(self, symbol: str, order_id) -> dict:
+        raise NotImplementedError
+
+    def cancel_order(self, symbol: str, order_id) -> None:
+        raise NotImplementedError
+
+    # 주문 메서드의 client_id 는 newClientOrderId (client_order_id() 로 만든 결정적 값)
+    def market_order(self, symbol: str, side: str, qty: float, reduce_only: bool = False,
+                     client_id: str | None = None) -> dict:
+        """시장가 주문. 반환 주문의 executed_qty/avg_price 는 체결 결과"""
+        raise NotImplementedError
+
+    def limit_ioc(self, symbol: str, side: str, qty: float, price: float,
+                  client_id: str | None = None) -> dict:
+        raise NotImplementedError
+
+    def stop_order(self, symbol: str, side: str, qty: float, stop_price: float,
+                   take_profit: bool = False, client_id: str | None = None) -> dict:
+        """reduceOnly 조건부 시장가 주문 (take_profit=True 면 익절, 아니면 손절)"""
+        raise NotImplementedError
+
+    def cancel_reduce_only(self, symbol: str) -> list:
+        """남아 있는 reduceOnly 주문 전부 취소, 취소한 주문 id 목록 반환"""
+        canceled = []
+        for order in self.open_orders(symbol):
+            if order["reduce_only"]:
+                self.cancel_order(symbol, order["id"])
+                canceled.append(order["id"])
+        return canceled
+
+
+def _order(o: dict) -> dict:
+    """Binance 주문 응답 → 공통 형태"""
+    return {
+        "id":           o.get("orderId"),
+        "symbol":       o.get("symbol"),
+        "side":         o.get("side"),
+        "type":         o.get("type"),
+        "status":       o.get("status"),
+        "qty":          float(o.get("origQty", 0) or 0),
+        "executed_qty": float(o.get("executedQty", 0) or 0),
+        "avg_price":    float(o.get("avgPrice", 0) or 0),
+        "stop_price":   float(o.get("stopPrice", 0) or 0),
+        "reduce_only":  bool(o.get("reduceOnly")),
+    }
+
+
+class BinanceAdapter(ExchangeAdapter):
+    """
+    python-binance Client(또는 같은 futures_* 인터페이스의 PaperClient/ReplayClient) 위의 어댑터.
+    PaperClient 를 넣으면 네트워크 없이 도는 로컬 가짜 거래소가 됩니다.
+    """
+
+    def __init__(self, client, name: str = "binance"):
+        super().__init__()
+        self.client = client
+        self.name = name
+
+    def _qty(self, symbol: str, qty: float) -> str:
+        try:
+            f = self.symbol_filters(symbol)
+        except LookupError:
+            # 거래소 정보를 못 받는 경우(재생 등)는 받은 수량 그대로
+            return str(qty)
+        return f"{floor_qty(qty, f['step_size']):.{f['qty_precision']}f}"
+
+    def _price(self, symbol: str, price: float) -> str:
+        return f"{price:.{self.symbol_filters(symbol)['price_precision']}f}"
+
+    def ambiguous(self, error: Exception) -> bool:
+        # -1007: 백엔드 응답 시간 초과, 실행 여부 알 수 없음 / 5xx
+        if getattr(error, "code", None) == -1007:
+            return True
+        status = getattr(error, "status_code", None)
+        return (isinstance(status, int) and status >= 500) or super().ambiguous(error)
+
+    def duplicate(self, error: Exception) -> bool:
+        return getattr(error, "code", None) == -4116    # ClientOrderId is duplicated
+
+    def find_order(self, symbol: str, client_id: str) -> dict | None:
+        try:
+            return _order(self._call(self.client.futures_get_order, symbol=symbol, origClientOrderId=client_id))
+        except Exception as e:
+            if getattr(e, "code", None) == -2013:       # Order does not exist
+                return None
+            raise
+
+    def _create(self, symbol: str, client_id: str | None, **params) -> dict:
+        if client_id:
+            params["newClientOrderId"] = client_id
+        immediate = params["type"] == "MARKET" or params.get("timeInForce") == "IOC"
+        return self._submit(symbol, client_id, lambda: _order(self._call(
+            self.client.futures_create_order, symbol=symbol, **params)), immediate)
+
+    def ping(self) -> None:
+        self._call(self.client.futures_ping)
+
+    def has_symbol(self, symbol: str) -> bool:
+        try:
+            self.symbol_filters(symbol)
+            return True
+        except LookupError:
+            return False
+
+    def symbol_filters(self, symbol: str) -> dict:
+        return get_symbol_filters(self.client, symbol)
+
+    def mark_price(self, symbol: str) -> float:
+        return float(self._call(self.client.futures_mark_price, symbol=symbol)["markPrice"])
+
+    def prices(self, symbols: list[str]) -> dict[str, float]:
+        # 심볼이 여러 개면 전체 티커 한 번으로 조회
+        if len(symbols) == 1:
+            ticker = self._call(self.client.futures_symbol_ticker, symbol=symbols[0])
+            return {symbols[0]: float(ticker["price"])}
+        wanted = set(symbols)
+        return {
+            t["symbol"]: float(t["price"])
+            for t in self._call(self.client.futures_symbol_ticker)
+            if t["symbol"] in wanted
+        }
+
+    def order_book(self, symbol: str, limit: int = 50) -> dict:
+        return self._call(self.client.futures_order_book, symbol=symbol, limit=limit)
+
+    def balance(self, asset: str = "USDT") -> float:
+        balances = self._call(self.client.futures_account_balance)
+        return float(next(b["balance"] for b in balances if b["asset"] == asset))
+
+    def set_leverage(self, symbol: str, leverage: int) -> None:
+        self._call(self.client.futures_change_leverage, symbol=symbol, leverage=leverage)
+
+    def position_amt(self, symbol: str) -> float:
+        positions = self._call(self.client.futures_position_information, symbol=symbol)
+        return next(
+            (float(p["positionAmt"]) for p in positions if p["symbol"] == symbol),
+            0.0
+        )
+
+    def open_orders(self, symbol: str) -> list[dict]:
+        return [_order(o) for o in self._call(self.client.futures_get_open_orders, symbol=symbol)]
+
+    def get_order(self, symbol: str, order_id) -> dict:
+        return _order(self._call(self.client.futures_get_order, symbol=symbol, orderId=order_id))
+
+    def cancel_order(self, symbol: str, order_id) -> None:
+        self._call(self.client.futures_cancel_order, symbol=symbol, orderId=order_id)
+
+    def market_order(self, symbol: str, side: str, qty: float, reduce_only: bool = False,
+                     client_id: str | None = None) -> dict:
+        params = dict(side=side, type="MARKET", quantity=self._qty(symbol, qty), newOrderRespType="RESULT")
+        if reduce_only:
+            params["reduceOnly"] = True
+        order = self._create(symbol, client_id, **params)
+        # 일부 응답은 avgPrice 가 비어 있어 한 번 더 조회
+        if order["avg_price"] == 0 and order["id"] is not None:
+            order = self.get_order(symbol, order["id"])
+        return order
+
+    def limit_ioc(self, symbol: str, side: str, qty: float, price: float,
+                  client_id: str | None = None) -> dict:
+        return self._create(
+            symbol, client_id, side=side, type="LIMIT", timeInForce="IOC",
+            quantity=self._qty(symbol, qty), price=self._price(symbol, price),
+            newOrderRespType="RESULT",
+        )
+
+    def stop_order(self, symbol: str, side: str, qty: float, stop_price: float,
+                   take_profit: bool = False, client_id: str | None = None) -> dict:
+        return self._create(
+            symbol, client_id, side=side,
+            type="TAKE_PROFIT_MARKET" if take_profit else "STOP_MARKET",
+            stopPrice=self._price(symbol, stop_price),
+            reduceOnly=True,
+            quantity=self._qty(symbol, qty),
+        )
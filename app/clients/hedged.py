@@ -0,0 +1,155 @@
+# app/clients/hedged.py
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app.config import READ_DEADLINE, HEDGE_MIN_DELAY, HEDGE_INITIAL_DELAY
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 헤지(중복 요청)해도 안전한 조회 전용 메서드. 주문/취소/설정 변경은 절대 포함하지 않음
+READ_METHODS = frozenset({
+    "futures_position_information",
+    "futures_get_order",
+    "futures_get_open_orders",
+    "futures_get_all_orders",
+    "futures_mark_price",
+    "futures_symbol_ticker",
+    "futures_orderbook_ticker",
+    "futures_order_book",
+    "futures_account_balance",
+    "futures_account",
+    "futures_exchange_info",
+    "futures_klines",
+})
+
+# p95 계산에 쓰는 최근 샘플 수 / 헤지를 시작할 최소 샘플 수
+_WINDOW      = 200
+_MIN_SAMPLES = 20
+
+
+class ReadTimeout(TimeoutError):
+    """조회가 READ_DEADLINE 안에 끝나지 않음"""
+
+
+class LatencyStats:
+    """엔드포인트별 최근 응답 시간과 에러 수"""
+
+    def __init__(self):
+        self._samples = deque(maxlen=_WINDOW)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0     # 헤지 경쟁에서 먼저 응답한 횟수
+
+    def observe(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self._samples.append(seconds)
+            else:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < _MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def summary(self) -> dict:
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        return {
+            "calls":  self.calls,
+            "errors": self.errors,
+            "wins":   self.wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        }
+
+
+class HedgedClient:
+    """
+    Binance Client 래퍼.
+    - READ_METHODS 조회는 READ_DEADLINE 안에 끝나야 하며, 대체 엔드포인트가 있으면
+      주 엔드포인트의 p95 응답 시간이 지나도 응답이 없을 때 같은 요청을 대체 쪽에 한 번 더 보내
+      먼저 온 응답을 씁니다.
+    - 그 밖의 호출(주문 등 쓰기)은 주 Client 로 그대로 한 번만 보냅니다.
+    """
+
+    def __init__(self, primary, alternate=None, deadline: float = READ_DEADLINE):
+        self._primary   = primary
+        self._alternate = alternate
+        self.deadline   = deadline
+        self.stats = {"primary": LatencyStats()}
+        if alternate is not None:
+            self.stats["alternate"] = LatencyStats()
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedged-read")
+
+    def __getattr__(self, name):
+        if name in READ_METHODS:
+            return lambda **kwargs: self.read(name, **kwargs)
+        return getattr(self._primary, name)
+
+    def hedge_delay(self) -> float:
+        p95 = self.stats["primary"].quantile(0.95)
+        delay = HEDGE_INITIAL_DELAY if p95 is None else p95
+        return min(max(delay, HEDGE_MIN_DELAY), self.deadline / 2)
+
+    def _timed(self, endpoint: str, client, method: str, kwargs: dict):
+        started = time.perf_counter()
+        try:
+            result = getattr(client, method)(**kwargs)
+        except Exception:
+            self.stats[endpoint].observe(time.perf_counter() - started, ok=False)
+            raise
+        self.stats[endpoint].observe(time.perf_counter() - started, ok=True)
+        return result
+
+    def read(self, method: str, **kwargs):
+        if method not in READ_METHODS:
+            raise ValueError(f"{method} is not an idempotent read; refusing to hedge")
+
+        deadline = time.monotonic() + self.deadline
+        pending = {self._pool.submit(self._timed, "primary", self._primary, method, kwargs): "primary"}
+        first_error = None
+
+        if self._alternate is not None:
+            done, _ = wait(pending, timeout=self.hedge_delay())
+            if not done:
+                logger.info(f"Hedging {method} to alternate endpoint")
+            for fut in done:
+                if fut.exception() is None:
+                    self.stats["primary"].wins += 1
+                    return fut.result()
+                first_error = fut.exception()
+                del pending[fut]
+            # 주 엔드포인트가 느리거나 실패 → 대체 엔드포인트로 한 번 더
+            pending[self._pool.submit(self._timed, "alternate", self._alternate, method, kwargs)] = "alternate"
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                endpoint = pending.pop(fut)
+                if fut.exception() is None:
+                    self.stats[endpoint].wins += 1
+                    return fut.result()
+                first_error = first_error or fut.exception()
+
+        if first_error is not None and not pending:
+            raise first_error
+        raise ReadTimeout(f"{method} exceeded {self.deadline}s deadline")
+
+    def latency_summary(self) -> dict:
+        return {
+            "deadline_sec":    self.deadline,
+            "hedge_delay_ms":  round(self.hedge_delay() * 1000, 1) if self._alternate else None,
+            **{name: s.summary() for name, s in self.stats.items()},
+        }
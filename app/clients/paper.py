@@ -0,0 +1,435 @@
+# app/clients/paper.py
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+import requests
+from app.config import (
+    PAPER_BALANCE, PAPER_LATENCY_MS, PAPER_SLIPPAGE_BPS, PAPER_LOST_RESPONSE_RATE,
+    PAPER_ORDER_HISTORY, POLL_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 가격 도달 시 시장가로 체결되는 조건부 주문
+STOP_TYPES = ("STOP_MARKET", "TAKE_PROFIT_MARKET")
+# 이보다 오래된 가격은 시세 소스에서 다시 받음 (초)
+PRICE_TTL = 0.5
+
+
+class PaperOrderError(Exception):
+    """모의 거래소가 거부한 주문 (Binance 에러 코드 흉내)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.code = code
+        self.message = message
+
+
+def _truthy(value) -> bool:
+    return value is True or str(value).lower() == "true"
+
+
+def _ms() -> int:
+    return int(time.time() * 1000)
+
+
+class PaperClient:
+    """
+    DRY_RUN 용 인메모리 모의 선물 거래소. 실거래 Client 와 같은 futures_* 인터페이스를 제공합니다.
+    - 시세: market(공개 시세용 Client)이 있으면 그 가격, 없으면 feed() 로 넣어준 가격만 사용
+    - MARKET / IOC 지정가: PAPER_LATENCY_MS 지연 후 마지막 가격 ± PAPER_SLIPPAGE_BPS 로 체결
+    - STOP_MARKET / TAKE_PROFIT_MARKET / GTC 지정가: 가격이 조건을 넘으면 체결
+    - 체결/취소마다 ORDER_TRADE_UPDATE 이벤트를 start_user_stream() 구독자에게 보냄
+    - 이미 있는 newClientOrderId 는 -4116 으로 거절, lost_rate 비율로 주문 응답을 ReadTimeout 으로 유실
+    """
+
+    def __init__(self, market=None, balance: float = PAPER_BALANCE,
+                 latency_ms: float = PAPER_LATENCY_MS, slippage_bps: float = PAPER_SLIPPAGE_BPS,
+                 lost_rate: float = PAPER_LOST_RESPONSE_RATE):
+        self._market = market
+        self.lost_rate = lost_rate
+        self._rng = random.Random()
+        self.API_KEY = getattr(market, "API_KEY", None)
+        self.API_SECRET = getattr(market, "API_SECRET", None)
+        self.latency = latency_ms / 1000
+        self.slippage = slippage_bps / 10000
+
+        self._lock = threading.RLock()
+        self._wallet = balance
+        self._prices: dict[str, tuple[float, float]] = {}    # symbol → (가격, 받은 시각)
+        self._positions: dict[str, dict] = {}                # symbol → {"amt", "entry"}
+        self._leverage: dict[str, int] = {}
+        # 조회 가능한 주문 (미체결 + 최근 끝난 주문 PAPER_ORDER_HISTORY 개)
+        self._orders: dict[int, dict] = {}
+        self._open: dict[str, dict[int, dict]] = {}          # symbol → 미체결 주문
+        self._by_client: dict[tuple[str, str], int] = {}     # (symbol, clientOrderId) → 최근 orderId
+        self._done: OrderedDict[int, None] = OrderedDict()   # 끝난 주문 (오래된 순)
+        self._order_ids = count(1)
+
+        self._listeners = []
+        self._events: queue.Queue = queue.Queue()
+        self._dispatcher: threading.Thread | None = None
+        self._watcher: threading.Thread | None = None
+
+    # ── 시세 ─────────────────────────────────────────────
+    def feed(self, symbol: str, price: float) -> None:
+        """가격 틱 입력 (기록 재생/부하 테스트용). 걸린 조건부 주문을 평가합니다."""
+        with self._lock:
+            self._prices[symbol] = (price, time.monotonic())
+            events = self._match(symbol, price)
+        self._emit(events)
+
+    def _price(self, symbol: str) -> float:
+        with self._lock:
+            cached = self._prices.get(symbol)
+        if cached and (self._market is None or time.monotonic() - cached[1] < PRICE_TTL):
+            return cached[0]
+        if self._market is None:
+            raise PaperOrderError(-1121, f"No price for {symbol}; feed() one first")
+        price = float(self._market.futures_symbol_ticker(symbol=symbol)["price"])
+        self.feed(symbol, price)
+        return price
+
+    def _watch_loop(self):
+        """조건부 주문이 걸린 심볼의 가격을 주기적으로 받아 체결 여부를 평가"""
+        while True:
+            time.sleep(POLL_INTERVAL)
+            with self._lock:
+                symbols = [s for s, orders in self._open.items() if orders]
+            for symbol in symbols:
+                try:
+                    self._price(symbol)
+                except Exception:
+                    logger.exception(f"Paper price refresh failed for {symbol}")
+
+    def _ensure_watcher(self):
+        if self._market is not None and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_loop, daemon=True, name="paper-watch")
+            self._watcher.start()
+
+    # ── 사용자 스트림 ────────────────────────────────────
+    def start_user_stream(self, callback) -> None:
+        """futures 사용자 소켓 대신 모의 체결 이벤트를 받을 콜백 등록"""
+        self._listeners.append(callback)
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True, name="paper-stream")
+            self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            msg = self._events.get()
+            for callback in list(self._listeners):
+                try:
+                    callback(msg)
+                except Exception:
+                    logger.exception("Paper user-stream callback failed")
+
+    def _emit(self, events: list[dict]) -> None:
+        if self._listeners:
+            for msg in events:
+                self._events.put(msg)
+
+    @staticmethod
+    def _event(order: dict, last_qty: float, last_price: float, realized: float) -> dict:
+        now = _ms()
+        return {
+            "e": "ORDER_TRADE_UPDATE",
+            "E": now,
+            "T": now,
+            "o": {
+                "s":  order["symbol"],
+                "c":  order["clientOrderId"],
+                "S":  order["side"],
+                "o":  "MARKET" if order["type"] in STOP_TYPES and order["status"] == "FILLED" else order["type"],
+                "ot": order["origType"],
+                "f":  order["timeInForce"],
+                "q":  order["origQty"],
+                "p":  order["price"],
+                "sp": order["stopPrice"],
+                "ap": order["avgPrice"],
+                "x":  "TRADE" if last_qty else order["status"],
+                "X":  order["status"],
+                "i":  order["orderId"],
+                "l":  str(last_qty),
+                "z":  order["executedQty"],
+                "L":  str(last_price),
+                "R":  order["reduceOnly"],
+                "rp": str(realized),
+                "T":  now,
+            },
+        }
+
+    # ── 체결 ─────────────────────────────────────────────
+    def _fill(self, order: dict, price: float, slip: bool = True) -> list[dict]:
+        """체결 (lock 안에서 호출). 시장가는 슬리피지를 적용하고 포지션/지갑에 반영."""
+        symbol = order["symbol"]
+        signed = 1 if order["side"] == "BUY" else -1
+        pos = self._positions.setdefault(symbol, {"amt": 0.0, "entry": 0.0})
+        qty = float(order["origQty"])
+
+        if order["reduceOnly"] or order.get("closePosition"):
+            # 반대 방향 포지션 만큼만 줄일 수 있음
+            reducible = max(-signed * pos["amt"], 0.0)
+            qty = reducible if order.get("closePosition") else min(qty, reducible)
+            if qty <= 0:
+                order.update(status="EXPIRED", updateTime=_ms())
+                return [self._event(order, 0.0, 0.0, 0.0)]
+
+        fill_price = price * (1 + signed * self.slippage) if slip else price
+        amt, entry = pos["amt"], pos["entry"]
+        realized = 0.0
+        if amt * signed < 0:
+            closed = min(abs(amt), qty)
+            realized = closed * (fill_price - entry) * (1 if amt > 0 else -1)
+            self._wallet += realized
+        new_amt = round(amt + signed * qty, 12)
+        if new_amt == 0:
+            entry = 0.0
+        elif amt * signed >= 0:
+            entry = (abs(amt) * entry + qty * fill_price) / abs(new_amt)
+        elif new_amt * amt < 0:
+            entry = fill_price          # 뒤집힘: 남은 수량은 새 가격으로 진입
+        pos.update(amt=new_amt, entry=entry)
+
+        order.update(
+            status="FILLED", executedQty=str(qty), avgPrice=str(fill_price),
+            cumQuote=str(qty * fill_price), updateTime=_ms(),
+        )
+        return [self._event(order, qty, fill_price, realized)]
+
+    def _crossed(self, order: dict, price: float) -> bool:
+        if order["type"] == "LIMIT":
+            limit = float(order["price"])
+            return price <= limit if order["side"] == "BUY" else price >= limit
+        stop = float(order["stopPrice"])
+        rising = (order["type"] == "STOP_MARKET") == (order["side"] == "BUY")
+        return price >= stop if rising else price <= stop
+
+    def _match(self, symbol: str, price: float) -> list[dict]:
+        """걸린 주문 중 가격 조건을 만족한 것을 체결 (lock 안에서 호출)"""
+        events = []
+        for order in list(self._open.get(symbol, {}).values()):
+            if not self._crossed(order, price):
+                continue
+            if order["type"] == "LIMIT":
+                # 걸어둔 지정가는 지정가로 체결
+                events += self._fill(order, float(order["price"]), slip=False)
+            else:
+                events += self._fill(order, price)
+            self._retire(order)
+        return events
+
+    # ── 주문 색인 (lock 안에서 호출) ──────────────────────
+    def _store(self, order: dict) -> None:
+        self._orders[order["orderId"]] = order
+        self._by_client[(order["symbol"], order["clientOrderId"])] = order["orderId"]
+        if order["status"] == "NEW":
+            self._open.setdefault(order["symbol"], {})[order["orderId"]] = order
+        else:
+            self._archive(order)
+
+    def _retire(self, order: dict) -> None:
+        """미체결 목록에서 빼고 끝난 주문으로 보관"""
+        if order["status"] == "NEW":
+            return
+        self._open.get(order["symbol"], {}).pop(order["orderId"], None)
+        self._archive(order)
+
+    def _archive(self, order: dict) -> None:
+        self._done[order["orderId"]] = None
+        while len(self._done) > PAPER_ORDER_HISTORY:
+            oid, _ = self._done.popitem(last=False)
+            old = self._orders.pop(oid)
+            key = (old["symbol"], old["clientOrderId"])
+            if self._by_client.get(key) == oid:
+                del self._by_client[key]
+
+    # ── 주문 ─────────────────────────────────────────────
+    def futures_create_order(self, **kwargs) -> dict:
+        lost = self.lost_rate and self._rng.random() < self.lost_rate
+        if lost and self._rng.random() < 0.5:
+            # 요청이 거래소에 닿기 전에 끊김
+            raise requests.exceptions.ReadTimeout("paper: request lost")
+        result = self._create_order(**kwargs)
+        if lost:
+            # 주문은 처리됐지만 응답이 유실됨
+            raise requests.exceptions.ReadTimeout("paper: response lost")
+        return result
+
+    def _create_order(self, **kwargs) -> dict:
+        symbol = kwargs["symbol"]
+        side = kwargs["side"]
+        otype = kwargs["type"]
+        if otype not in ("MARKET", "LIMIT") + STOP_TYPES:
+            raise PaperOrderError(-1116, f"Invalid orderType {otype}")
+        if otype in STOP_TYPES and "stopPrice" not in kwargs:
+            raise PaperOrderError(-1102, "Mandatory parameter 'stopPrice' was not sent")
+
+        client_id = kwargs.get("newClientOrderId")
+        if client_id:
+            # Binance 처럼 미체결 주문 사이에서만 중복을 막음 (끝난 주문의 id 는 다시 쓸 수 있음)
+            with self._lock:
+                if self._by_client.get((symbol, client_id)) in self._open.get(symbol, {}):
+                    raise PaperOrderError(-4116, "ClientOrderId is duplicated.")
+
+        oid = next(self._order_ids)
+        order = {
+            "orderId":       oid,
+            "clientOrderId": client_id or f"paper_{oid}",
+            "symbol":        symbol,
+            "side":          side,
+            "type":          otype,
+            "origType":      otype,
+            "status":        "NEW",
+            "timeInForce":   kwargs.get("timeInForce", "GTC"),
+            "origQty":       str(float(kwargs.get("quantity", 0) or 0)),
+            "price":         str(kwargs.get("price", "0")),
+            "stopPrice":     str(kwargs.get("stopPrice", "0")),
+            "avgPrice":      "0",
+            "executedQty":   "0",
+            "cumQuote":      "0",
+            "reduceOnly":    _truthy(kwargs.get("reduceOnly")),
+            "closePosition": _truthy(kwargs.get("closePosition")),
+            "updateTime":    _ms(),
+        }
+
+        if otype == "MARKET" or (otype == "LIMIT" and order["timeInForce"] in ("IOC", "FOK")):
+            if self.latency:
+                time.sleep(self.latency)
+            price = self._price(symbol)
+            signed = 1 if side == "BUY" else -1
+            with self._lock:
+                # IOC 지정가는 슬리피지를 포함한 체결가가 지정가 안쪽일 때만 체결
+                if otype == "MARKET" or self._crossed(order, price * (1 + signed * self.slippage)):
+                    events = self._fill(order, price)
+                else:
+                    order.update(status="EXPIRED", updateTime=_ms())
+                    events = [self._event(order, 0.0, 0.0, 0.0)]
+                self._store(order)
+                result = dict(order)
+            self._emit(events)
+            return result
+
+        # 조건부/GTC 지정가는 걸어두고 가격 변화로 체결
+        with self._lock:
+            self._store(order)
+            result = dict(order)
+        self._emit([self._event(order, 0.0, 0.0, 0.0)])
+        self._ensure_watcher()
+        return result
+
+    def futures_cancel_order(self, symbol: str, orderId: int = None, origClientOrderId: str = None, **_) -> dict:
+        with self._lock:
+            order = self._find(symbol, orderId, origClientOrderId)
+            if order["status"] != "NEW":
+                raise PaperOrderError(-2011, "Unknown order sent.")
+            order.update(status="CANCELED", updateTime=_ms())
+            self._retire(order)
+            result = dict(order)
+        self._emit([self._event(order, 0.0, 0.0, 0.0)])
+        return result
+
+    def _find(self, symbol: str, order_id, client_id) -> dict:
+        if order_id is None and client_id is not None:
+            order_id = self._by_client.get((symbol, client_id))
+        order = self._orders.get(int(order_id)) if order_id is not None else None
+        if order is None or order["symbol"] != symbol:
+            raise PaperOrderError(-2013, "Order does not exist.")
+        return order
+
+    def futures_get_order(self, symbol: str, orderId: int = None, origClientOrderId: str = None, **_) -> dict:
+        with self._lock:
+            return dict(self._find(symbol, orderId, origClientOrderId))
+
+    def futures_get_open_orders(self, symbol: str = None, **_) -> list[dict]:
+        with self._lock:
+            if symbol is not None:
+                return [dict(o) for o in self._open.get(symbol, {}).values()]
+            return [dict(o) for orders in self._open.values() for o in orders.values()]
+
+    def futures_ping(self, **_) -> dict:
+        return {}
+
+    # ── 계정 ─────────────────────────────────────────────
+    def futures_change_leverage(self, symbol: str, leverage: int, **_) -> dict:
+        with self._lock:
+            self._leverage[symbol] = int(leverage)
+        return {"symbol": symbol, "leverage": int(leverage), "maxNotionalValue": "0"}
+
+    def futures_account_balance(self, **_) -> list[dict]:
+        with self._lock:
+            wallet = self._wallet
+        return [{"asset": "USDT", "balance": str(wallet), "availableBalance": str(wallet)}]
+
+    def futures_position_information(self, symbol: str = None, **_) -> list[dict]:
+        with self._lock:
+            items = [(s, dict(p)) for s, p in self._positions.items() if symbol is None or s == symbol]
+            prices = {s: p for s, (p, _) in self._prices.items()}
+        out = []
+        for s, p in items:
+            mark = prices.get(s, p["entry"])
+            out.append({
+                "symbol":           s,
+                "positionAmt":      str(p["amt"]),
+                "entryPrice":       str(p["entry"]),
+                "markPrice":        str(mark),
+                "unRealizedProfit": str(p["amt"] * (mark - p["entry"])),
+                "leverage":         str(self._leverage.get(s, 1)),
+                "positionSide":     "BOTH",
+            })
+        if symbol is not None and not out:
+            out.append({"symbol": symbol, "positionAmt": "0", "entryPrice": "0",
+                        "markPrice": str(prices.get(symbol, 0)), "unRealizedProfit": "0",
+                        "leverage": str(self._leverage.get(symbol, 1)), "positionSide": "BOTH"})
+        return out
+
+    # ── 시세 조회 (시세 소스로 전달하고 가격은 모의 체결에 반영) ──
+    def futures_symbol_ticker(self, symbol: str = None, **kwargs):
+        if symbol is not None:
+            return {"symbol": symbol, "price": str(self._price(symbol))}
+        if self._market is None:
+            with self._lock:
+                return [{"symbol": s, "price": str(p)} for s, (p, _) in self._prices.items()]
+        tickers = self._market.futures_symbol_ticker(**kwargs)
+        for t in tickers:
+            self.feed(t["symbol"], float(t["price"]))
+        return tickers
+
+    def futures_mark_price(self, symbol: str, **_) -> dict:
+        return {"symbol": symbol, "markPrice": str(self._price(symbol))}
+
+    def futures_order_book(self, symbol: str, limit: int = 50, **kwargs) -> dict:
+        if self._market is not None:
+            return self._market.futures_order_book(symbol=symbol, limit=limit, **kwargs)
+        # 시세 소스가 없으면 마지막 가격 ± 슬리피지에 충분한 수량이 있다고 가정
+        price = self._price(symbol)
+        return {
+            "bids": [[str(price * (1 - self.slippage)), "1e9"]],
+            "asks": [[str(price * (1 + self.slippage)), "1e9"]],
+        }
+
+    def futures_exchange_info(self, **kwargs) -> dict:
+        if self._market is not None:
+            return self._market.futures_exchange_info(**kwargs)
+        with self._lock:
+            symbols = list(self._prices)
+        return {"symbols": [
+            {"symbol": s, "filters": [
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+                {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+            ]}
+            for s in symbols
+        ]}
+
+    def __getattr__(self, name):
+        # 그 밖의 조회(klines 등)는 시세 소스로
+        market = self.__dict__.get("_market")
+        if market is not None and name.startswith("futures_"):
+            return getattr(market, name)
+        raise AttributeError(name)
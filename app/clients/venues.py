@@ -0,0 +1,121 @@
+# app/clients/venues.py
+
+import logging
+import threading
+import time
+from app.clients.binance_client import get_binance_client
+from app.clients.exchange import ExchangeAdapter, BinanceAdapter
+from app.clients.paper import PaperClient
+from app.config import (
+    VENUES, VENUE_MAX_ERRORS, VENUE_COOLDOWN, VENUE_PROBE_INTERVAL,
+    DRY_RUN, REST_TIMEOUT, venue_credentials,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BINANCE = "binance"
+# 기본 거래소 이름 (어댑터를 만들지 않고도 알 수 있도록)
+PRIMARY = (VENUES or [BINANCE])[0]
+
+
+def _build(name: str) -> ExchangeAdapter:
+    if name == BINANCE:
+        return BinanceAdapter(get_binance_client())
+    if DRY_RUN:
+        # 모의 거래에서는 다른 거래소도 바이낸스 시세를 쓰는 별도 모의 거래소로 대체
+        return BinanceAdapter(PaperClient(market=get_binance_client()), name=name)
+    # ccxt 는 바이낸스 외 거래소를 설정한 경우에만 필요
+    from app.clients.ccxt_adapter import CcxtAdapter
+    key, secret = venue_credentials(name)
+    return CcxtAdapter(name, key, secret, timeout_ms=int(REST_TIMEOUT * 1000))
+
+
+class VenueRouter:
+    """
+    신호마다 주문을 보낼 거래소를 고릅니다.
+    - 이미 포지션이 있는 심볼은 그 포지션을 가진 거래소로 (청산/전환이 같은 곳에서 일어나도록)
+    - 그 외에는 심볼을 거래할 수 있고 건강한 거래소 중 최근 응답 p50 이 가장 빠른 곳
+    - 연속 에러가 VENUE_MAX_ERRORS 이상인 거래소는 VENUE_COOLDOWN 동안 제외
+    """
+
+    def __init__(self, venues: list[ExchangeAdapter]):
+        self.venues = {v.name: v for v in venues}
+        self.primary = venues[0]
+        self._probe: threading.Thread | None = None
+
+    def get(self, name: str | None) -> ExchangeAdapter:
+        return self.venues.get(name) or self.primary
+
+    def healthy(self, venue: ExchangeAdapter) -> bool:
+        return venue.consecutive_errors < VENUE_MAX_ERRORS or \
+            time.time() - venue.last_error_at > VENUE_COOLDOWN
+
+    def pick(self, symbol: str, holder: str | None = None) -> ExchangeAdapter:
+        if holder in self.venues:
+            return self.venues[holder]
+        if len(self.venues) == 1:
+            return self.primary
+
+        candidates = []
+        for order, venue in enumerate(self.venues.values()):
+            try:
+                if not self.healthy(venue) or not venue.has_symbol(symbol):
+                    continue
+            except Exception:
+                logger.exception(f"Venue {venue.name} symbol lookup failed")
+                continue
+            p50 = venue.stats.quantile(0.5)
+            candidates.append((p50 if p50 is not None else float("inf"), order, venue))
+        if not candidates:
+            logger.warning(f"No healthy venue lists {symbol}, using {self.primary.name}")
+            return self.primary
+        return min(candidates, key=lambda c: c[:2])[2]
+
+    def _probe_loop(self):
+        while True:
+            for venue in self.venues.values():
+                try:
+                    venue.ping()
+                except Exception:
+                    logger.warning(f"Venue {venue.name} ping failed")
+            time.sleep(VENUE_PROBE_INTERVAL)
+
+    def start_probe(self) -> None:
+        """거래소가 둘 이상이면 주기적 ping 으로 지연/상태를 계속 갱신"""
+        if len(self.venues) > 1 and self._probe is None:
+            self._probe = threading.Thread(target=self._probe_loop, daemon=True, name="venue-probe")
+            self._probe.start()
+
+    def summary(self) -> dict:
+        return {
+            name: {**venue.stats.summary(), "healthy": self.healthy(venue),
+                   "consecutive_errors": venue.consecutive_errors}
+            for name, venue in self.venues.items()
+        }
+
+
+_router: VenueRouter | None = None
+_lock = threading.Lock()
+
+
+def get_router() -> VenueRouter:
+    global _router
+    with _lock:
+        if _router is None:
+            _router = VenueRouter([_build(name) for name in VENUES or [BINANCE]])
+            _router.start_probe()
+            logger.info(f"Venues: {list(_router.venues)} (primary {_router.primary.name})")
+        return _router
+
+
+def router_summary() -> dict:
+    """거래소별 지연/상태 (라우터 생성 전이면 빈 dict, 조회만으로 클라이언트를 만들지 않음)"""
+    with _lock:
+        router = _router
+    return router.summary() if router else {}
+
+
+def get_venue(name: str | None = None) -> ExchangeAdapter:
+    """이름으로 거래소 어댑터 조회 (없거나 None 이면 기본 거래소)"""
+    return get_router().get(name)
@@ -8,6 +8,7 @@ load_dotenv()
 # 바이낸스 키
 EX_API_KEY = os.getenv("EXCHANGE_API_KEY")
 EX_API_SECRET = os.getenv("EXCHANGE_API_SECRET")
+# true 면 실주문 대신 모의 거래소(PaperClient)로 전체 파이프라인 실행
 DRY_RUN = os.getenv("DRY_RUN", "false").lower() == "true"
 
 # ── 거래 파라미터 ────────────────────────────────────
@@ -24,4 +25,130 @@ SL_RATIO       = float(os.getenv("SL_RATIO", "0.995"))
 # 포지션 체크 주기 (초)
 POLL_INTERVAL  = float(os.getenv("POLL_INTERVAL", "1.0"))
 # 최대 대기 시간 (초)
-MAX_WAIT       = int(os.getenv("MAX_WAIT", "15"))
\ No newline at end of file
+MAX_WAIT       = int(os.getenv("MAX_WAIT", "15"))
+
+# ── 멀티 프로세스 / 리더 선출 ────────────────────────
+# 상태 저장소: local(프로세스 내부) 또는 shm(같은 노드의 공유 메모리)
+STATE_BACKEND    = os.getenv("STATE_BACKEND", "local").lower()
+# shm 백엔드의 공유 메모리 이름과 크기 (바이트)
+STATE_SHM_NAME   = os.getenv("STATE_SHM_NAME", "tvbot_state")
+STATE_SHM_SIZE   = int(os.getenv("STATE_SHM_SIZE", str(1 << 20)))
+# 리더 임대(lease) 유효 시간 (초)
+LEADER_LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "10"))
+
+# ── 소프트웨어 TP/SL 레벨 ────────────────────────────
+# 2차 익절 비율 (+1.1% → 1.011)
+TP2_RATIO      = float(os.getenv("TP2_RATIO", "1.011"))
+# 1차 익절 후 옮기는 손절 비율 (+0.1% → 1.001)
+BE_RATIO       = float(os.getenv("BE_RATIO", "1.001"))
+# 2차 익절 후 남은 물량의 트레일링 스탑 간격 (0.3% → 0.003, 0이면 사용 안 함)
+TRAIL_RATIO    = float(os.getenv("TRAIL_RATIO", "0"))
+
+# 거래소 ↔ 로컬 상태 정합성 점검 주기 (초)
+RECONCILE_INTERVAL = float(os.getenv("RECONCILE_INTERVAL", "30"))
+
+# ── 로컬 신호 엔진 ───────────────────────────────────
+# off: TradingView 웹훅만 / primary: 로컬 엔진 우선(웹훅은 예비) / confirm: 양쪽 일치 시 실행
+SIGNAL_ENGINE         = os.getenv("SIGNAL_ENGINE", "off").lower()
+# 규칙 목록 (';' 구분) 예: "ETHUSDT@1m:ema_cross:9:21;BTCUSDT@5m:rsi:14:30:70"
+SIGNAL_RULES          = os.getenv("SIGNAL_RULES", "")
+# 심볼별 보관할 봉 개수
+SIGNAL_BUFFER         = int(os.getenv("SIGNAL_BUFFER", "500"))
+# 두 신호원이 같은 신호로 간주되는 시간 범위 (초)
+SIGNAL_CONFIRM_WINDOW = float(os.getenv("SIGNAL_CONFIRM_WINDOW", "120"))
+# ATR 변동성 필터: ATR/종가 가 이 %보다 작으면 신호 무시 (0이면 사용 안 함)
+SIGNAL_MIN_ATR_PCT    = float(os.getenv("SIGNAL_MIN_ATR_PCT", "0"))
+
+# ── 이벤트 기록기 ────────────────────────────────────
+# 스트림 이벤트/REST 응답을 기록할 디렉터리 (비어 있으면 기록 안 함)
+RECORDER_DIR          = os.getenv("RECORDER_DIR", "")
+# 세그먼트 파일 하나의 크기 (MB)
+RECORDER_SEGMENT_MB   = int(os.getenv("RECORDER_SEGMENT_MB", "64"))
+# 디렉터리 전체(이전 프로세스 포함)에 남겨둘 최대 세그먼트 수
+RECORDER_MAX_SEGMENTS = int(os.getenv("RECORDER_MAX_SEGMENTS", "20"))
+# 디렉터리 전체 세그먼트 크기 상한 (MB, 0 이면 세그먼트 수로만 제한)
+RECORDER_MAX_MB       = int(os.getenv("RECORDER_MAX_MB", "0"))
+
+# 관리자용 프로파일링 엔드포인트 토큰 (비어 있으면 /admin/profile 비활성)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# ── 주문 분할 실행 ───────────────────────────────────
+# single: 시장가 한 번 / ioc: 호가 기반 IOC 지정가 분할 / twap: 시간 분할 시장가
+EXEC_MODE             = os.getenv("EXEC_MODE", "ioc").lower()
+# 이 명목금액(USDT) 이상일 때만 분할
+SLICE_MIN_NOTIONAL    = float(os.getenv("SLICE_MIN_NOTIONAL", "50000"))
+# 한 번에 보내는 자식 주문 수
+SLICE_COUNT           = int(os.getenv("SLICE_COUNT", "4"))
+# 분할 체결 마감 시간 (초) — 넘으면 남은 수량은 시장가
+EXEC_DEADLINE         = float(os.getenv("EXEC_DEADLINE", "5"))
+# IOC 지정가의 마크가격 대비 최대 허용 슬리피지 (bp)
+EXEC_MAX_SLIPPAGE_BPS = float(os.getenv("EXEC_MAX_SLIPPAGE_BPS", "15"))
+# TWAP 총 소요 시간 (초, EXEC_DEADLINE 이내로 제한)
+TWAP_SECONDS          = float(os.getenv("TWAP_SECONDS", "4"))
+
+# ── 대시보드 차트 기록 ───────────────────────────────
+# 심볼별 보관 샘플 수 (1초 간격이면 86400 = 하루)
+HISTORY_CAPACITY   = int(os.getenv("HISTORY_CAPACITY", "86400"))
+# 샘플 최소 간격 (초)
+HISTORY_SAMPLE_SEC = float(os.getenv("HISTORY_SAMPLE_SEC", "1.0"))
+
+# ── REST 조회 마감/헤지 ──────────────────────────────
+# 조회(읽기) 호출 하나의 마감 시간 (초)
+READ_DEADLINE       = float(os.getenv("READ_DEADLINE", "5"))
+# 모든 REST 호출의 소켓 타임아웃 (초)
+REST_TIMEOUT        = float(os.getenv("REST_TIMEOUT", "10"))
+# 헤지 요청을 보낼 대체 선물 API 주소 (예: https://fapi.binance.com/fapi 의 다른 경로/프록시). 비어 있으면 헤지 안 함
+HEDGE_FUTURES_URL   = os.getenv("HEDGE_FUTURES_URL", "")
+# 헤지 지연 하한 / 샘플이 부족할 때 쓰는 초기값 (초)
+HEDGE_MIN_DELAY     = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "0.3"))
+
+# ── 포지션 전환 방식 ─────────────────────────────────
+# reverse: 청산 수량 + 새 진입 수량을 시장가 한 번으로 뒤집기
+# close:   청산 → 평탄화 대기 → 정리 → 새 진입 (기존 방식)
+FLIP_MODE = os.getenv("FLIP_MODE", "reverse").lower()
+
+# ── 모의 거래 (DRY_RUN=true 일 때 사용) ─────────────────
+# 시작 USDT 잔고
+PAPER_BALANCE      = float(os.getenv("PAPER_BALANCE", "10000"))
+# 시장가 체결까지의 모의 지연 (ms)
+PAPER_LATENCY_MS   = float(os.getenv("PAPER_LATENCY_MS", "50"))
+# 시장가 체결 슬리피지 (bp)
+PAPER_SLIPPAGE_BPS = float(os.getenv("PAPER_SLIPPAGE_BPS", "2"))
+# 시세 소스: live(공개 Binance 시세) / offline(feed() 로 넣은 가격만, 부하 테스트용)
+PAPER_MARKET_DATA  = os.getenv("PAPER_MARKET_DATA", "live").lower()
+# 주문 응답 유실 비율 (0~1, 타임아웃 복구 점검용). 절반은 주문 전, 절반은 체결 후에 끊김
+PAPER_LOST_RESPONSE_RATE = float(os.getenv("PAPER_LOST_RESPONSE_RATE", "0"))
+# 조회용으로 보관하는 끝난 주문 수 (미체결 주문은 항상 보관)
+PAPER_ORDER_HISTORY = int(os.getenv("PAPER_ORDER_HISTORY", "10000"))
+
+# ── 알림 중복 방지 ───────────────────────────────────
+# id 없는 알림: 같은 출처·심볼·방향 알림이 이 시간(초) 안에 다시 오면 재전송으로 보고 같은 주문 키 사용
+ALERT_DEDUP_WINDOW = float(os.getenv("ALERT_DEDUP_WINDOW", "60"))
+
+# ── 묶음 웹훅 ────────────────────────────────────────
+# /webhook/batch 한 번에 받는 최대 신호 수 / 동시에 처리하는 심볼 수
+BATCH_MAX_ALERTS = int(os.getenv("BATCH_MAX_ALERTS", "100"))
+BATCH_WORKERS    = int(os.getenv("BATCH_WORKERS", "32"))
+
+# ── 거래소(venue) 라우팅 ─────────────────────────────
+# 사용할 거래소 목록 (첫 번째가 기본). binance 외에는 ccxt 거래소 id (예: binance,bybit,okx)
+VENUES               = [v.strip().lower() for v in os.getenv("VENUES", "binance").split(",") if v.strip()]
+# 연속 에러가 이 횟수 이상이면 VENUE_COOLDOWN 초 동안 라우팅에서 제외
+VENUE_MAX_ERRORS     = int(os.getenv("VENUE_MAX_ERRORS", "3"))
+VENUE_COOLDOWN       = float(os.getenv("VENUE_COOLDOWN", "60"))
+# 거래소가 둘 이상일 때 지연 측정용 ping 주기 (초)
+VENUE_PROBE_INTERVAL = float(os.getenv("VENUE_PROBE_INTERVAL", "10"))
+
+
+def venue_credentials(name: str) -> tuple[str | None, str | None]:
+    """binance 이외 거래소의 API 키: {NAME}_API_KEY / {NAME}_API_SECRET"""
+    return os.getenv(f"{name.upper()}_API_KEY"), os.getenv(f"{name.upper()}_API_SECRET")
+
+# ── 주문 복구 ────────────────────────────────────────
+# 결과를 알 수 없는 주문 실패 후, 조회에서 안 보이면 사용자 스트림을 추가로 기다리는 시간 (초)
+ORDER_RECOVERY_GRACE = float(os.getenv("ORDER_RECOVERY_GRACE", "0.3"))
+# 그래도 안 보이면 다시 보내기 전에 기다렸다가 한 번 더 조회하는 시간 (초)
+ORDER_RESUBMIT_SETTLE = float(os.getenv("ORDER_RESUBMIT_SETTLE", "1.0"))
+# 찾은 시장가/IOC 주문이 아직 NEW 면 체결 결과가 확정될 때까지 다시 조회하는 최대 시간 (초)
+ORDER_FINAL_TIMEOUT = float(os.getenv("ORDER_FINAL_TIMEOUT", "5.0"))
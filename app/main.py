@@ -4,9 +4,14 @@ from fastapi import FastAPI
 from app.routers.webhook import router as webhook_router
 from app.routers.dashboard import router as dashboard_router
 from app.routers.report import router as report_router, report
+from app.routers.profiling import router as profiling_router
+import asyncio
 import threading
 import logging
 from app.services.monitor import start_monitor
+from app.services.reconcile import start_reconciler
+from app.services.signals import start_signal_engine
+from app.services.leader import elector
 
 # APScheduler imports
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -15,33 +20,67 @@ from zoneinfo import ZoneInfo
 
 app = FastAPI()
 
+def _daily_report():
+    """리포트(카운터 리셋 포함)는 리더 프로세스에서만 한 번 실행"""
+    if elector.is_leader():
+        asyncio.run(report())
+
+
 @app.on_event("startup")
 def on_startup():
     """
     앱 기동 시:
-    1) 모니터 스레드 안전 실행
+    1) 리더 선출 시작 → 리더로 선출된 프로세스만 모니터·정합성 점검·로컬 신호 엔진 실행
+       (모든 워커는 웹훅·대시보드를 처리)
     2) 매일 KST 09:00에 일일 리포트 실행 스케줄러 등록
     """
     # 1) 모니터 스레드
+    starting = threading.Lock()
+    ready = threading.Event()
+
     def safe_monitor():
+        # 하나가 실패해도 나머지는 시작 (이미 시작한 것은 다시 불러도 그대로)
         try:
-            start_monitor()
-        except Exception:
-            logging.getLogger("monitor").exception("모니터링 스레드 실패")
-    thread = threading.Thread(target=safe_monitor, daemon=True)
-    thread.start()
+            failed = 0
+            for start in (start_monitor, start_reconciler, start_signal_engine):
+                try:
+                    start()
+                except Exception:
+                    failed += 1
+                    logging.getLogger("monitor").exception(f"{start.__name__} 실패")
+            if not failed:
+                ready.set()
+        finally:
+            starting.release()
+
+    def on_elected(token):
+        # 리더인 동안 임대 갱신마다 불림: 모두 시작될 때까지 (진행 중인 시도가 없으면) 다시 시도
+        if ready.is_set():
+            return True
+        if starting.acquire(blocking=False):
+            threading.Thread(target=safe_monitor, daemon=True).start()
+        return False
+
+    elector.start(on_elected=on_elected)
 
     # 2) 일일 리포트 스케줄러 (Asia/Seoul 09:00)
     sched = BackgroundScheduler(timezone="Asia/Seoul")
     # 매일 오전 09:00에 report() 호출
-    sched.add_job(lambda: report(), 'cron', hour=9, minute=0)
+    sched.add_job(_daily_report, 'cron', hour=9, minute=0)
     sched.start()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    # 다른 워커가 TTL 만료를 기다리지 않고 바로 리더를 넘겨받도록 임대 반납
+    elector.stop()
+
+
 # 라우터 등록
 app.include_router(webhook_router)
 app.include_router(dashboard_router)
 app.include_router(report_router)
+app.include_router(profiling_router)
 
 
 @app.get("/health")
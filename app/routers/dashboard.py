@@ -1,16 +1,22 @@
 # app/routers/dashboard.py
 
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Query
+from fastapi.responses import HTMLResponse, JSONResponse
+from app.services.history import chart
 from app.state import monitor_state
 
 router = APIRouter()
 
 @router.get("/dashboard", response_class=HTMLResponse)
 async def dashboard():
-    data        = monitor_state
+    return HTMLResponse(render_dashboard(monitor_state.snapshot()))
+
+
+def render_dashboard(data: dict) -> str:
+    """상태 스냅샷 → 대시보드 HTML (I/O 없는 순수 함수, benchmarks 에서도 사용)"""
     entry_price = data.get("entry_price", 0.0)
     entry_time  = data.get("entry_time", "-")
+    side        = data.get("side", "LONG")
     qty         = data.get("position_qty", 0.0)
     pnl         = data.get("pnl", 0.0)
 
@@ -55,6 +61,7 @@ async def dashboard():
   <div class="card">
     <h2>진입 정보 <span class="{ 'done' if qty>0 else 'pending' }">({ '진행 중' if qty>0 else '미진행'})</span></h2>
     <p><strong>시간:</strong> {entry_time}</p>
+    <p><strong>방향:</strong> {side}</p>
     <p><strong>진입가:</strong> {entry_price:.2f} USDT</p>
     <p><strong>수량:</strong> {qty:.4f}</p>
     <p><strong>현재 PnL:</strong> {pnl:.2f}%</p>
@@ -85,4 +92,18 @@ async def dashboard():
   </div>
 </body>
 </html>"""
-    return HTMLResponse(html)
\ No newline at end of file
+    return html
+
+
+@router.get("/dashboard/chart", response_class=JSONResponse)
+def dashboard_chart(
+    symbol: str = Query(..., description="예: ETHUSDT"),
+    points: int = Query(500, ge=10, le=5000),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    window: float | None = Query(None, gt=0, description="최근 N초만"),
+):
+    """
+    가격/PnL/포지션 수량 기록을 points 개 이하로 다운샘플링해 반환합니다.
+    lttb: 모양 보존 / minmax: 구간별 최저·최고 보존
+    """
+    return JSONResponse(chart(symbol.upper().replace("/", ""), points, method, window))
@@ -0,0 +1,66 @@
+# app/routers/profiling.py
+
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import ADMIN_TOKEN
+from app.services import profiling
+
+MAX_SAMPLE_SECONDS = 120
+
+
+def _require_admin(x_admin_token: str = Header(default="")):
+    # ADMIN_TOKEN 미설정이면 엔드포인트 자체를 숨김
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+router = APIRouter(prefix="/admin/profile", dependencies=[Depends(_require_admin)])
+
+
+@router.get("/stacks", response_class=PlainTextResponse)
+def stacks(seconds: float = Query(10, gt=0, le=MAX_SAMPLE_SECONDS), hz: float = Query(100, gt=0, le=1000)):
+    """
+    모든 스레드 스택을 seconds 동안 샘플링 (collapsed-stack 형식).
+    예) curl -H "X-Admin-Token: ..." ".../admin/profile/stacks?seconds=10" | flamegraph.pl > out.svg
+    """
+    return PlainTextResponse(profiling.sample_stacks(seconds, hz))
+
+
+@router.post("/webhook")
+def arm_webhook():
+    """다음 /webhook 호출 한 번을 cProfile 로 측정"""
+    profiling.arm_webhook_profile()
+    return {"status": "armed"}
+
+
+@router.get("/webhook", response_class=PlainTextResponse)
+def webhook_result():
+    result = profiling.webhook_profile_result()
+    if result is None:
+        raise HTTPException(status_code=404, detail="no profiled webhook call yet")
+    return PlainTextResponse(result)
+
+
+@router.post("/tracemalloc/start")
+def tracemalloc_start(frames: int = Query(10, ge=1, le=50)):
+    """메모리 추적 시작 + 기준 스냅샷"""
+    profiling.start_tracemalloc(frames)
+    return {"status": "tracing"}
+
+
+@router.get("/tracemalloc/diff", response_class=PlainTextResponse)
+def tracemalloc_diff(limit: int = Query(30, ge=1, le=500)):
+    result = profiling.tracemalloc_diff(limit)
+    if result is None:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running")
+    return PlainTextResponse(result)
+
+
+@router.post("/tracemalloc/stop")
+def tracemalloc_stop():
+    profiling.stop_tracemalloc()
+    return {"status": "stopped"}
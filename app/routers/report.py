@@ -5,6 +5,8 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from app.clients.binance_client import latency_summary
+from app.clients.venues import router_summary
 from app.state import monitor_state
 
 router = APIRouter()
@@ -22,21 +24,8 @@ async def report():
     period_date = (now if now.hour >= 9 else now.replace(day=now.day-1))\
                     .strftime("%Y-%m-%d")
 
-    # 현재 집계값 읽기
-    data = {
-        "period":        period_date,
-        "total_trades":  monitor_state.get("trade_count", 0),
-        "1차_익절횟수":   monitor_state.get("first_tp_count", 0),
-        "2차_익절횟수":   monitor_state.get("second_tp_count", 0),
-        "손절횟수":      monitor_state.get("sl_count", 0),
-        "총_수익률(%)":  round(monitor_state.get("daily_pnl", 0.0), 2),
-    }
-
-    # 로그에도 남기고
-    logger.info(f"Daily Report [{period_date}]: {data}")
-
-    # 카운터 리셋
-    monitor_state.update({
+    # 현재 집계값 읽기 + 카운터 리셋 (다른 워커의 증가분이 유실되지 않도록 한 번에)
+    counters = monitor_state.swap({
         "trade_count":      0,
         "first_tp_count":   0,
         "second_tp_count":  0,
@@ -44,5 +33,40 @@ async def report():
         "daily_pnl":        0.0,
         "last_reset":       period_date
     })
+    data = {
+        "period":        period_date,
+        "total_trades":  counters["trade_count"] or 0,
+        "1차_익절횟수":   counters["first_tp_count"] or 0,
+        "2차_익절횟수":   counters["second_tp_count"] or 0,
+        "손절횟수":      counters["sl_count"] or 0,
+        "총_수익률(%)":  round(counters["daily_pnl"] or 0.0, 2),
+    }
+
+    # 로그에도 남기고
+    logger.info(f"Daily Report [{period_date}]: {data}")
+
+    return JSONResponse(data)
 
-    return JSONResponse(data)
\ No newline at end of file
+@router.get("/report/executions", response_class=JSONResponse)
+async def executions():
+    """최근 진입/전환 주문의 체결 통계 (체결 시간, 마크가 대비 슬리피지)"""
+    return JSONResponse(monitor_state.get("executions") or [])
+
+
+@router.get("/report/latency", response_class=JSONResponse)
+async def latency():
+    """
+    REST 조회 엔드포인트별 지연(p50/p95/p99)과 헤지 현황, 거래소별 지연/상태.
+    거래소 클라이언트가 아직 없거나(자격 증명 없음 등) 집계에 실패하면 그 부분만 비워서 돌려줍니다.
+    """
+    data = {}
+    try:
+        data.update(latency_summary())
+    except Exception:
+        logger.exception("Failed to summarize REST latency")
+    try:
+        data["venues"] = router_summary()
+    except Exception:
+        logger.exception("Failed to summarize venues")
+        data["venues"] = {}
+    return JSONResponse(data)
@@ -1,14 +1,14 @@
 # app/routers/webhook.py
 
+import asyncio
 import logging
-from datetime import datetime
-from zoneinfo import ZoneInfo
+import time
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from app.config import DRY_RUN
-from app.services.switching import switch_position
-from app.state import monitor_state
+from app.config import BATCH_MAX_ALERTS
+from app.services import profiling
+from app.services.alerts import process_alert, process_batch, SOURCE_TRADINGVIEW
 
 logger = logging.getLogger("webhook")
 router = APIRouter()
@@ -17,6 +17,11 @@ router = APIRouter()
 class AlertPayload(BaseModel):
     symbol: str   # e.g. "ETH/USDT"
     action: str   # "BUY" or "SELL"
+    id: str | None = None   # 알림 고유값 (재전송돼도 같은 값이면 주문이 중복되지 않음)
+
+
+class BatchPayload(BaseModel):
+    alerts: list[AlertPayload]   # TradingView 바스켓 알림 등 여러 심볼을 한 번에
 
 
 @router.post("/webhook")
@@ -24,54 +29,47 @@ async def webhook(payload: AlertPayload):
     sym    = payload.symbol.upper().replace("/", "")
     action = payload.action.upper()
 
-    # Dry-run 모드면 리턴
-    if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym}")
-        return {"status": "dry_run"}
-
     try:
-        # 포지션 스위칭 (청산 + 새 진입)
-        res = switch_position(sym, action)
-
-        # 이미 같은 방향 포지션이 있으면 스킵
-        if "skipped" in res:
-            logger.info(f"Skipped {action} {sym}: {res['skipped']}")
-            return {"status": "skipped", "reason": res["skipped"]}
-
-        # 정상 매매 체결 정보 반영
-        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-        if action == "BUY":
-            info = res.get("buy", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-
-            monitor_state.update({
-                "symbol":        sym,
-                "entry_price":   entry,
-                "position_qty":  qty,
-                "entry_time":    now,
-                "first_tp_done":  False,
-                "second_tp_done": False,
-                "sl_done":        False,
-            })
-
-        else:  # SELL
-            info = res.get("sell", {})
-            entry = float(info.get("entry", 0))
+        # 주문 처리는 블로킹이므로 이벤트 루프 밖에서 실행
+        # /admin/profile/webhook 으로 예약된 경우에만 cProfile 측정
+        if profiling.webhook_armed:
+            return await asyncio.to_thread(profiling.run_profiled, process_alert, sym, action, SOURCE_TRADINGVIEW, payload.id)
+        return await asyncio.to_thread(process_alert, sym, action, SOURCE_TRADINGVIEW, payload.id)
+    except Exception as e:
+        logger.exception(f"Error processing {action} for {sym}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            monitor_state.update({
-                "symbol":        sym,
-                "entry_price":   entry,
-                "position_qty":  0.0,     # 숏은 모니터에서 qty=0 처리
-                "entry_time":    now,
-                "first_tp_done":  False,
-                "second_tp_done": False,
-                "sl_done":        False,
-            })
 
+@router.post("/webhook/batch")
+async def webhook_batch(payload: BatchPayload):
+    """
+    여러 신호를 한 번에 받아 심볼별로 동시에 실행합니다.
+    잘못된 항목은 실행하지 않고 결과에 invalid 로 표시합니다.
+    """
+    if len(payload.alerts) > BATCH_MAX_ALERTS:
+        raise HTTPException(status_code=422, detail=f"too many alerts (max {BATCH_MAX_ALERTS})")
+
+    # 한 번에 정규화/검증
+    results: list[dict | None] = []
+    valid: list[tuple[str, str, str | None]] = []
+    for item in payload.alerts:
+        sym    = item.symbol.upper().replace("/", "")
+        action = item.action.upper()
+        if not sym or action not in ("BUY", "SELL"):
+            results.append({"symbol": sym, "action": action, "status": "invalid"})
+        else:
+            results.append(None)
+            valid.append((sym, action, item.id))
+
+    started = time.perf_counter()
+    try:
+        done = iter(await asyncio.to_thread(process_batch, valid, SOURCE_TRADINGVIEW))
     except Exception as e:
-        logger.exception(f"Error processing {action} for {sym}")
+        logger.exception("Error processing webhook batch")
         raise HTTPException(status_code=500, detail=str(e))
 
-    return {"status": "ok", "result": res}
\ No newline at end of file
+    return {
+        "count":    len(results),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results":  [r if r is not None else next(done) for r in results],
+    }
@@ -0,0 +1,171 @@
+# app/services/alerts.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.clients.exchange import order_key
+from app.config import SIGNAL_ENGINE, SIGNAL_CONFIRM_WINDOW, BATCH_WORKERS, ALERT_DEDUP_WINDOW
+from app.services.monitor import register_position
+from app.services.switching import switch_position
+from app.state import monitor_state
+
+logger = logging.getLogger("alerts")
+logger.setLevel(logging.INFO)
+
+SOURCE_TRADINGVIEW = "tradingview"
+SOURCE_LOCAL       = "local"
+
+# 같은 심볼의 신호는 한 번에 하나씩만 (다른 심볼끼리는 동시에)
+_locks_guard = threading.Lock()
+_symbol_locks: dict[str, threading.Lock] = {}
+
+_batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="alert-batch")
+
+
+def _symbol_lock(sym: str) -> threading.Lock:
+    with _locks_guard:
+        lock = _symbol_locks.get(sym)
+        if lock is None:
+            lock = _symbol_locks[sym] = threading.Lock()
+        return lock
+
+
+def _gate(sym: str, action: str, source: str) -> str | None:
+    """
+    신호 출처별 실행 여부 판단. 실행하면 None, 아니면 스킵 사유.
+
+    SIGNAL_ENGINE=off     : 모든 신호 실행
+    SIGNAL_ENGINE=primary : 로컬 엔진이 주 신호원, TradingView는 예비
+                            (같은 신호를 로컬이 이미 실행했으면 TradingView 쪽은 스킵)
+    SIGNAL_ENGINE=confirm : 두 출처가 SIGNAL_CONFIRM_WINDOW 안에 같은 방향을 내야 실행
+    """
+    if SIGNAL_ENGINE == "off":
+        return None
+
+    def _fn(s):
+        now = time.time()
+        signals = dict(s.get("signals") or {})
+        seen = dict(signals.get(sym) or {})
+        other = seen.get(SOURCE_LOCAL if source == SOURCE_TRADINGVIEW else SOURCE_TRADINGVIEW)
+        agreed = other is not None and other[0] == action and now - other[1] <= SIGNAL_CONFIRM_WINDOW
+
+        seen[source] = [action, now]
+        signals[sym] = seen
+        s["signals"] = signals
+
+        if SIGNAL_ENGINE == "confirm":
+            if not agreed:
+                return "awaiting_confirmation"
+            # 한 쌍의 신호로 한 번만 실행
+            seen.pop(SOURCE_LOCAL, None)
+            seen.pop(SOURCE_TRADINGVIEW, None)
+            return None
+        if source == SOURCE_TRADINGVIEW and agreed:
+            return "already_executed_locally"
+        return None
+
+    return monitor_state.transact(_fn)
+
+
+def _fallback_key(source: str, sym: str, action: str) -> str:
+    """
+    id 없는 알림의 신호 키. 같은 출처·심볼·방향 알림이 첫 알림 후 ALERT_DEDUP_WINDOW 초 안에
+    다시 오면(TradingView 재전송 등) 같은 키를 돌려줘 같은 clientOrderId 로 주문되게 합니다.
+    워커 간에 공유되도록 상태 저장소에 둡니다.
+    """
+    now = time.time()
+    slot = f"{source}|{sym}|{action}"
+
+    def _fn(s):
+        recent = {k: v for k, v in (s.get("alert_keys") or {}).items() if now - v[1] < ALERT_DEDUP_WINDOW}
+        if slot not in recent:
+            recent[slot] = [order_key(source, sym, action, time.time_ns()), now]
+        s["alert_keys"] = recent
+        return recent[slot][0]
+
+    return monitor_state.transact(_fn)
+
+
+def process_alert(sym: str, action: str, source: str = SOURCE_TRADINGVIEW, ref: str | None = None) -> dict:
+    """
+    웹훅과 로컬 신호 엔진이 공유하는 매매 파이프라인.
+    포지션 스위칭 후 체결 정보를 상태에 반영합니다.
+    ref 는 신호 고유값 (웹훅 재전송에도 같은 값이면 같은 clientOrderId 로 주문 → 중복 체결 없음).
+    없으면 ALERT_DEDUP_WINDOW 안의 같은 신호끼리 키를 공유합니다 (_fallback_key).
+    """
+    key = order_key(source, sym, action, ref) if ref else _fallback_key(source, sym, action)
+    with _symbol_lock(sym):
+        return _process(sym, action, source, key)
+
+
+def _process(sym: str, action: str, source: str, key: str) -> dict:
+    reason = _gate(sym, action, source)
+    if reason:
+        logger.info(f"Skipped {action} {sym} from {source}: {reason}")
+        return {"status": "skipped", "reason": reason}
+
+    # 포지션 스위칭 (청산 + 새 진입)
+    res = switch_position(sym, action, key)
+
+    # 이미 같은 방향 포지션이 있으면 스킵
+    if "skipped" in res:
+        logger.info(f"Skipped {action} {sym}: {res['skipped']}")
+        return {"status": "skipped", "reason": res["skipped"]}
+
+    # 정상 매매 체결 정보 반영
+    now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+
+    side = "LONG" if action == "BUY" else "SHORT"
+    info = res.get("buy" if action == "BUY" else "sell", {})
+    entry = float(info.get("entry", 0))
+    qty   = float(info.get("filled", 0))
+
+    # 리더의 모니터가 이 포지션에 소프트웨어 TP/SL 트리거를 건다
+    # (진입 후 브래킷 주문이 실패한 경우에도 체결된 수량은 등록해 소프트웨어 손절이 걸리게 함)
+    if res.get("error"):
+        logger.warning(f"{action} {sym} filled {qty} with errors: {res['error']}")
+    register_position(sym, side, entry, qty, now, venue=res.get("venue"))
+    monitor_state.update({
+        "symbol":         sym,
+        "side":           side,
+        "entry_price":    entry,
+        "position_qty":   qty,
+        "entry_time":     now,
+        "first_tp_done":  False,
+        "second_tp_done": False,
+        "sl_done":        False,
+    })
+
+    return {"status": "ok", "result": res}
+
+
+def process_batch(alerts: list[tuple[str, str, str | None]], source: str = SOURCE_TRADINGVIEW) -> list[dict]:
+    """
+    여러 (symbol, action, ref) 신호를 심볼별로 동시에 실행합니다.
+    같은 심볼의 신호는 들어온 순서대로 이어서 실행하고,
+    결과는 입력 순서대로 항목별 소요 시간(ms)과 함께 돌려줍니다.
+    """
+    by_symbol: dict[str, list[int]] = {}
+    for i, (sym, _, _) in enumerate(alerts):
+        by_symbol.setdefault(sym, []).append(i)
+
+    results: list[dict] = [{}] * len(alerts)
+
+    def _run(indexes: list[int]) -> None:
+        for i in indexes:
+            sym, action, ref = alerts[i]
+            started = time.perf_counter()
+            try:
+                res = process_alert(sym, action, source, ref)
+            except Exception as e:
+                logger.exception(f"Error processing {action} {sym} in batch")
+                res = {"status": "error", "error": str(e)}
+            results[i] = {"symbol": sym, "action": action, **res,
+                          "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    for fut in [_batch_pool.submit(_run, idx) for idx in by_symbol.values()]:
+        fut.result()
+    return results
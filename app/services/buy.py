@@ -1,159 +1,141 @@
 import logging
-import math
 import threading
 import time
 
 from binance.exceptions import BinanceAPIException
-from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
-from app.clients.binance_client import get_binance_client
-from app.config import DRY_RUN, TRADE_LEVERAGE, POLL_INTERVAL
-
-# 문자열 상수로 TP/SL 마켓 주문 타입 지정
-TP_MARKET = "TAKE_PROFIT_MARKET"
-SL_MARKET = "STOP_MARKET"
+from binance.enums import SIDE_BUY, SIDE_SELL
+from app.clients.exchange import client_order_id
+from app.clients.venues import get_venue
+from app.config import TRADE_LEVERAGE, POLL_INTERVAL
+from app.services.execution import execute_market
+from app.services.filters import entry_qty, bracket_plan
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def execute_buy(symbol: str) -> dict:
-    client = get_binance_client()
-
-    if DRY_RUN:
-        logger.info(f"[DRY_RUN] BUY {symbol}")
-        return {"skipped": "dry_run"}
+def execute_buy(symbol: str, close_qty: float = 0.0, ex=None, key: str | None = None) -> dict:
+    """
+    close_qty > 0 이면 반대 포지션 청산분을 같은 시장가 주문에 더해 한 번에 뒤집습니다.
+    (reduceOnly 정리는 호출하는 switch_position 이 이미 끝낸 상태)
+    ex 는 주문을 보낼 거래소 어댑터 (없으면 기본 거래소)
+    key 는 신호 키 (진입/TP/SL 주문의 clientOrderId 접두어, 재시도 시 중복 주문 방지)
+    """
+    ex = ex or get_venue()
 
     try:
         # 1) 레버리지 설정
-        client.futures_change_leverage(symbol=symbol, leverage=TRADE_LEVERAGE)
+        ex.set_leverage(symbol, TRADE_LEVERAGE)
         logger.info(f"Leverage set to {TRADE_LEVERAGE}x for {symbol}")
 
-        # 2) 기존 reduceOnly 주문 삭제
-        for order in client.futures_get_open_orders(symbol=symbol):
-            if order.get("reduceOnly"):
-                client.futures_cancel_order(symbol=symbol, orderId=order["orderId"])
-                logger.info(f"Canceled reduceOnly order {order['orderId']}")
+        # 2) 기존 reduceOnly 주문 삭제 (뒤집기면 이미 정리됨)
+        if not close_qty:
+            for order_id in ex.cancel_reduce_only(symbol):
+                logger.info(f"Canceled reduceOnly order {order_id}")
 
         # 3) 진입량 계산
-        balances = client.futures_account_balance()
-        usdt_balance = float(next(b["balance"] for b in balances if b["asset"] == "USDT"))
-        mark_price = float(client.futures_mark_price(symbol=symbol)["markPrice"])
-        allocation = usdt_balance * 0.98 * TRADE_LEVERAGE
-        raw_qty = allocation / mark_price
-
-        # 필터 정보 조회
-        info = client.futures_exchange_info()
-        sym_info = next(s for s in info["symbols"] if s["symbol"] == symbol)
-        lot_filter   = next(f for f in sym_info["filters"] if f["filterType"] == "LOT_SIZE")
-        price_filter = next(f for f in sym_info["filters"] if f["filterType"] == "PRICE_FILTER")
-        step_size    = float(lot_filter["stepSize"])
-        min_qty      = float(lot_filter["minQty"])
-        tick_size    = float(price_filter["tickSize"])
-
-        # precision 계산
-        qty_precision   = int(round(-math.log10(step_size), 0))
-        price_precision = int(round(-math.log10(tick_size), 0))
-
-        # 4) 주문 수량: 셋째 자리에서 내림
-        qty = math.floor(raw_qty / step_size) * step_size
+        usdt_balance = ex.balance("USDT")
+        mark_price   = ex.mark_price(symbol)
+
+        # LOT_SIZE & PRICE_FILTER 정보 (심볼별 캐시)
+        f               = ex.symbol_filters(symbol)
+        step_size       = f["step_size"]
+        min_qty         = f["min_qty"]
+        qty_precision   = f["qty_precision"]
+        price_precision = f["price_precision"]
+
+        # 4) 주문 수량: 잔고 98% × 레버리지, stepSize 단위로 내림
+        qty = entry_qty(usdt_balance, mark_price, TRADE_LEVERAGE, step_size)
         if qty < min_qty:
             logger.warning(f"Qty {qty} < minQty {min_qty}. Skipping BUY.")
             return {"skipped": "quantity_too_low"}
-        qty_str = f"{qty:.{qty_precision}f}"
-
-        # 5) 시장가 진입
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_BUY,
-            type=ORDER_TYPE_MARKET,
-            quantity=qty_str
-        )
-        logger.info(f"Market BUY submitted: {order}")
-
-        details = client.futures_get_order(symbol=symbol, orderId=order["orderId"])
-        entry_price  = float(details["avgPrice"])
-        executed_qty = float(details["executedQty"])
+
+        # 5) 진입 (큰 주문은 분할 실행) — 브래킷은 실제 체결 수량 기준
+        order_qty    = round(qty + close_qty, qty_precision)
+        execution    = execute_market(ex, symbol, SIDE_BUY, order_qty, f, mark_price, key)
+        entry_price  = execution["avg_price"]
+        # 청산분을 뺀 나머지가 새 포지션
+        executed_qty = round(execution["executed_qty"] - close_qty, qty_precision)
+        if executed_qty < min_qty:
+            logger.error(f"BUY {symbol} not filled: {execution}")
+            return {"skipped": "not_filled", "execution": execution}
         logger.info(f"Entry LONG: {executed_qty}@{entry_price}")
 
-        # 6) TP/SL 가격 올림 함수
-        def ceil_price(price: float) -> float:
-            factor = 10 ** price_precision
-            return math.ceil(price * factor) / factor
-
-        # 1차 TP: +0.5% → 30%
-        tp1_price = ceil_price(entry_price * 1.005)
-        tp1_qty   = math.floor(executed_qty * 0.30 / step_size) * step_size
-        tp1_price_str = f"{tp1_price:.{price_precision}f}"
-        tp1_qty_str   = f"{tp1_qty:.{qty_precision}f}"
-        order_tp1 = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_SELL,
-            type=TP_MARKET,
-            stopPrice=tp1_price_str,
-            reduceOnly=True,
-            quantity=tp1_qty_str
-        )
-
-        # 2차 TP: +1.1% → 남은 물량의 50%
-        remain_after_tp1 = executed_qty - tp1_qty
-        tp2_qty   = math.floor(remain_after_tp1 * 0.50 / step_size) * step_size
-        tp2_price = ceil_price(entry_price * 1.011)
-        tp2_price_str = f"{tp2_price:.{price_precision}f}"
-        tp2_qty_str   = f"{tp2_qty:.{qty_precision}f}"
-        order_tp2 = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_SELL,
-            type=TP_MARKET,
-            stopPrice=tp2_price_str,
-            reduceOnly=True,
-            quantity=tp2_qty_str
-        )
-
-        # 기본 SL: -0.5% → 전체 수량
-        sl_price = ceil_price(entry_price * 0.995)
-        sl_price_str = f"{sl_price:.{price_precision}f}"
-        sl_qty_str   = f"{executed_qty:.{qty_precision}f}"
-        order_sl = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_SELL,
-            type=SL_MARKET,
-            stopPrice=sl_price_str,
-            reduceOnly=True,
-            quantity=sl_qty_str
-        )
-
-        logger.info(
-            f"Placed TP1 @ {tp1_price_str} x{tp1_qty_str}, "
-            f"TP2 @ {tp2_price_str} x{tp2_qty_str}, "
-            f"SL @ {sl_price_str} x{sl_qty_str}"
-        )
+        # 6) TP/SL 가격·수량
+        plan = bracket_plan("LONG", entry_price, executed_qty, f)
+
+        # 여기부터는 진입이 체결된 뒤: 실패해도 체결 결과를 돌려줘 포지션(소프트웨어 TP/SL)이 등록되게 함
+        result = {
+            "buy": {"filled": executed_qty, "entry": entry_price, "closed": close_qty},
+            "execution": execution,
+            "venue":     ex.name,
+        }
+        orders = {}
+        try:
+            # 1차 TP: +0.5% → 30%
+            tp1_price = plan["tp1_price"]
+            tp1_qty   = plan["tp1_qty"]
+            tp1_price_str = f"{tp1_price:.{price_precision}f}"
+            tp1_qty_str   = f"{tp1_qty:.{qty_precision}f}"
+            order_tp1 = ex.stop_order(symbol, SIDE_SELL, tp1_qty, tp1_price, take_profit=True,
+                                      client_id=client_order_id(key, "tp1"))
+            orders["tp1_orderId"] = order_tp1["id"]
+
+            # 2차 TP: +1.1% → 남은 물량의 50%
+            remain_after_tp1 = plan["remain_after_tp1"]
+            tp2_qty   = plan["tp2_qty"]
+            tp2_price = plan["tp2_price"]
+            tp2_price_str = f"{tp2_price:.{price_precision}f}"
+            tp2_qty_str   = f"{tp2_qty:.{qty_precision}f}"
+            order_tp2 = ex.stop_order(symbol, SIDE_SELL, tp2_qty, tp2_price, take_profit=True,
+                                      client_id=client_order_id(key, "tp2"))
+            orders["tp2_orderId"] = order_tp2["id"]
+
+            # 기본 SL: -0.5% → 전체 수량
+            sl_price = plan["sl_price"]
+            sl_price_str = f"{sl_price:.{price_precision}f}"
+            sl_qty_str   = f"{executed_qty:.{qty_precision}f}"
+            order_sl = ex.stop_order(symbol, SIDE_SELL, executed_qty, sl_price,
+                                     client_id=client_order_id(key, "sl"))
+            orders["sl_orderId"] = order_sl["id"]
+
+            logger.info(
+                f"Placed TP1 @ {tp1_price_str} x{tp1_qty_str}, "
+                f"TP2 @ {tp2_price_str} x{tp2_qty_str}, "
+                f"SL @ {sl_price_str} x{sl_qty_str}"
+            )
+        except Exception as e:
+            logger.exception(f"Bracket orders failed after BUY {symbol} filled: {e}")
+            if "sl_orderId" not in orders:
+                # 손절만은 한 번 더 (같은 clientOrderId: 앞선 시도가 실제로 들어갔으면 그 주문을 찾음)
+                try:
+                    orders["sl_orderId"] = ex.stop_order(symbol, SIDE_SELL, executed_qty,
+                                                         plan["sl_price"],
+                                                         client_id=client_order_id(key, "sl"))["id"]
+                except Exception:
+                    logger.exception(f"SL retry failed for {symbol}, relying on software SL")
+            return {**result, "orders": orders, "error": str(e)}
 
         # 7) TP1 체결 모니터링 및 SL 이동
         def _monitor_tp1():
             try:
                 while True:
                     time.sleep(POLL_INTERVAL)
-                    tp1_info = client.futures_get_order(symbol=symbol, orderId=order_tp1["orderId"])
+                    tp1_info = ex.get_order(symbol, order_tp1["id"])
                     if tp1_info.get("status") == "FILLED":
                         # 기존 SL 취소
-                        client.futures_cancel_order(symbol=symbol, orderId=order_sl["orderId"])
-                        logger.info(f"Canceled SL {order_sl['orderId']} after TP1")
+                        ex.cancel_order(symbol, order_sl["id"])
+                        logger.info(f"Canceled SL {order_sl['id']} after TP1")
 
                         # 남은 물량에 대해 SL 재설정 (+0.1%)
-                        new_sl_price = ceil_price(entry_price * 1.001)
+                        new_sl_price = plan["sl2_price"]
                         new_sl_price_str = f"{new_sl_price:.{price_precision}f}"
                         remain_str = f"{remain_after_tp1:.{qty_precision}f}"
-                        new_sl_order = client.futures_create_order(
-                            symbol=symbol,
-                            side=SIDE_SELL,
-                            type=SL_MARKET,
-                            stopPrice=new_sl_price_str,
-                            reduceOnly=True,
-                            quantity=remain_str
-                        )
+                        new_sl_order = ex.stop_order(symbol, SIDE_SELL, remain_after_tp1, new_sl_price,
+                                                     client_id=client_order_id(key, "sl2"))
                         logger.info(
                             f"Moved SL to +0.1% @ {new_sl_price_str} x{remain_str}, "
-                            f"new SL id {new_sl_order['orderId']}"
+                            f"new SL id {new_sl_order['id']}"
                         )
                         break
             except Exception as e:
@@ -161,14 +143,7 @@ def execute_buy(symbol: str) -> dict:
 
         threading.Thread(target=_monitor_tp1, daemon=True).start()
 
-        return {
-            "buy": {"filled": executed_qty, "entry": entry_price},
-            "orders": {
-                "tp1_orderId": order_tp1["orderId"],
-                "tp2_orderId": order_tp2["orderId"],
-                "sl_orderId":  order_sl["orderId"],
-            }
-        }
+        return {**result, "orders": orders}
 
     except BinanceAPIException as e:
         logger.error(f"Buy order failed: {e}")
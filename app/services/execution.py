@@ -0,0 +1,184 @@
+# app/services/execution.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.clients.exchange import client_order_id
+from app.config import (
+    EXEC_MODE, SLICE_MIN_NOTIONAL, SLICE_COUNT, EXEC_DEADLINE,
+    EXEC_MAX_SLIPPAGE_BPS, TWAP_SECONDS, BATCH_WORKERS,
+)
+from app.services.filters import floor_qty, floor_price, ceil_price
+from app.state import monitor_state
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 공유 상태에 남겨둘 최근 체결 통계 개수
+EXECUTION_HISTORY = 50
+
+# 묶음 웹훅이 여러 심볼을 동시에 실행하므로 심볼마다 한 라운드를 통째로 보낼 수 있게
+# (스레드는 필요할 때만 만들어짐)
+_pool = ThreadPoolExecutor(max_workers=max(SLICE_COUNT, 1) * max(BATCH_WORKERS, 1),
+                           thread_name_prefix="exec-slice")
+
+
+def _book_prices(book_side: list, qty: float, slices: int, cap: float, is_buy: bool) -> list[float]:
+    """
+    호가를 따라가며 i번째 자식 주문이 (i+1)/slices 만큼의 누적 수량을 채우는 데
+    필요한 가격을 구합니다. 가격은 cap(마크 ± 최대 슬리피지)을 넘지 않습니다.
+    """
+    prices = []
+    cum = 0.0
+    level = 0
+    for i in range(1, slices + 1):
+        target = qty * i / slices
+        while level < len(book_side) and cum + float(book_side[level][1]) < target:
+            cum += float(book_side[level][1])
+            level += 1
+        price = float(book_side[min(level, len(book_side) - 1)][0]) if book_side else cap
+        prices.append(min(price, cap) if is_buy else max(price, cap))
+    return prices
+
+
+def _ioc_round(ex, symbol, side, remaining, f, mark, next_id) -> list[dict]:
+    """호가 기반 IOC 지정가 자식 주문을 동시에 보내고 응답을 모읍니다."""
+    is_buy = side == "BUY"
+    book = ex.order_book(symbol, limit=50)
+    book_side = book["asks"] if is_buy else book["bids"]
+    bps = EXEC_MAX_SLIPPAGE_BPS / 10000
+    cap = mark * (1 + bps) if is_buy else mark * (1 - bps)
+
+    slices = max(1, min(SLICE_COUNT, int(remaining / f["min_qty"])))
+    child_qty = floor_qty(remaining / slices, f["step_size"])
+    if child_qty < f["min_qty"]:
+        slices, child_qty = 1, remaining
+    prices = _book_prices(book_side, remaining, slices, cap, is_buy)
+
+    pp = f["price_precision"]
+    orders = []
+    for i, price in enumerate(prices):
+        # 마지막 조각이 내림 오차를 흡수
+        q = child_qty if i < slices - 1 else remaining - child_qty * (slices - 1)
+        q = floor_qty(q, f["step_size"])
+        if q < f["min_qty"]:
+            continue
+        p = ceil_price(price, pp) if is_buy else floor_price(price, pp)
+        orders.append((q, p))
+
+    futures = [_pool.submit(ex.limit_ioc, symbol, side, q, p, next_id()) for q, p in orders]
+    results = []
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception:
+            logger.exception(f"IOC slice failed for {symbol}")
+    return results
+
+
+def execute_market(ex, symbol: str, side: str, qty: float, f: dict, mark: float,
+                   key: str | None = None) -> dict:
+    """
+    진입/전환 주문 실행.
+    명목금액이 SLICE_MIN_NOTIONAL 미만이면 시장가 한 번, 이상이면 EXEC_MODE 에 따라
+    IOC 지정가 분할(ioc) 또는 시간 분할 시장가(twap) 로 나눠 보내고,
+    EXEC_DEADLINE 이 지나면 남은 수량을 시장가로 마무리합니다.
+
+    ex 는 거래소 어댑터(app/clients/exchange.py).
+    key 는 신호 키 (자식 주문 clientOrderId 를 {key}-e1, e2 ... 로 붙여 중복 제출을 막음)
+    반환: executed_qty, avg_price, mark_price, slippage_bps, fill_ms, children, mode, venue
+    (브래킷은 반드시 executed_qty 기준으로 걸 것)
+    자식 주문이 일부 체결된 뒤 주문 에러가 나면 예외 대신 그때까지의 체결과 error 를 돌려줍니다.
+    (아무것도 체결되지 않았으면 예외를 그대로 올림)
+    """
+    started = time.perf_counter()
+    deadline = started + EXEC_DEADLINE
+    mode = EXEC_MODE if qty * mark >= SLICE_MIN_NOTIONAL else "single"
+
+    fills = []      # (수량, 가격)
+    children = 0
+    sent = 0
+
+    def _next_id():
+        nonlocal sent
+        sent += 1
+        return client_order_id(key, f"e{sent}")
+
+    def _take(resp):
+        nonlocal children
+        children += 1
+        q, p = resp["executed_qty"], resp["avg_price"]
+        if q > 0:
+            fills.append((q, p))
+
+    def _remaining():
+        return floor_qty(qty - sum(q for q, _ in fills), f["step_size"])
+
+    error = None
+    try:
+        if mode == "ioc":
+            while time.perf_counter() < deadline and _remaining() >= f["min_qty"]:
+                before = len(fills)
+                for resp in _ioc_round(ex, symbol, side, _remaining(), f, mark, _next_id):
+                    _take(resp)
+                if len(fills) == before:
+                    break   # 상한 가격 안에 호가가 없음 → 시장가로 마무리
+
+        elif mode == "twap":
+            slices = max(1, SLICE_COUNT)
+            gap = min(TWAP_SECONDS, EXEC_DEADLINE) / slices
+            child_qty = floor_qty(qty / slices, f["step_size"])
+            for i in range(slices - 1):
+                if child_qty < f["min_qty"] or time.perf_counter() >= deadline:
+                    break
+                _take(ex.market_order(symbol, side, child_qty, client_id=_next_id()))
+                time.sleep(gap)
+
+        # 단일 주문, 또는 분할 후 남은 수량
+        remaining = _remaining()
+        if remaining >= f["min_qty"]:
+            _take(ex.market_order(symbol, side, remaining, client_id=_next_id()))
+    except Exception as e:
+        if not fills:
+            raise
+        # 이미 체결된 수량은 호출한 쪽이 브래킷을 걸 수 있도록 돌려줌
+        logger.exception(f"Execution of {side} {symbol} failed after partial fills")
+        error = str(e)
+
+    executed = sum(q for q, _ in fills)
+    avg_price = sum(q * p for q, p in fills) / executed if executed else 0.0
+    if side == "BUY":
+        slippage_bps = (avg_price / mark - 1) * 10000 if executed else 0.0
+    else:
+        slippage_bps = (1 - avg_price / mark) * 10000 if executed else 0.0
+
+    result = {
+        "symbol":       symbol,
+        "venue":        ex.name,
+        "side":         side,
+        "mode":         mode,
+        "requested":    qty,
+        "executed_qty": executed,
+        "avg_price":    avg_price,
+        "mark_price":   mark,
+        "slippage_bps": round(slippage_bps, 2),
+        "fill_ms":      round((time.perf_counter() - started) * 1000, 1),
+        "children":     children,
+    }
+    if error:
+        result["error"] = error
+    logger.info(
+        f"Executed {side} {symbol} {executed}/{qty} @ {avg_price} on {ex.name} via {mode} "
+        f"({children} orders, {result['fill_ms']}ms, slippage {result['slippage_bps']}bp)"
+    )
+    _record_execution(result)
+    return result
+
+
+def _record_execution(result: dict) -> None:
+    """신호별 체결 통계를 공유 상태에 최근 EXECUTION_HISTORY 개까지 보관"""
+    entry = {**result, "time": time.time()}
+
+    def _fn(s):
+        s["executions"] = (list(s.get("executions") or []) + [entry])[-EXECUTION_HISTORY:]
+    monitor_state.transact(_fn)
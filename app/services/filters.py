@@ -0,0 +1,94 @@
+# app/services/filters.py
+
+import math
+import threading
+import time
+
+# 거래소 정보는 거의 바뀌지 않으므로 심볼별 색인으로 캐시
+EXCHANGE_INFO_TTL = 3600
+
+_lock  = threading.Lock()
+_cache = {"at": 0.0, "symbols": {}}
+
+
+def _index_exchange_info(info: dict) -> dict:
+    """futures_exchange_info 응답을 {symbol: 필터 dict} 로 변환"""
+    symbols = {}
+    for s in info["symbols"]:
+        filters = {f["filterType"]: f for f in s["filters"]}
+        lot   = filters.get("LOT_SIZE")
+        price = filters.get("PRICE_FILTER")
+        if lot is None or price is None:
+            continue
+        step_size = float(lot["stepSize"])
+        tick_size = float(price["tickSize"])
+        symbols[s["symbol"]] = {
+            "step_size":       step_size,
+            "min_qty":         float(lot["minQty"]),
+            "tick_size":       tick_size,
+            "qty_precision":   int(round(-math.log10(step_size), 0)),
+            "price_precision": int(round(-math.log10(tick_size), 0)),
+        }
+    return symbols
+
+
+def get_symbol_filters(client, symbol: str) -> dict:
+    """
+    심볼의 LOT_SIZE / PRICE_FILTER 정보.
+    step_size, min_qty, tick_size, qty_precision, price_precision
+    """
+    with _lock:
+        if time.time() - _cache["at"] > EXCHANGE_INFO_TTL or symbol not in _cache["symbols"]:
+            _cache["symbols"] = _index_exchange_info(client.futures_exchange_info())
+            _cache["at"] = time.time()
+        return _cache["symbols"][symbol]
+
+
+def floor_qty(qty: float, step_size: float) -> float:
+    """수량을 stepSize 단위로 내림 (합산/차감한 수량의 부동소수 오차로 한 칸 덜 내려가지 않도록 보정)"""
+    return math.floor(qty / step_size + 1e-9) * step_size
+
+
+def floor_price(price: float, price_precision: int) -> float:
+    """가격을 price_precision 자리로 내림"""
+    factor = 10 ** price_precision
+    return math.floor(price * factor) / factor
+
+
+def ceil_price(price: float, price_precision: int) -> float:
+    """가격을 price_precision 자리로 올림"""
+    factor = 10 ** price_precision
+    return math.ceil(price * factor) / factor
+
+
+def entry_qty(balance: float, mark_price: float, leverage: int, step_size: float) -> float:
+    """진입 수량: 잔고의 98% × 레버리지 ÷ 마크가격을 stepSize 단위로 내림"""
+    raw_qty = balance * 0.98 * leverage / mark_price
+    return math.floor(raw_qty / step_size) * step_size
+
+
+# 진입가 대비 배수: 1차 TP, 2차 TP, 기본 SL, 1차 TP 후 옮긴 SL
+_BRACKET_RATIOS = {
+    "LONG":  (1.005, 1.011, 0.995, 1.001),
+    "SHORT": (0.995, 0.989, 1.005, 1.001),
+}
+
+
+def bracket_plan(side: str, entry_price: float, executed_qty: float, f: dict) -> dict:
+    """
+    체결 결과 → 브래킷 주문 가격/수량 (execute_buy / execute_sell 의 6) 단계).
+    TP1 은 30%, TP2 는 남은 물량의 50%, SL 은 전량. 가격은 올림, 수량은 stepSize 단위로 내림.
+    """
+    tp1, tp2, sl, sl2 = _BRACKET_RATIOS[side]
+    step_size, price_precision = f["step_size"], f["price_precision"]
+    tp1_qty = math.floor(executed_qty * 0.30 / step_size) * step_size
+    remain_after_tp1 = executed_qty - tp1_qty
+    return {
+        "tp1_price":        ceil_price(entry_price * tp1, price_precision),
+        "tp1_qty":          tp1_qty,
+        "remain_after_tp1": remain_after_tp1,
+        "tp2_price":        ceil_price(entry_price * tp2, price_precision),
+        "tp2_qty":          math.floor(remain_after_tp1 * 0.50 / step_size) * step_size,
+        "sl_price":         ceil_price(entry_price * sl, price_precision),
+        "sl2_price":        ceil_price(entry_price * sl2, price_precision),
+    }
@@ -0,0 +1,289 @@
+# app/services/history.py
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from app.config import STATE_BACKEND, STATE_SHM_NAME, HISTORY_CAPACITY, HISTORY_SAMPLE_SEC
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 버퍼 레이아웃 (모두 double): [head, count, capacity, ts × cap, price × cap, pnl × cap, qty × cap]
+_HEADER = 3
+FIELDS  = ("t", "price", "pnl", "qty")
+
+
+class SeriesRing:
+    """
+    심볼 하나의 시각/가격/PnL/수량 고정 크기 링버퍼.
+    STATE_BACKEND=shm 이면 공유 메모리 위에 만들어 다른 워커도 같은 기록을 읽습니다.
+    (쓰기는 모니터를 돌리는 리더 한 곳에서만)
+    """
+
+    def __init__(self, capacity: int, buf: memoryview, shm: SharedMemory | None = None,
+                 views: tuple = ()):
+        self.capacity = capacity
+        self._buf = buf
+        self._shm = shm
+        # shm.close() 전에 풀어야 하는 중간 memoryview 들
+        self._views = views
+
+    @classmethod
+    def local(cls, capacity: int) -> "SeriesRing":
+        data = array("d", bytes(8 * (_HEADER + 4 * capacity)))
+        data[2] = capacity
+        return cls(capacity, memoryview(data))
+
+    @classmethod
+    def shared(cls, name: str, capacity: int, create: bool) -> "SeriesRing | None":
+        size = 8 * (_HEADER + 4 * capacity)
+        try:
+            shm = SharedMemory(name=name, create=True, size=size) if create else SharedMemory(name=name)
+        except FileExistsError:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+        resource_tracker.unregister(shm._name, "shared_memory")
+        raw  = shm.buf[:shm.size // 8 * 8]
+        view = raw.cast("d")
+        if view[2] == 0:
+            view[2] = capacity
+        # 다른 HISTORY_CAPACITY 로 만들어진 세그먼트는 그 용량을 따름
+        capacity = int(view[2])
+        return cls(capacity, view[:_HEADER + 4 * capacity], shm, (view, raw))
+
+    def close(self, unlink: bool = False) -> None:
+        """버퍼 해제. unlink=True 면 공유 메모리 세그먼트도 삭제"""
+        self._buf.release()
+        for view in self._views:
+            view.release()
+        if self._shm is not None:
+            self._shm.close()
+            if unlink:
+                # 생성 시 해제한 추적 등록을 되돌려야 unlink 가 resource_tracker 에러를 내지 않음
+                resource_tracker.register(self._shm._name, "shared_memory")
+                self._shm.unlink()
+
+    def append(self, t: float, price: float, pnl: float, qty: float) -> None:
+        buf, cap = self._buf, self.capacity
+        head, count = int(buf[0]), int(buf[1])
+        if count and t - buf[_HEADER + (head - 1) % cap] < HISTORY_SAMPLE_SEC:
+            return   # 샘플 간격보다 촘촘한 틱은 버림
+        base = _HEADER + head
+        buf[base]           = t
+        buf[base + cap]     = price
+        buf[base + 2 * cap] = pnl
+        buf[base + 3 * cap] = qty
+        # 값을 먼저 쓰고 위치를 나중에 갱신 (읽는 쪽이 빈 칸을 보지 않도록)
+        buf[1] = min(count + 1, cap)
+        buf[0] = (head + 1) % cap
+
+    def last(self, max_age: float) -> float | None:
+        buf, cap = self._buf, self.capacity
+        if not int(buf[1]):
+            return None
+        i = _HEADER + (int(buf[0]) - 1) % cap
+        if time.time() - buf[i] > max_age:
+            return None
+        return buf[i + cap]
+
+    def series(self) -> dict[str, list[float]]:
+        """시간순으로 정렬된 전체 기록"""
+        buf, cap = self._buf, self.capacity
+        head, count = int(buf[0]), int(buf[1])
+        start = (head - count) % cap
+        out = {}
+        for i, field in enumerate(FIELDS):
+            base = _HEADER + i * cap
+            if start + count <= cap:
+                out[field] = buf[base + start:base + start + count].tolist()
+            else:
+                out[field] = buf[base + start:base + cap].tolist() + buf[base:base + head].tolist()
+        return out
+
+
+# 링 하나가 약 32 × HISTORY_CAPACITY 바이트이므로, 포지션이 있는 심볼만 기록하고
+# 포지션이 사라지면 release() 로 해제합니다 (모니터를 돌리는 리더가 호출).
+_lock = threading.Lock()
+_rings: dict[str, SeriesRing] = {}      # 이 프로세스가 쓰는 링
+_backend = STATE_BACKEND                # isolated() 안에서는 "local"
+
+
+def _shm_name(symbol: str) -> str:
+    return f"{STATE_SHM_NAME}_hist_{symbol}"
+
+
+def _ring(symbol: str) -> SeriesRing:
+    with _lock:
+        ring = _rings.get(symbol)
+        if ring is None:
+            if _backend == "shm":
+                ring = SeriesRing.shared(_shm_name(symbol), HISTORY_CAPACITY, create=True)
+            else:
+                ring = SeriesRing.local(HISTORY_CAPACITY)
+            _rings[symbol] = ring
+        return ring
+
+
+@contextmanager
+def _reader(symbol: str):
+    """
+    읽기용 링. 이 프로세스가 쓰는 링이 아니면 (shm 모드의 다른 워커) 읽는 동안만 열어,
+    리더가 해제/재생성한 세그먼트를 붙잡고 있지 않도록 합니다.
+    """
+    with _lock:
+        ring = _rings.get(symbol)
+        if ring is not None or _backend != "shm":
+            # 읽는 도중 release() 로 닫히지 않도록 잠금을 잡은 채로 읽음
+            yield ring
+            return
+    ring = SeriesRing.shared(_shm_name(symbol), HISTORY_CAPACITY, create=False)
+    try:
+        yield ring
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+def record_sample(symbol: str, price: float, pnl: float, qty: float) -> None:
+    """모니터가 가격 틱마다 호출 (HISTORY_SAMPLE_SEC 간격으로만 저장)"""
+    _ring(symbol).append(time.time(), price, pnl, qty)
+
+
+def release(symbol: str) -> None:
+    """포지션이 사라진 심볼의 기록을 해제 (shm 모드면 세그먼트 삭제)"""
+    with _lock:
+        ring = _rings.pop(symbol, None)
+    if ring is not None:
+        ring.close(unlink=True)
+
+
+def prune(keep) -> list[str]:
+    """
+    keep 에 없는 심볼의 기록을 모두 해제. 새 리더가 시작할 때 호출해
+    이전 프로세스가 남긴 /dev/shm 세그먼트도 정리합니다.
+    """
+    keep = set(keep)
+    with _lock:
+        symbols = [s for s in _rings if s not in keep]
+    for symbol in symbols:
+        release(symbol)
+    if _backend == "shm" and os.path.isdir("/dev/shm"):
+        prefix = _shm_name("")
+        for name in os.listdir("/dev/shm"):
+            symbol = name[len(prefix):]
+            if name.startswith(prefix) and symbol not in keep:
+                try:
+                    os.unlink(os.path.join("/dev/shm", name))
+                except OSError:
+                    continue
+                symbols.append(symbol)
+    return symbols
+
+
+@contextmanager
+def isolated():
+    """
+    이 안에서는 운영 중인 링(shm 세그먼트 포함)을 건드리지 않고 프로세스 로컬 링만 씀.
+    재생처럼 가짜 가격을 모니터에 흘려보낼 때 사용하며, 나올 때 그 링들은 버립니다.
+    """
+    global _backend, _rings
+    with _lock:
+        saved = _backend, _rings
+        _backend, _rings = "local", {}
+    try:
+        yield
+    finally:
+        with _lock:
+            _backend, _rings = saved
+
+
+def last_price(symbol: str, max_age: float = 60.0) -> float | None:
+    """가장 최근 기록 가격 (max_age 초보다 오래됐거나 기록이 없으면 None)"""
+    with _reader(symbol) as ring:
+        return ring.last(max_age) if ring else None
+
+
+# ── 다운샘플링 ───────────────────────────────────────────
+def lttb(xs: list[float], ys: list[float], n: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: 모양을 보존하며 n개 인덱스를 고릅니다."""
+    size = len(xs)
+    if n >= size or n < 3:
+        return list(range(size))
+
+    picked = [0]
+    every = (size - 2) / (n - 2)
+    a = 0
+    for i in range(n - 2):
+        # 다음 버킷의 평균점
+        nxt_start = int((i + 1) * every) + 1
+        nxt_end   = min(int((i + 2) * every) + 1, size)
+        span = nxt_end - nxt_start
+        avg_x = sum(xs[nxt_start:nxt_end]) / span
+        avg_y = sum(ys[nxt_start:nxt_end]) / span
+
+        # 현재 버킷에서 삼각형 넓이가 가장 큰 점
+        start = int(i * every) + 1
+        end   = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+
+    picked.append(size - 1)
+    return picked
+
+
+def minmax(ys: list[float], n: int) -> list[int]:
+    """버킷마다 최저/최고점을 남깁니다 (스파이크 보존, 최대 n개)."""
+    size = len(ys)
+    if n >= size or n < 2:
+        return list(range(size))
+
+    buckets = n // 2
+    picked = []
+    for b in range(buckets):
+        start = b * size // buckets
+        end   = (b + 1) * size // buckets
+        if start >= end:
+            continue
+        seg = ys[start:end]
+        lo = start + seg.index(min(seg))
+        hi = start + seg.index(max(seg))
+        picked.extend(sorted({lo, hi}))
+    return picked
+
+
+def chart(symbol: str, points: int = 500, method: str = "lttb", window: float | None = None) -> dict:
+    """
+    심볼의 가격/PnL/수량 기록을 points 개 이하로 줄여 반환합니다.
+    선택은 가격 시리즈 기준이며, 같은 인덱스의 PnL/수량을 함께 돌려줍니다.
+    """
+    with _reader(symbol) as ring:
+        data = ring.series() if ring else {field: [] for field in FIELDS}
+
+    if window and data["t"]:
+        start = bisect.bisect_left(data["t"], time.time() - window)
+        data = {field: values[start:] for field, values in data.items()}
+
+    if method == "minmax":
+        idx = minmax(data["price"], points)
+    else:
+        idx = lttb(data["t"], data["price"], points)
+
+    return {
+        "symbol": symbol,
+        "method": method,
+        "total":  len(data["t"]),
+        **{field: [data[field][i] for i in idx] for field in FIELDS},
+    }
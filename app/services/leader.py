@@ -0,0 +1,105 @@
+# app/services/leader.py
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from app.config import LEADER_LEASE_TTL
+from app.store import StateStore, get_store
+
+logger = logging.getLogger("leader")
+logger.setLevel(logging.INFO)
+
+
+class LeaderElector:
+    """
+    저장소 임대(lease) 기반 리더 선출.
+    여러 워커/노드 중 하나만 모니터·주문 관리를 담당하고,
+    나머지는 웹훅 수신과 대시보드만 처리합니다.
+
+    리더가 멈췄다가 돌아와도 주문을 내지 못하도록,
+    주문 직전에 check_fence()로 자신의 펜싱 토큰이 여전히 최신인지 확인합니다.
+    """
+
+    def __init__(self, store: StateStore, name: str = "monitor", ttl: float = LEADER_LEASE_TTL):
+        self.store = store
+        self.name  = name
+        self.ttl   = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._token: int | None = None
+        self._ready = False              # on_elected 가 준비 완료를 알렸는지 (현재 토큰 기준)
+        self._valid_until = 0.0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def token(self) -> int | None:
+        return self._token if self.is_leader() else None
+
+    def is_leader(self) -> bool:
+        # 갱신이 밀려 임대가 만료됐을 수 있으면 스스로 리더가 아닌 것으로 간주
+        return self._token is not None and time.monotonic() < self._valid_until
+
+    def check_fence(self) -> bool:
+        """저장소 기준으로 내 토큰이 현재 유효한 임대인지 확인 (주문 직전 호출)."""
+        if not self.is_leader():
+            return False
+        holder = self.store.lease_holder(self.name)
+        return holder == (self.owner, self._token)
+
+    def campaign(self, on_elected=None) -> bool:
+        """
+        임대 획득/갱신을 한 번 시도하고 리더 여부를 반환합니다.
+        on_elected(token) 은 리더가 된 뒤 참을 돌려줄 때까지 갱신마다 다시 불립니다
+        (시작 작업이 실패해도 임대를 계속 갱신하는 동안 다시 시도되도록).
+        """
+        started = time.monotonic()
+        try:
+            token = self.store.acquire_lease(self.name, self.owner, self.ttl)
+        except Exception:
+            logger.exception("Lease renewal failed")
+            token = None
+
+        if token is None:
+            if self._token is not None:
+                logger.warning(f"Lost leadership (token {self._token})")
+            self._token = None
+            return False
+
+        # 갱신 요청 시작 시각 기준으로 만료를 잡아 저장소보다 먼저 물러나도록 함
+        self._valid_until = started + self.ttl * 0.8
+        if self._token != token:
+            self._token = token
+            self._ready = False
+            logger.info(f"Elected leader {self.owner} (fencing token {token})")
+        if on_elected and not self._ready:
+            try:
+                self._ready = bool(on_elected(token))
+            except Exception:
+                logger.exception("on_elected callback failed")
+        return True
+
+    def start(self, on_elected=None) -> None:
+        """백그라운드에서 임대를 주기적으로 획득/갱신합니다."""
+        if self._thread is not None:
+            return
+
+        def _loop():
+            while not self._stop.is_set():
+                self.campaign(on_elected)
+                self._stop.wait(self.ttl / 3)
+
+        self._thread = threading.Thread(target=_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._token is not None:
+            self.store.release_lease(self.name, self.owner)
+        self._token = None
+
+
+elector = LeaderElector(get_store())
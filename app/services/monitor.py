@@ -7,137 +7,396 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from binance import ThreadedWebsocketManager
 from app.clients.binance_client import get_binance_client
+from app.clients.exchange import order_key, client_order_id, note_order_event, is_signal_order
+from app.clients.venues import get_venue, BINANCE, PRIMARY
 from app.state import monitor_state
-from app.config import POLL_INTERVAL, TP_RATIO, SL_RATIO
+from app.config import DRY_RUN, POLL_INTERVAL, TP_RATIO, SL_RATIO, TP2_RATIO, BE_RATIO, TRAIL_RATIO
+from app.services.history import record_sample, last_price, prune
+from app.services.leader import elector
+from app.services.recorder import record, USER_EVENT, PRICE, POSITION
+from app.services.triggers import TriggerEngine, ABOVE, BELOW
 
 logger = logging.getLogger("monitor")
 logger.setLevel(logging.INFO)
 
+_started = False
+_start_lock = threading.Lock()
+
+# 리더 프로세스에서만 사용하는 트리거 색인
+_engine = TriggerEngine()
+# symbol → {"key": 포지션 식별자, "SL": trigger id, ...}
+_armed: dict[str, dict] = {}
+_synced_version = -1
+_synced_token   = None
+# symbol → 이 프로세스가 마지막으로 본 가격 (트레일링 스탑 기준가)
+_last_prices: dict[str, float] = {}
+
+
+def _now() -> str:
+    return datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _pnl(side: str, entry: float, price: float) -> float:
+    if side == "LONG":
+        return (price / entry - 1) * 100
+    return (entry / price - 1) * 100
+
+
+def _level(side: str, ratio: float) -> float:
+    """롱 기준 비율을 포지션 방향에 맞게 변환 (숏은 1 기준 대칭)"""
+    return ratio if side == "LONG" else 2 - ratio
+
+
+# ── 포지션 등록 (모든 워커에서 호출 가능) ─────────────────
+def register_position(symbol: str, side: str, entry_price: float, qty: float, entry_time: str,
+                      venue: str | None = None) -> None:
+    """
+    새 진입을 공유 상태에 기록합니다.
+    리더의 모니터가 positions_version 변경을 보고 TP/SL 트리거를 다시 겁니다.
+    venue 는 포지션을 가진 거래소 (청산 주문도 그쪽으로 보냄, 없으면 기본 거래소)
+    """
+    venue = venue or PRIMARY
+    def _fn(s):
+        positions = dict(s.get("positions") or {})
+        positions[symbol] = {
+            "side":           side,
+            "entry_price":    entry_price,
+            "qty":            qty,
+            "entry_time":     entry_time,
+            "first_tp_done":  False,
+            "second_tp_done": False,
+            "venue":          venue,
+        }
+        s["positions"] = positions
+        s["positions_version"] = s.get("positions_version", 0) + 1
+    monitor_state.transact(_fn)
+    record(POSITION, {"op": "register", "s": symbol, "side": side,
+                      "entry": entry_price, "qty": qty, "time": entry_time, "venue": venue})
+
+
+def remove_position(symbol: str) -> None:
+    def _fn(s):
+        positions = dict(s.get("positions") or {})
+        if positions.pop(symbol, None) is not None:
+            s["positions"] = positions
+            s["positions_version"] = s.get("positions_version", 0) + 1
+    monitor_state.transact(_fn)
+    record(POSITION, {"op": "remove", "s": symbol})
+
+
+def _update_position(symbol: str, values: dict) -> None:
+    def _fn(s):
+        positions = dict(s.get("positions") or {})
+        if symbol in positions:
+            positions[symbol] = {**positions[symbol], **values}
+            s["positions"] = positions
+    monitor_state.transact(_fn)
+
 
 def _handle_order_update(msg):
+    record(USER_EVENT, msg)
+    # 결과를 알 수 없는 주문의 복구용으로 clientOrderId 별 이벤트를 기억.
+    # 사용자 스트림은 리더만 구독하므로(start_monitor) 다른 워커의 복구는 REST 조회로만 확인됨
+    if msg.get("e") == "ORDER_TRADE_UPDATE":
+        note_order_event(msg.get("o", {}))
     # ENTRY 가격·수량을 WebSocket으로 잡아두는 부분은 그대로 유지
+    # 리더가 아닌 워커의 소켓은 상태를 건드리지 않음
+    if not elector.is_leader():
+        return
     o = msg.get("o", {})
     if msg.get("e") == "ORDER_TRADE_UPDATE" and \
-       o.get("X") == "FILLED" and o.get("S") == "BUY" and o.get("o") == "MARKET":
-        price = float(o.get("L", 0))
-        qty   = float(o.get("q", 0))
-        now   = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-        monitor_state.update({
-            "entry_price":    price,
-            "position_qty":   qty,
-            "entry_time":     now,
-            "first_tp_done":  False,
-            "second_tp_done": False,
-            "sl_done":        False
-        })
-        logger.info(f"Entry detected: {qty}@{price} at {now}")
+       o.get("X") == "FILLED" and o.get("o") == "MARKET" and not o.get("R"):
+        # 신호로 낸 주문(뒤집기 주문은 청산분+새 진입분이 한 번에 체결됨)은 process_alert 가
+        # 순수 진입 수량으로 등록하므로, 여기서는 UI 수동 진입처럼 봇 밖에서 낸 주문만 등록
+        if is_signal_order(o.get("c")):
+            return
+        symbol = o.get("s", "")
+        side   = "LONG" if o.get("S") == "BUY" else "SHORT"
+        price  = float(o.get("ap") or o.get("L", 0))
+        qty    = float(o.get("z") or o.get("q", 0))
+        # 웹훅이 이미 등록한 포지션이면 건드리지 않고, UI 수동 진입 등만 등록
+        pos = (monitor_state.get("positions") or {}).get(symbol)
+        if pos and pos["side"] == side:
+            return
+        now = _now()
+        # 사용자 소켓은 바이낸스(또는 그 모의 거래소) 것
+        register_position(symbol, side, price, qty, now, venue=BINANCE)
+        if symbol == monitor_state["symbol"]:
+            monitor_state.update({
+                "side":           side,
+                "entry_price":    price,
+                "position_qty":   qty,
+                "entry_time":     now,
+                "first_tp_done":  False,
+                "second_tp_done": False,
+                "sl_done":        False
+            })
+        logger.info(f"Entry detected: {side} {symbol} {qty}@{price} at {now}")
 
 
-def _poll_price_loop():
-    client = get_binance_client()
-    symbol = monitor_state["symbol"]
+def _fenced() -> bool:
+    """주문 직전 펜싱 토큰 확인. 리더십을 잃었으면 주문하지 않음."""
+    if elector.check_fence():
+        return True
+    logger.warning("Fencing check failed, skipping order (not the current leader)")
+    return False
 
-    while True:
-        qty   = monitor_state["position_qty"]
-        entry = monitor_state["entry_price"]
-
-        if qty > 0 and entry > 0:
-            current     = float(client.futures_symbol_ticker(symbol=symbol)["price"])
-            now         = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-            pnl_percent = (current / entry - 1) * 100
-
-            monitor_state["current_price"] = current
-            monitor_state["pnl"]           = pnl_percent
-
-            # 1차 TP: PnL ≥ (TP_RATIO − 1)*100
-            if not monitor_state["first_tp_done"] and pnl_percent >= (TP_RATIO - 1) * 100:
-                tp_qty = qty * 0.3
-                client.futures_create_order(
-                    symbol=symbol,
-                    side="SELL",
-                    type="MARKET",
-                    quantity=tp_qty,
-                    reduceOnly=True
-                )
-                monitor_state.update({
-                    "first_tp_done":  True,
-                    "first_tp_price": current,
-                    "first_tp_qty":   tp_qty,
-                    "first_tp_time":  now,
-                    "first_tp_pnl":   pnl_percent,
-                    "position_qty":   qty - tp_qty
-                })
-                monitor_state["first_tp_count"] += 1
-                monitor_state["daily_pnl"]     += pnl_percent
-                logger.info(f"1차 익절: {tp_qty}@{current} ({pnl_percent:.2f}% at {now})")
-
-            # 2차 TP: PnL ≥ 1.1% (TP_RATIO_SECOND = 1.011)
-            elif monitor_state["first_tp_done"] \
-                 and not monitor_state["second_tp_done"] \
-                 and pnl_percent >= (1.011 - 1) * 100:
-                tp2_qty = monitor_state["position_qty"] * 0.5
-                client.futures_create_order(
-                    symbol=symbol,
-                    side="SELL",
-                    type="MARKET",
-                    quantity=tp2_qty,
-                    reduceOnly=True
-                )
-                monitor_state.update({
-                    "second_tp_done":  True,
-                    "second_tp_price": current,
-                    "second_tp_qty":   tp2_qty,
-                    "second_tp_time":  now,
-                    "second_tp_pnl":   pnl_percent,
-                    "position_qty":    monitor_state["position_qty"] - tp2_qty
-                })
-                monitor_state["second_tp_count"] += 1
-                monitor_state["daily_pnl"]       += pnl_percent
-                logger.info(f"2차 익절: {tp2_qty}@{current} ({pnl_percent:.2f}% at {now})")
-
-            # SL: PnL ≤ -0.5% (or +0.1% after 1차)
-            sl_threshold = - (1 - SL_RATIO) * 100  # SL_RATIO=0.995 → −0.5%
-            if monitor_state["first_tp_done"]:
-                sl_threshold = (1.001 - 1) * 100     # +0.1% 손절 트레일링
-
-            if not monitor_state["sl_done"] and pnl_percent <= sl_threshold:
-                sl_qty = monitor_state["position_qty"]
-                client.futures_create_order(
-                    symbol=symbol,
-                    side="SELL",
-                    type="MARKET",
-                    quantity=sl_qty,
-                    reduceOnly=True
-                )
+
+# ── 트리거 등록 ─────────────────────────────────────────
+def _arm(symbol: str, pos: dict) -> None:
+    """포지션 진행 상황에 맞는 TP/SL 트리거를 겁니다."""
+    side  = pos["side"]
+    entry = pos["entry_price"]
+    tp_dir = ABOVE if side == "LONG" else BELOW
+    sl_dir = BELOW if side == "LONG" else ABOVE
+    armed = {"key": (side, entry, pos["entry_time"])}
+
+    if not pos["first_tp_done"]:
+        armed["TP1"] = _engine.add(symbol, tp_dir, entry * _level(side, TP_RATIO), "TP1", tag=symbol)
+        armed["SL"]  = _engine.add(symbol, sl_dir, entry * _level(side, SL_RATIO), "SL", tag=symbol)
+    else:
+        armed["SL"]  = _engine.add(symbol, sl_dir, entry * _level(side, BE_RATIO), "SL", tag=symbol)
+        if not pos["second_tp_done"]:
+            armed["TP2"] = _engine.add(symbol, tp_dir, entry * _level(side, TP2_RATIO), "TP2", tag=symbol)
+        elif TRAIL_RATIO > 0:
+            # 그 심볼의 최근 가격 (이 프로세스 → 공유 차트 기록 → 진입가 순)
+            ref = _last_prices.get(symbol) or last_price(symbol) or entry
+            armed["TRAIL"] = _engine.add_trailing(symbol, side, TRAIL_RATIO, ref, "TRAIL", tag=symbol)
+
+    _armed[symbol] = armed
+    logger.info(f"Armed {symbol} {side} triggers: {sorted(k for k in armed if k != 'key')}")
+
+
+def _disarm(symbol: str) -> None:
+    _engine.cancel_tag(symbol)
+    _armed.pop(symbol, None)
+
+
+def _sync_positions() -> None:
+    """
+    공유 상태의 포지션 목록과 트리거 색인을 맞춥니다.
+    positions_version 이나 리더 토큰이 바뀐 경우에만 전체를 비교합니다.
+    """
+    global _synced_version, _synced_token
+
+    version = monitor_state.get("positions_version", 0)
+    token   = elector.token
+    if version == _synced_version and token == _synced_token:
+        return
+
+    positions = monitor_state.get("positions") or {}
+    if token != _synced_token:
+        # 새로 리더가 됐으면 이전 임기의 색인은 버리고 저장소 기준으로 재구성
+        for symbol in list(_armed):
+            _disarm(symbol)
+
+    for symbol in list(_armed):
+        pos = positions.get(symbol)
+        if pos is None or _armed[symbol]["key"] != (pos["side"], pos["entry_price"], pos["entry_time"]):
+            _disarm(symbol)
+    # 포지션이 사라진 심볼의 차트 기록 해제 (이전 프로세스가 남긴 공유 메모리 포함)
+    prune(positions)
+    for symbol in [s for s in _last_prices if s not in positions]:
+        del _last_prices[symbol]
+    for symbol, pos in positions.items():
+        if symbol not in _armed and pos["qty"] > 0 and pos["entry_price"] > 0:
+            _arm(symbol, pos)
+
+    _synced_version = version
+    _synced_token   = token
+
+
+# ── 트리거 발동 처리 ────────────────────────────────────
+def _close_order(ex, symbol: str, pos: dict, kind: str, qty: float) -> None:
+    # 같은 포지션의 같은 트리거는 항상 같은 clientOrderId → 응답이 유실돼도 _submit 이 이 id 로
+    # 먼저 찾아본 뒤에만 다시 보냄 (거래소는 끝난 주문의 id 재사용을 막지 않음, reduceOnly 라
+    # 최악의 경우에도 포지션보다 많이 청산되지는 않음)
+    key = order_key(symbol, pos["side"], pos["entry_price"], pos["entry_time"])
+    ex.market_order(symbol, "SELL" if pos["side"] == "LONG" else "BUY", qty, reduce_only=True,
+                    client_id=client_order_id(key, kind.lower()))
+
+
+def _on_trigger(ex, trigger, price: float) -> None:
+    symbol = trigger.symbol
+    pos = (monitor_state.get("positions") or {}).get(symbol)
+    if pos is None or symbol not in _armed:
+        return
+    if not _fenced():
+        # 리더십을 잃은 상태: 다음 리더가 저장소 기준으로 다시 건다
+        _disarm(symbol)
+        return
+
+    side  = pos["side"]
+    entry = pos["entry_price"]
+    now   = _now()
+    pnl_percent = _pnl(side, entry, price)
+    display = symbol == monitor_state["symbol"]
+    armed = _armed[symbol]
+
+    # 1차 TP: 30% 청산 → 손절을 본전(+0.1%)으로 옮기고 2차 TP 등록
+    if trigger.kind == "TP1":
+        tp_qty = pos["qty"] * 0.3
+        _close_order(ex, symbol, pos, trigger.kind, tp_qty)
+        remain = pos["qty"] - tp_qty
+        _update_position(symbol, {"first_tp_done": True, "qty": remain})
+        if display:
+            monitor_state.update({
+                "first_tp_done":  True,
+                "first_tp_price": price,
+                "first_tp_qty":   tp_qty,
+                "first_tp_time":  now,
+                "first_tp_pnl":   pnl_percent,
+                "position_qty":   remain
+            })
+        monitor_state.incr("first_tp_count")
+        monitor_state.incr("daily_pnl", pnl_percent)
+        logger.info(f"1차 익절 {symbol}: {tp_qty}@{price} ({pnl_percent:.2f}% at {now})")
+
+        _engine.cancel(armed.pop("SL"))
+        sl_dir = BELOW if side == "LONG" else ABOVE
+        tp_dir = ABOVE if side == "LONG" else BELOW
+        armed["SL"]  = _engine.add(symbol, sl_dir, entry * _level(side, BE_RATIO), "SL", tag=symbol)
+        armed["TP2"] = _engine.add(symbol, tp_dir, entry * _level(side, TP2_RATIO), "TP2", tag=symbol)
+
+    # 2차 TP: 남은 물량의 50% 청산 → (설정 시) 나머지에 트레일링 스탑
+    elif trigger.kind == "TP2":
+        tp2_qty = pos["qty"] * 0.5
+        _close_order(ex, symbol, pos, trigger.kind, tp2_qty)
+        remain = pos["qty"] - tp2_qty
+        _update_position(symbol, {"second_tp_done": True, "qty": remain})
+        if display:
+            monitor_state.update({
+                "second_tp_done":  True,
+                "second_tp_price": price,
+                "second_tp_qty":   tp2_qty,
+                "second_tp_time":  now,
+                "second_tp_pnl":   pnl_percent,
+                "position_qty":    remain
+            })
+        monitor_state.incr("second_tp_count")
+        monitor_state.incr("daily_pnl", pnl_percent)
+        logger.info(f"2차 익절 {symbol}: {tp2_qty}@{price} ({pnl_percent:.2f}% at {now})")
+
+        if TRAIL_RATIO > 0:
+            armed["TRAIL"] = _engine.add_trailing(symbol, side, TRAIL_RATIO, price, "TRAIL", tag=symbol)
+
+    # SL / 트레일링 스탑: 남은 물량 전부 청산
+    else:
+        sl_qty = pos["qty"]
+        _close_order(ex, symbol, pos, trigger.kind, sl_qty)
+        _disarm(symbol)
+        remove_position(symbol)
+        if display:
+            monitor_state.update({
+                "sl_done":      True,
+                "sl_price":     price,
+                "sl_qty":       sl_qty,
+                "sl_time":      now,
+                "sl_pnl":       pnl_percent,
+                "position_qty": 0
+            })
+        monitor_state.incr("sl_count")
+        monitor_state.incr("daily_pnl", pnl_percent)
+        logger.info(f"손절 실행 {symbol} ({trigger.kind}): {sl_qty}@{price} ({pnl_percent:.2f}% at {now})")
+
+
+def _on_prices(ex, prices: dict[str, float]) -> None:
+    """
+    한 번의 시세 조회 결과 처리: 차트 기록·대시보드 심볼 갱신 + 넘어선 트리거만 실행.
+    공유 상태는 틱마다 한 번만 읽습니다.
+    """
+    positions = monitor_state.get("positions") or {}
+    display   = monitor_state["symbol"]
+    for symbol, price in prices.items():
+        _last_prices[symbol] = price
+        pos = positions.get(symbol)
+        if pos:
+            pnl = _pnl(pos["side"], pos["entry_price"], price)
+            record_sample(symbol, price, pnl, pos["qty"])
+            if symbol == display:
                 monitor_state.update({
-                    "sl_done":      True,
-                    "sl_price":     current,
-                    "sl_qty":       sl_qty,
-                    "sl_time":      now,
-                    "sl_pnl":       pnl_percent,
-                    "position_qty": 0
+                    "current_price": price,
+                    "pnl":           pnl,
                 })
-                monitor_state["sl_count"]  += 1
-                monitor_state["daily_pnl"] += pnl_percent
-                logger.info(f"손절 실행: {sl_qty}@{current} ({pnl_percent:.2f}% at {now})")
+
+    for trigger in _engine.on_prices(prices):
+        try:
+            _on_trigger(ex, trigger, prices[trigger.symbol])
+        except Exception:
+            logger.exception(f"Failed to execute {trigger}")
+
+
+def _on_price(ex, symbol: str, price: float) -> None:
+    """가격 한 틱 처리 (기록 재생용)"""
+    _on_prices(ex, {symbol: price})
+
+
+def _by_venue(symbols: list[str]) -> dict[str, list[str]]:
+    """포지션을 가진 거래소별로 심볼을 묶음 (거래소마다 티커 한 번씩 조회)"""
+    positions = monitor_state.get("positions") or {}
+    groups: dict[str, list[str]] = {}
+    for symbol in symbols:
+        venue = (positions.get(symbol) or {}).get("venue") or PRIMARY
+        groups.setdefault(venue, []).append(symbol)
+    return groups
+
+
+def _poll_price_loop():
+    while True:
+        # 리더만 가격 감시 및 주문 실행
+        if not elector.is_leader():
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        try:
+            _sync_positions()
+            for venue, symbols in _by_venue(_engine.symbols()).items():
+                ex = get_venue(venue)
+                prices = ex.prices(symbols)
+                for symbol, price in prices.items():
+                    record(PRICE, {"s": symbol, "p": price})
+                _on_prices(ex, prices)
+        except Exception:
+            logger.exception("Price polling iteration failed")
 
         time.sleep(POLL_INTERVAL)
 
 
 def start_monitor():
-    client = get_binance_client()
-    twm = ThreadedWebsocketManager(
-        api_key=client.API_KEY,
-        api_secret=client.API_SECRET
-    )
-    try:
-        twm.start()
-        twm.start_futures_user_socket(callback=_handle_order_update)
-        logger.info("WebsocketManager initialized")
-    except Exception:
-        logger.exception("WebsocketManager 초기화 실패")
-        return
+    """
+    리더로 선출된 프로세스에서 호출됩니다.
+    리더십을 잃었다가 다시 얻어도 스레드는 한 번만 띄우고,
+    각 루프가 is_leader()로 스스로 멈춥니다.
+    초기화가 실패하면 예외를 올리고 시작 표시를 남기지 않아, 다음 선출 때 다시 시도합니다.
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+
+        client = get_binance_client()
+        if DRY_RUN:
+            # 모의 거래소의 체결 이벤트를 사용자 소켓 대신 구독
+            client.start_user_stream(_handle_order_update)
+            logger.info("Subscribed to paper trading user stream")
+        else:
+            twm = ThreadedWebsocketManager(
+                api_key=client.API_KEY,
+                api_secret=client.API_SECRET
+            )
+            try:
+                twm.start()
+                twm.start_futures_user_socket(callback=_handle_order_update)
+            except Exception:
+                logger.exception("WebsocketManager 초기화 실패")
+                try:
+                    twm.stop()
+                except Exception:
+                    pass
+                raise
+            logger.info("WebsocketManager initialized")
 
-    thread = threading.Thread(target=_poll_price_loop, daemon=True)
-    thread.start()
-    logger.info("Price polling thread started")
\ No newline at end of file
+        thread = threading.Thread(target=_poll_price_loop, daemon=True)
+        thread.start()
+        _started = True
+        logger.info("Price polling thread started")
@@ -0,0 +1,108 @@
+# app/services/profiling.py
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# 요청 시에만 켜지는 진단 도구들. 꺼져 있을 때는 아래 플래그 확인 외에 비용이 없음
+_lock = threading.Lock()
+webhook_armed = False
+_webhook_result: str | None = None
+_tracemalloc_baseline = None
+
+
+# ── 스택 샘플링 ─────────────────────────────────────────
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def sample_stacks(seconds: float, hz: float = 100.0) -> str:
+    """
+    seconds 동안 모든 스레드의 스택을 hz 주기로 샘플링해
+    flamegraph.pl / speedscope 가 읽는 collapsed-stack 형식으로 반환합니다.
+    "스레드명;바깥함수;...;안쪽함수 횟수"
+    """
+    me = threading.get_ident()
+    interval = 1.0 / hz
+    counts = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+
+    return "\n".join(f"{stack} {n}" for stack, n in counts.most_common()) + "\n"
+
+
+# ── /webhook 1회 cProfile ───────────────────────────────
+def arm_webhook_profile() -> None:
+    """다음 /webhook 호출 한 번을 cProfile 로 측정하도록 예약"""
+    global webhook_armed, _webhook_result
+    with _lock:
+        webhook_armed = True
+        _webhook_result = None
+
+
+def run_profiled(fn, *args, **kwargs):
+    """예약돼 있으면 fn 을 cProfile 로 실행하고 결과를 보관 (한 번만)"""
+    global webhook_armed, _webhook_result
+    with _lock:
+        if not webhook_armed:
+            return fn(*args, **kwargs)
+        webhook_armed = False
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+        _webhook_result = out.getvalue()
+
+
+def webhook_profile_result() -> str | None:
+    return _webhook_result
+
+
+# ── tracemalloc 스냅샷 비교 ─────────────────────────────
+def start_tracemalloc(frames: int = 10) -> None:
+    global _tracemalloc_baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _tracemalloc_baseline = tracemalloc.take_snapshot()
+
+
+def tracemalloc_diff(limit: int = 30) -> str | None:
+    """기준 스냅샷 이후 늘어난 메모리를 위치별로 정리 (추적 중이 아니면 None)"""
+    if not tracemalloc.is_tracing() or _tracemalloc_baseline is None:
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    stats = snapshot.compare_to(_tracemalloc_baseline, "lineno")
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f"traced current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB"]
+    lines += [str(s) for s in stats[:limit]]
+    return "\n".join(lines) + "\n"
+
+
+def stop_tracemalloc() -> None:
+    global _tracemalloc_baseline
+    _tracemalloc_baseline = None
+    tracemalloc.stop()
@@ -0,0 +1,201 @@
+# app/services/reconcile.py
+
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.clients.binance_client import get_binance_client
+from app.clients.venues import BINANCE, PRIMARY
+from app.config import RECONCILE_INTERVAL, SL_RATIO, VENUES
+from app.services.filters import get_symbol_filters, ceil_price
+from app.services.leader import elector
+from app.services.monitor import register_position, remove_position
+from app.state import monitor_state
+
+logger = logging.getLogger("reconcile")
+logger.setLevel(logging.INFO)
+
+SL_MARKET = "STOP_MARKET"
+
+# 불일치는 연속 두 번 관찰돼야 복구 (진입 직후 브래킷을 거는 중인 경우 등 오탐 방지)
+_CONFIRMATIONS = 2
+
+_suspects: dict[tuple, int] = {}
+_last_fingerprint = None
+_started = False
+
+
+def _fingerprint(positions: dict, orders: dict, local: dict) -> str:
+    """스냅샷이 지난 번과 같으면 비교를 건너뛰기 위한 해시"""
+    h = hashlib.sha1()
+    for sym in sorted(positions):
+        p = positions[sym]
+        h.update(f"P{sym}:{p['positionAmt']}:{p['entryPrice']};".encode())
+    for sym in sorted(orders):
+        for o in orders[sym]:
+            h.update(f"O{o['orderId']}:{o['status']};".encode())
+    for sym in sorted(local):
+        l = local[sym]
+        h.update(f"L{sym}:{l['side']}:{l['qty']}:{l['entry_time']};".encode())
+    return h.hexdigest()
+
+
+def _confirmed(key: tuple, seen: set) -> bool:
+    """불일치를 기록하고, 충분히 관찰됐으면 True (복구 후 다시 세도록 카운트 초기화)"""
+    seen.add(key)
+    _suspects[key] = _suspects.get(key, 0) + 1
+    if _suspects[key] >= _CONFIRMATIONS:
+        del _suspects[key]
+        return True
+    return False
+
+
+def _has_stop(orders: list, close_side: str) -> bool:
+    return any(
+        o["type"] == SL_MARKET and o["side"] == close_side
+        and (o.get("reduceOnly") or o.get("closePosition"))
+        for o in orders
+    )
+
+
+def _repair(actions: list, failures: list, label: str, fn) -> None:
+    """복구 하나를 실행. 실패해도 기록만 하고 다음 복구를 계속 (다음 주기에 다시 시도)"""
+    try:
+        fn()
+    except Exception as e:
+        logger.exception(f"[Reconcile] {label} failed")
+        failures.append(f"{label}: {e}")
+        return
+    actions.append(label)
+
+
+def reconcile_once(client=None) -> list[str]:
+    """
+    전체 심볼의 미체결 주문/포지션을 각각 한 번에 조회해 로컬 상태와 비교하고 복구합니다.
+    (심볼 수와 무관하게 조회 가중치가 고정)
+
+    - 포지션 없는 심볼의 reduceOnly 주문 → 취소
+    - 손절 주문이 없는 포지션 → closePosition STOP_MARKET 재설정
+    - 거래소에서 청산된 로컬 포지션 → 로컬에서 제거
+    - 로컬에 없는(또는 방향/수량이 다른) 거래소 포지션 → 로컬에 등록/갱신
+    복구는 하나씩 따로 실행하므로 하나가 실패해도(예: 이미 넘어선 손절가 -2021) 나머지는 진행합니다.
+    """
+    global _last_fingerprint
+
+    client = client or get_binance_client()
+
+    positions = {
+        p["symbol"]: p
+        for p in client.futures_position_information()
+        if float(p["positionAmt"]) != 0
+    }
+    orders = defaultdict(list)
+    for o in client.futures_get_open_orders():
+        if o.get("reduceOnly") or o.get("closePosition"):
+            orders[o["symbol"]].append(o)
+    # 바이낸스 계정과 비교하므로 다른 거래소 포지션은 대상에서 제외
+    local = {
+        sym: pos for sym, pos in (monitor_state.get("positions") or {}).items()
+        if (pos.get("venue") or PRIMARY) == BINANCE
+    }
+
+    fingerprint = _fingerprint(positions, orders, local)
+    if fingerprint == _last_fingerprint and not _suspects:
+        return []
+
+    actions = []
+    failures = []
+    seen = set()
+
+    # 1) 고아 reduceOnly 주문
+    for sym, sym_orders in orders.items():
+        if sym in positions:
+            continue
+        for o in sym_orders:
+            if _confirmed(("orphan", o["orderId"]), seen) and elector.check_fence():
+                _repair(actions, failures, f"cancel orphan {sym} {o['type']} #{o['orderId']}",
+                        lambda sym=sym, o=o: client.futures_cancel_order(symbol=sym, orderId=o["orderId"]))
+
+    for sym, p in positions.items():
+        amt   = float(p["positionAmt"])
+        entry = float(p["entryPrice"])
+        side  = "LONG" if amt > 0 else "SHORT"
+
+        # 2) 손절 주문이 없는 포지션
+        close_side = "SELL" if side == "LONG" else "BUY"
+        if not _has_stop(orders.get(sym, []), close_side) \
+           and _confirmed(("no_sl", sym, side), seen) and elector.check_fence():
+            def _rearm(sym=sym, side=side, entry=entry, close_side=close_side):
+                f = get_symbol_filters(client, sym)
+                ratio = SL_RATIO if side == "LONG" else 2 - SL_RATIO
+                sl_price_str = f"{ceil_price(entry * ratio, f['price_precision']):.{f['price_precision']}f}"
+                client.futures_create_order(
+                    symbol=sym,
+                    side=close_side,
+                    type=SL_MARKET,
+                    stopPrice=sl_price_str,
+                    closePosition=True
+                )
+            _repair(actions, failures, f"re-arm SL {sym} {side}", _rearm)
+
+        # 4) 로컬에 없거나 다른 포지션
+        mine = local.get(sym)
+        if mine is None or mine["side"] != side:
+            if _confirmed(("adopt", sym, side), seen):
+                now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+                _repair(actions, failures, f"adopt {sym} {side} {abs(amt)}@{entry}",
+                        lambda sym=sym, side=side, entry=entry, qty=abs(amt), now=now:
+                        register_position(sym, side, entry, qty, now, venue=BINANCE))
+        elif abs(mine["qty"] - abs(amt)) > 1e-12:
+            if _confirmed(("qty", sym, abs(amt)), seen):
+                def _fn(s, sym=sym, qty=abs(amt)):
+                    pos = dict(s.get("positions") or {})
+                    if sym in pos:
+                        pos[sym] = {**pos[sym], "qty": qty}
+                        s["positions"] = pos
+                _repair(actions, failures, f"sync qty {sym} {mine['qty']} → {abs(amt)}",
+                        lambda _fn=_fn: monitor_state.transact(_fn))
+
+    # 3) 거래소에서 이미 청산된 로컬 포지션 (UI 수동 청산 등)
+    for sym in local:
+        if sym not in positions and _confirmed(("closed", sym), seen):
+            _repair(actions, failures, f"drop closed {sym}", lambda sym=sym: remove_position(sym))
+
+    # 이번에 다시 관찰되지 않은 의심 항목은 해소된 것으로 간주
+    for key in list(_suspects):
+        if key not in seen:
+            del _suspects[key]
+
+    # 깨끗한 상태였을 때만 다음 번 동일 스냅샷 비교를 생략
+    _last_fingerprint = fingerprint if not actions and not failures and not _suspects else None
+    for action in actions:
+        logger.warning(f"[Reconcile] {action}")
+    return actions
+
+
+def _reconcile_loop():
+    while True:
+        time.sleep(RECONCILE_INTERVAL)
+        if not elector.is_leader():
+            continue
+        try:
+            reconcile_once()
+        except Exception:
+            logger.exception("Reconcile iteration failed")
+
+
+def start_reconciler():
+    global _started
+    if _started:
+        return
+    if BINANCE not in (VENUES or [BINANCE]):
+        _started = True
+        logger.info("Binance is not a configured venue, reconciler disabled")
+        return
+    thread = threading.Thread(target=_reconcile_loop, daemon=True)
+    thread.start()
+    _started = True
+    logger.info(f"Reconciler started (every {RECONCILE_INTERVAL}s)")
@@ -0,0 +1,226 @@
+# app/services/recorder.py
+
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from app.config import RECORDER_DIR, RECORDER_SEGMENT_MB, RECORDER_MAX_SEGMENTS, RECORDER_MAX_MB
+
+logger = logging.getLogger("recorder")
+logger.setLevel(logging.INFO)
+
+# 레코드 종류
+USER_EVENT = 1   # 유저 스트림 메시지 (_handle_order_update 입력)
+PRICE      = 2   # 모니터가 본 가격 {"s": symbol, "p": price}
+REST       = 3   # REST 호출 {"m": method, "a": kwargs, "r": 응답 | "e": 에러}
+KLINE      = 4   # kline 스트림 메시지
+POSITION   = 5   # 포지션 등록/삭제 {"op": "register"|"remove", ...}
+SNAPSHOT   = 6   # 세그먼트 시작 시점의 monitor_state
+
+KIND_NAMES = {
+    USER_EVENT: "user_event", PRICE: "price", REST: "rest",
+    KLINE: "kline", POSITION: "position", SNAPSHOT: "snapshot",
+}
+
+# 세그먼트 파일: 8바이트 매직 + 레코드들
+# 레코드: [본문 길이 u32][기록 시각 f64][종류 u8][본문 JSON]
+# 길이 0 은 세그먼트의 끝 (미리 0으로 채워진 영역)
+MAGIC   = b"TVREC01\n"
+_RECORD = struct.Struct("<IdB")
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+class Recorder:
+    """
+    메모리 맵 세그먼트 파일에 이벤트를 이어 붙이는 기록기.
+    세그먼트는 미리 할당된 고정 크기 파일이며, 가득 차면 다음 파일로 넘어가고
+    디렉터리의 세그먼트(이전 프로세스가 남긴 것 포함)는 오래된 것부터 지워
+    max_segments 개, max_bytes 바이트(0 이면 제한 없음) 안으로 유지합니다.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int, max_segments: int, snapshot_fn=None,
+                 max_bytes: int = 0):
+        self.directory     = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments  = max_segments
+        self.max_bytes     = max_bytes
+        self.snapshot_fn   = snapshot_fn
+        self._lock  = threading.Lock()
+        self._seq   = 0
+        self._file  = None
+        self._mm    = None
+        self._pos   = 0
+        self.path   = None
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment()
+
+    def _open_segment(self, ts: float | None = None) -> None:
+        self._close_segment()
+        self._seq += 1
+        name = f"seg-{int(time.time() * 1000)}-{os.getpid()}-{self._seq:05d}.rec"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, "w+b")
+        self._file.truncate(self.segment_bytes)
+        self._mm = mmap.mmap(self._file.fileno(), self.segment_bytes)
+        self._mm[:len(MAGIC)] = MAGIC
+        self._pos = len(MAGIC)
+        self._rotate()
+
+        # 각 세그먼트가 단독으로 재생 가능하도록 시작 상태를 남김
+        if self.snapshot_fn is not None:
+            self._append(SNAPSHOT, _dumps(self.snapshot_fn()), ts or time.time())
+
+    def _close_segment(self) -> None:
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        # 사용하지 않은 뒷부분은 잘라서 디스크 낭비를 줄임 (길이 0 종료 표시는 남김)
+        self._file.truncate(min(self._pos + _RECORD.size, self.segment_bytes))
+        self._file.close()
+        self._mm = None
+        self._file = None
+
+    def _rotate(self) -> None:
+        segments = []
+        for path in glob.glob(os.path.join(self.directory, "seg-*.rec")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue    # 다른 워커가 방금 지움
+            segments.append((st.st_mtime, path, st.st_size))
+        segments.sort()     # 오래된 것부터
+
+        count = len(segments)
+        total = sum(size for _, _, size in segments)
+        for _, old, size in segments:
+            if count <= self.max_segments and (not self.max_bytes or total <= self.max_bytes):
+                break
+            if old == self.path:
+                continue    # 지금 쓰는 세그먼트는 남김
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning(f"Failed to remove old segment {old}")
+                continue
+            count -= 1
+            total -= size
+
+    def _append(self, kind: int, body: bytes, ts: float) -> None:
+        end = self._pos + _RECORD.size + len(body)
+        if end + _RECORD.size > self.segment_bytes:
+            if len(body) + len(MAGIC) + 2 * _RECORD.size > self.segment_bytes:
+                logger.warning(f"Dropping oversized record ({len(body)} bytes)")
+                return
+            # 스냅샷은 넘어가게 만든 레코드와 같은 시각으로 기록해 정렬 순서를 유지
+            self._open_segment(ts)
+            end = self._pos + _RECORD.size + len(body)
+        # 본문을 먼저 쓰고 헤더를 나중에 써서, 읽는 쪽이 반쯤 쓴 레코드를 보지 않게 함
+        self._mm[self._pos + _RECORD.size:end] = body
+        _RECORD.pack_into(self._mm, self._pos, len(body), ts, kind)
+        self._pos = end
+
+    def record(self, kind: int, payload) -> None:
+        body = _dumps(payload)
+        with self._lock:
+            self._append(kind, body, time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+
+def read_segment(path: str):
+    """세그먼트 파일 하나의 (시각, 종류, 본문) 을 순서대로 반환"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"Not a recorder segment: {path}")
+    pos = len(MAGIC)
+    while pos + _RECORD.size <= len(data):
+        length, ts, kind = _RECORD.unpack_from(data, pos)
+        if length == 0:
+            break
+        start = pos + _RECORD.size
+        yield ts, kind, json.loads(data[start:start + length])
+        pos = start + length
+
+
+def read_capture(path: str):
+    """디렉터리(또는 파일 하나)의 모든 세그먼트를 시간순으로 읽습니다."""
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "seg-*.rec")))
+    else:
+        files = [path]
+    records = [r for f in files for r in read_segment(f)]
+    # 여러 워커의 세그먼트가 섞여 있을 수 있으므로 시각 기준 정렬 (안정 정렬)
+    records.sort(key=lambda r: r[0])
+    return records
+
+
+# 싱글톤으로 기록기 관리 (RECORDER_DIR 미설정 시 비활성)
+_recorder: Recorder | None = None
+_init_lock = threading.Lock()
+
+def get_recorder() -> Recorder | None:
+    global _recorder
+
+    if _recorder is None and RECORDER_DIR:
+        with _init_lock:
+            if _recorder is None:
+                from app.state import monitor_state
+                _recorder = Recorder(
+                    RECORDER_DIR,
+                    RECORDER_SEGMENT_MB * 1024 * 1024,
+                    RECORDER_MAX_SEGMENTS,
+                    snapshot_fn=monitor_state.snapshot,
+                    max_bytes=RECORDER_MAX_MB * 1024 * 1024,
+                )
+                logger.info(f"Recording events to {RECORDER_DIR}")
+    return _recorder
+
+
+def record(kind: int, payload) -> None:
+    """기록기가 켜져 있을 때만 기록 (꺼져 있으면 즉시 반환)"""
+    if not RECORDER_DIR:
+        return
+    rec = get_recorder()
+    try:
+        rec.record(kind, payload)
+    except Exception:
+        logger.exception("Failed to record event")
+
+
+class RecordingClient:
+    """
+    Binance Client 를 감싸 futures_* REST 호출의 인자와 응답을 기록합니다.
+    그 밖의 속성은 원래 Client 로 그대로 넘깁니다.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+
+        def _call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                record(REST, {"m": name, "a": kwargs, "e": repr(e)})
+                raise
+            record(REST, {"m": name, "a": kwargs, "r": result})
+            return result
+
+        return _call
@@ -0,0 +1,164 @@
+# app/services/replay.py
+
+import argparse
+import json
+import logging
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from itertools import count
+from app.clients.exchange import BinanceAdapter
+from app.services import history, recorder, monitor
+from app.services.leader import elector
+from app.services.recorder import read_capture, USER_EVENT, PRICE, REST, POSITION, SNAPSHOT, KIND_NAMES
+from app.services.triggers import TriggerEngine
+from app.state import monitor_state, DEFAULT_STATE
+from app.store import LocalStore
+
+logger = logging.getLogger("replay")
+logger.setLevel(logging.INFO)
+
+
+class ReplayError(Exception):
+    """기록된 REST 호출이 에러였던 경우 재생 중에도 같은 에러를 냄"""
+
+
+class ReplayClient:
+    """
+    기록된 REST 응답을 메서드별 순서대로 돌려주는 가짜 Client.
+    기록에 없는 주문 호출은 가짜 orderId 로 응답하고, 모든 호출은 calls 에 남깁니다.
+    """
+
+    def __init__(self, rest_records: list[dict]):
+        self._responses = defaultdict(deque)
+        for rec in rest_records:
+            self._responses[rec["m"]].append(rec)
+        self._order_ids = count(1)
+        self.calls: list[tuple[str, dict]] = []
+        self.API_KEY = self.API_SECRET = None
+
+    def __getattr__(self, name):
+        if not name.startswith("futures_"):
+            raise AttributeError(name)
+
+        def _call(**kwargs):
+            self.calls.append((name, kwargs))
+            queue = self._responses.get(name)
+            if queue:
+                rec = queue.popleft()
+                if "e" in rec:
+                    raise ReplayError(rec["e"])
+                return rec["r"]
+            if name in ("futures_create_order", "futures_cancel_order"):
+                return {"orderId": next(self._order_ids), "status": "NEW", **kwargs}
+            raise LookupError(f"No recorded response for {name}")
+
+        return _call
+
+
+@contextmanager
+def _isolated():
+    """
+    재생하는 동안 운영 상태와 분리: 상태 저장소·리더 임대·모니터 트리거는 새로 만들고,
+    차트 기록은 프로세스 로컬 링에 쓰며 기록기는 끕니다. 끝나면(예외여도) 모두 되돌림.
+    """
+    saved_stores  = monitor_state.store, elector.store
+    saved_elector = elector._token, elector._ready, elector._valid_until
+    saved_monitor = (monitor._engine, monitor._armed, monitor._last_prices,
+                     monitor._synced_version, monitor._synced_token)
+    saved_dir     = recorder.RECORDER_DIR
+
+    store = LocalStore()
+    store.setdefaults(DEFAULT_STATE)
+    monitor_state.store = elector.store = store
+    elector._token, elector._ready, elector._valid_until = None, False, 0.0
+    (monitor._engine, monitor._armed, monitor._last_prices,
+     monitor._synced_version, monitor._synced_token) = TriggerEngine(), {}, {}, -1, None
+    recorder.RECORDER_DIR = ""
+    try:
+        with history.isolated():
+            yield
+    finally:
+        monitor_state.store, elector.store = saved_stores
+        elector._token, elector._ready, elector._valid_until = saved_elector
+        (monitor._engine, monitor._armed, monitor._last_prices,
+         monitor._synced_version, monitor._synced_token) = saved_monitor
+        recorder.RECORDER_DIR = saved_dir
+
+
+def replay(path: str, speed: float = 0.0) -> dict:
+    """
+    기록을 모니터/주문 처리 코드에 다시 흘려보냅니다.
+    speed=0 이면 가능한 한 빠르게, speed=N 이면 실제 시간의 N배속.
+    상태는 격리된 LocalStore 에서 재생하고, 재생 중에는 기록하지 않습니다 (_isolated).
+    """
+    records = read_capture(path)
+    if not records:
+        raise ValueError(f"No records in {path}")
+
+    # 운영 상태(공유 메모리, 차트 링 등)와 분리
+    with _isolated():
+        return _run(records, speed)
+
+
+def _run(records: list, speed: float) -> dict:
+    elector.campaign()
+
+    client = ReplayClient([p for _, kind, p in records if kind == REST])
+    ex = BinanceAdapter(client)
+    snapshot = next((p for _, kind, p in records if kind == SNAPSHOT), None)
+    if snapshot:
+        monitor_state.update(snapshot)
+
+    kinds = Counter()
+    t0 = records[0][0]
+    started = time.perf_counter()
+
+    for ts, kind, payload in records:
+        kinds[KIND_NAMES.get(kind, kind)] += 1
+        if speed > 0:
+            delay = (ts - t0) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        if not elector.is_leader():
+            elector.campaign()
+
+        if kind == USER_EVENT:
+            monitor._handle_order_update(payload)
+        elif kind == PRICE:
+            monitor._sync_positions()
+            monitor._on_price(ex, payload["s"], payload["p"])
+        elif kind == POSITION:
+            if payload["op"] == "register":
+                monitor.register_position(payload["s"], payload["side"], payload["entry"],
+                                          payload["qty"], payload["time"], payload.get("venue"))
+            else:
+                monitor.remove_position(payload["s"])
+        # REST 는 ReplayClient 가 미리 적재, KLINE/SNAPSHOT 은 집계만
+
+    elapsed = time.perf_counter() - started
+    span = records[-1][0] - t0
+    orders = [kw for name, kw in client.calls if name == "futures_create_order"]
+    return {
+        "records":          len(records),
+        "by_kind":          dict(kinds),
+        "capture_span_sec": round(span, 3),
+        "elapsed_sec":      round(elapsed, 3),
+        "events_per_sec":   round(len(records) / elapsed, 1) if elapsed > 0 else None,
+        "speedup":          round(span / elapsed, 1) if elapsed > 0 else None,
+        "orders":           orders,
+        "final_positions":  monitor_state.get("positions"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 이벤트를 모니터에 재생합니다.")
+    parser.add_argument("path", help="세그먼트 디렉터리 또는 .rec 파일")
+    parser.add_argument("--speed", type=float, default=0.0, help="재생 배속 (0 = 최대 속도)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(replay(args.path, args.speed), ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
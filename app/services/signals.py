@@ -0,0 +1,310 @@
+# app/services/signals.py
+
+import logging
+import threading
+import numpy as np
+from binance import ThreadedWebsocketManager
+from app.clients.binance_client import get_binance_client
+from app.config import SIGNAL_ENGINE, SIGNAL_RULES, SIGNAL_BUFFER, SIGNAL_MIN_ATR_PCT
+from app.services.alerts import process_alert, SOURCE_LOCAL
+from app.services.leader import elector
+from app.services.recorder import record, KLINE
+
+logger = logging.getLogger("signals")
+logger.setLevel(logging.INFO)
+
+# 링버퍼 열 순서
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class OhlcvRing:
+    """심볼별 OHLCV 고정 크기 링버퍼 (NumPy)"""
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros((capacity, 6), dtype=np.float64)
+        self.capacity = capacity
+        self.head = 0     # 다음에 쓸 위치
+        self.count = 0
+
+    def append(self, bar) -> None:
+        self.data[self.head] = bar
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n: int | None = None) -> np.ndarray:
+        """최근 n개 봉을 시간순으로 반환 (복사본)"""
+        n = self.count if n is None else min(n, self.count)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.data[idx]
+
+    @property
+    def last_open_time(self) -> float:
+        if self.count == 0:
+            return -1.0
+        return self.data[(self.head - 1) % self.capacity, OPEN_TIME]
+
+
+# ── 증분 지표 (봉 하나당 O(1)) ───────────────────────────
+class EMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha  = 2 / (period + 1)
+        self.value  = None
+        self._n     = 0
+        self._sum   = 0.0
+
+    def update(self, x: float) -> float | None:
+        # 처음 period 개는 단순평균으로 시드
+        if self.value is None:
+            self._n += 1
+            self._sum += x
+            if self._n == self.period:
+                self.value = self._sum / self.period
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RSI:
+    """Wilder 방식 RSI"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value  = None
+        self._prev  = None
+        self._n     = 0
+        self._gain  = 0.0
+        self._loss  = 0.0
+
+    def update(self, close: float) -> float | None:
+        if self._prev is None:
+            self._prev = close
+            return None
+        change = close - self._prev
+        self._prev = close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        if self._n < self.period:
+            self._n += 1
+            self._gain += gain / self.period
+            self._loss += loss / self.period
+            if self._n < self.period:
+                return None
+        else:
+            self._gain = (self._gain * (self.period - 1) + gain) / self.period
+            self._loss = (self._loss * (self.period - 1) + loss) / self.period
+
+        if self._loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + self._gain / self._loss)
+        return self.value
+
+
+class ATR:
+    """Wilder 방식 ATR"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value  = None
+        self._prev_close = None
+        self._n     = 0
+        self._sum   = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float | None:
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+
+        if self.value is None:
+            self._n += 1
+            self._sum += tr
+            if self._n == self.period:
+                self.value = self._sum / self.period
+            return self.value
+        self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+# ── 규칙 ────────────────────────────────────────────────
+class EmaCrossRule:
+    """빠른 EMA가 느린 EMA를 상향 돌파하면 BUY, 하향 돌파하면 SELL"""
+
+    def __init__(self, fast: int, slow: int):
+        self.fast, self.slow = EMA(fast), EMA(slow)
+        self._prev_sign = 0
+
+    def update(self, bar) -> str | None:
+        f = self.fast.update(bar[CLOSE])
+        s = self.slow.update(bar[CLOSE])
+        if f is None or s is None:
+            return None
+        sign = (f > s) - (f < s)
+        if sign == 0:
+            return None   # 같아진 봉은 건너뛰고 다음 봉에서 방향 판단
+        prev, self._prev_sign = self._prev_sign, sign
+        if prev < 0 < sign:
+            return "BUY"
+        if prev > 0 > sign:
+            return "SELL"
+        return None
+
+
+class RsiRule:
+    """RSI가 low 를 위로 뚫으면 BUY, high 를 아래로 뚫으면 SELL"""
+
+    def __init__(self, period: int, low: float, high: float):
+        self.rsi = RSI(period)
+        self.low, self.high = low, high
+        self._prev = None
+
+    def update(self, bar) -> str | None:
+        value = self.rsi.update(bar[CLOSE])
+        prev, self._prev = self._prev, value
+        if prev is None or value is None:
+            return None
+        if prev < self.low <= value:
+            return "BUY"
+        if prev > self.high >= value:
+            return "SELL"
+        return None
+
+
+_RULES = {
+    "ema_cross": lambda a: EmaCrossRule(int(a[0]), int(a[1])),
+    "rsi":       lambda a: RsiRule(int(a[0]), float(a[1]), float(a[2])),
+}
+
+
+def parse_rules(spec: str) -> dict[tuple[str, str], list]:
+    """
+    "ETHUSDT@1m:ema_cross:9:21;BTCUSDT@5m:rsi:14:30:70"
+    → {("ETHUSDT", "1m"): [EmaCrossRule], ("BTCUSDT", "5m"): [RsiRule]}
+    """
+    rules: dict[tuple[str, str], list] = {}
+    for item in filter(None, (x.strip() for x in spec.split(";"))):
+        target, name, *args = item.split(":")
+        symbol, _, interval = target.partition("@")
+        if name not in _RULES:
+            raise ValueError(f"Unknown signal rule: {name}")
+        rules.setdefault((symbol.upper(), interval or "1m"), []).append(_RULES[name](args))
+    return rules
+
+
+class SymbolSignals:
+    """심볼·봉 간격 하나의 버퍼, 지표, 규칙 묶음"""
+
+    def __init__(self, symbol: str, interval: str, rules: list, capacity: int = SIGNAL_BUFFER):
+        self.symbol   = symbol
+        self.interval = interval
+        self.rules    = rules
+        self.ring     = OhlcvRing(capacity)
+        self.atr      = ATR(14)
+
+    def on_closed_bar(self, bar) -> str | None:
+        """마감된 봉 하나 반영. 규칙이 신호를 내면 "BUY"/"SELL" 반환"""
+        if bar[OPEN_TIME] <= self.ring.last_open_time:
+            return None   # 중복/역순 봉
+        self.ring.append(bar)
+        atr = self.atr.update(bar[HIGH], bar[LOW], bar[CLOSE])
+
+        signal = None
+        for rule in self.rules:
+            # 모든 규칙의 지표는 매 봉 갱신해야 하므로 첫 신호에서 멈추지 않음
+            signal = rule.update(bar) or signal
+
+        if signal and SIGNAL_MIN_ATR_PCT > 0:
+            if atr is None or atr / bar[CLOSE] * 100 < SIGNAL_MIN_ATR_PCT:
+                logger.info(f"{self.symbol} {signal} filtered by ATR ({atr})")
+                return None
+        return signal
+
+
+def _kline_to_bar(k: dict) -> tuple:
+    return (float(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+
+
+class SignalEngine:
+    """
+    거래소 kline 스트림으로 지표를 직접 계산해 신호를 냅니다.
+    신호는 웹훅과 같은 process_alert() 파이프라인으로 들어갑니다.
+    """
+
+    def __init__(self, rules: dict[tuple[str, str], list], on_signal):
+        self.on_signal = on_signal
+        self.symbols = {
+            key: SymbolSignals(key[0], key[1], rule_list)
+            for key, rule_list in rules.items()
+        }
+        self._twm = None
+
+    def warmup(self, client) -> None:
+        """과거 봉으로 지표를 미리 채워 시작 직후부터 유효한 신호를 냄 (신호는 버림)"""
+        for (symbol, interval), ss in self.symbols.items():
+            klines = client.futures_klines(symbol=symbol, interval=interval, limit=ss.ring.capacity)
+            # 마지막 봉은 아직 진행 중
+            for k in klines[:-1]:
+                ss.on_closed_bar(tuple(float(x) for x in k[:6]))
+            logger.info(f"Warmed up {symbol}@{interval} with {ss.ring.count} bars")
+
+    def handle_kline(self, msg: dict) -> None:
+        record(KLINE, msg)
+        msg = msg.get("data", msg)
+        k = msg.get("k")
+        if not k or not k.get("x"):
+            return
+        symbol = (msg.get("ps") or msg.get("s") or k.get("s", "")).upper()
+        ss = self.symbols.get((symbol, k.get("i")))
+        if ss is None:
+            return
+        signal = ss.on_closed_bar(_kline_to_bar(k))
+        if signal:
+            logger.info(f"Local signal {signal} {symbol}@{ss.interval} close={k['c']}")
+            self.on_signal(symbol, signal)
+
+    def start(self, client) -> None:
+        self.warmup(client)
+        self._twm = ThreadedWebsocketManager(api_key=client.API_KEY, api_secret=client.API_SECRET)
+        self._twm.start()
+        try:
+            for symbol, interval in self.symbols:
+                self._twm.start_kline_futures_socket(callback=self.handle_kline, symbol=symbol, interval=interval)
+        except Exception:
+            self._twm.stop()
+            raise
+        logger.info(f"Signal engine streaming {len(self.symbols)} symbol(s)")
+
+
+_engine: SignalEngine | None = None
+
+
+def _dispatch(symbol: str, action: str) -> None:
+    # 리더만 매매, 웹소켓 콜백 스레드를 막지 않도록 별도 스레드에서 실행
+    if not elector.is_leader():
+        return
+
+    def _run():
+        try:
+            res = process_alert(symbol, action, SOURCE_LOCAL)
+            logger.info(f"Local signal {action} {symbol} → {res.get('status')}")
+        except Exception:
+            logger.exception(f"Local signal {action} {symbol} failed")
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
+def start_signal_engine() -> None:
+    """SIGNAL_ENGINE 이 켜져 있으면 리더 프로세스에서 한 번 시작"""
+    global _engine
+    if SIGNAL_ENGINE == "off" or _engine is not None:
+        return
+    rules = parse_rules(SIGNAL_RULES)
+    if not rules:
+        logger.warning("SIGNAL_ENGINE is on but SIGNAL_RULES is empty")
+        return
+    engine = SignalEngine(rules, _dispatch)
+    engine.start(get_binance_client())
+    # 시작에 성공한 경우에만 기록 (실패하면 다음 선출 때 다시 시도)
+    _engine = engine
@@ -2,32 +2,29 @@ import logging
 import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
-from app.clients.binance_client import get_binance_client
-from app.config import DRY_RUN, POLL_INTERVAL, MAX_WAIT
+from binance.enums import SIDE_BUY, SIDE_SELL
+from app.clients.exchange import client_order_id
+from app.clients.venues import get_router
+from app.config import POLL_INTERVAL, MAX_WAIT, FLIP_MODE
 from app.services.buy import execute_buy
 from app.services.sell import execute_sell
 from app.state import monitor_state
+from app.services.monitor import remove_position
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-def _wait_for(symbol: str, target_amt: float) -> bool:
+def _wait_for(ex, symbol: str, target_amt: float) -> bool:
     """
     target_amt > 0 : 롱 포지션 대기
     target_amt < 0 : 숏 포지션 대기
     target_amt == 0: 포지션 청산 대기
     """
-    client = get_binance_client()
     start = time.time()
     current = None
 
     while time.time() - start < MAX_WAIT:
-        positions = client.futures_position_information(symbol=symbol)
-        current = next(
-            (float(p["positionAmt"]) for p in positions if p["symbol"] == symbol),
-            0.0
-        )
+        current = ex.position_amt(symbol)
         if target_amt > 0 and current > 0:
             return True
         if target_amt < 0 and current < 0:
@@ -39,119 +36,186 @@ def _wait_for(symbol: str, target_amt: float) -> bool:
     logger.warning(f"Switch timeout: target {target_amt}, current {current}")
     return False
 
-def _cancel_open_reduceonly_orders(symbol: str):
+def _cancel_open_reduceonly_orders(ex, symbol: str):
     """⭐ reduceOnly 주문 전부 취소 (TP/SL 잔존 제거용)"""
-    client = get_binance_client()
-    open_orders = client.futures_get_open_orders(symbol=symbol)
-    for order in open_orders:
-        if order.get("reduceOnly"):
-            client.futures_cancel_order(symbol=symbol, orderId=order["orderId"])
-            logger.info(f"[Cleanup] Canceled reduceOnly order {order['orderId']}")
-
-def switch_position(symbol: str, action: str) -> dict:
+    for order_id in ex.cancel_reduce_only(symbol):
+        logger.info(f"[Cleanup] Canceled reduceOnly order {order_id}")
+
+def _entry_price(symbol: str) -> float:
+    """청산하는 포지션의 진입가 (심볼별 포지션 기준, 대시보드 심볼이면 예전 전역값도 허용)"""
+    pos = (monitor_state.get("positions") or {}).get(symbol) or {}
+    if pos.get("entry_price"):
+        return pos["entry_price"]
+    if monitor_state.get("symbol") == symbol:
+        return monitor_state.get("entry_price", 0.0)
+    return 0.0
+
+
+def _record_close_pnl(closing: str, entry_price: float, exit_price: float) -> None:
+    """전환 청산이 손실이면 손절 횟수와 일일 PnL 에 반영"""
+    if not entry_price or not exit_price:
+        return
+    if closing == "LONG":
+        pnl = (exit_price / entry_price - 1) * 100
+    else:
+        pnl = (entry_price / exit_price - 1) * 100
+    if pnl < 0:
+        monitor_state.incr("sl_count")
+        monitor_state.incr("daily_pnl", pnl)
+        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"Stop-loss on reversal {closing}: {pnl:.2f}% at {now}")
+
+
+def _close_market(ex, symbol: str, closing: str, qty: float, key: str | None) -> tuple[bool, float]:
+    """
+    반대 포지션을 reduceOnly 시장가로 청산하고 평탄화를 기다린 뒤 남은 TP/SL 을 정리합니다.
+    반환: (청산 완료 여부, 체결 평균가 — 응답에 없으면 현재가)
+    """
+    order = ex.market_order(symbol, SIDE_SELL if closing == "LONG" else SIDE_BUY, qty, reduce_only=True,
+                            client_id=client_order_id(key, "close"))
+    if not _wait_for(ex, symbol, 0.0):
+        return False, 0.0
+    # 청산된 포지션의 소프트웨어 TP/SL 해제
+    remove_position(symbol)
+    # 청산 후에도 남아 있을 수 있는 TP/SL 주문 정리
+    _cancel_open_reduceonly_orders(ex, symbol)
+    exit_price = order.get("avg_price") or 0.0
+    if not exit_price:
+        try:
+            exit_price = ex.last_price(symbol)
+        except Exception:
+            logger.exception(f"Failed to fetch exit price for {symbol}")
+    return True, exit_price
+
+
+def _reverse(ex, symbol: str, action: str, close_qty: float, key: str | None = None) -> dict:
+    """
+    반대 포지션을 시장가 주문 한 번으로 뒤집습니다.
+    주문 수량 = 청산 수량 + 새 진입 수량, 브래킷은 체결 결과에서 청산분을 뺀 수량으로 겁니다.
+    청산 손익은 티커 대신 실제 체결 평균가로 계산합니다.
+
+    뒤집기 주문이 나가지 못했거나(수량 부족, 에러) 청산분도 다 채우지 못하면
+    TP/SL 이 이미 취소된 반대 포지션이 남으므로, 남은 수량을 close 모드처럼 reduceOnly 시장가로 청산합니다.
+    """
+    closing = "SHORT" if action == "BUY" else "LONG"
+    entry_price = _entry_price(symbol)
+    logger.info(f"Reversing {closing} {close_qty} → {action} @ market for {symbol}")
+
+    started = time.perf_counter()
+    if action == "BUY":
+        res = execute_buy(symbol, close_qty=close_qty, ex=ex, key=key)
+    else:
+        res = execute_sell(symbol, close_qty=close_qty, ex=ex, key=key)
+    reversal_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    execution = res.get("execution") or {}
+    closed = min(execution.get("executed_qty", 0.0), close_qty)
+    exits = [(closed, execution["avg_price"])] if closed > 0 else []
+
+    if closed < close_qty:
+        amt = ex.position_amt(symbol)
+        left = -amt if closing == "SHORT" else amt
+        if left > 0:
+            logger.warning(f"Reversal {closing}→{action} {symbol} closed {closed}/{close_qty}, "
+                           f"closing remaining {left} with reduceOnly market")
+            done, exit_price = _close_market(ex, symbol, closing, left, key)
+            if not done:
+                res = {**res, "skipped": "close_failed"}
+            elif exit_price:
+                exits.append((left, exit_price))
+            closed += left
+        else:
+            # 반대 포지션은 이미 없음 (다른 경로로 청산됨)
+            closed = close_qty
+    if closed >= close_qty:
+        # 청산분이 모두 체결됐으니 이전 포지션의 소프트웨어 TP/SL 해제
+        remove_position(symbol)
+    if exits:
+        try:
+            exit_price = sum(q * p for q, p in exits) / sum(q for q, _ in exits)
+            _record_close_pnl(closing, entry_price, exit_price)
+        except Exception:
+            logger.exception(f"Failed to calc PnL on {closing} reversal")
+
+    logger.info(f"Reversal {closing}→{action} {symbol}: closed {closed}/{close_qty}, {reversal_ms}ms")
+    res["reversal"] = {"mode": "reverse", "closed": closed, "close_to_open_ms": reversal_ms}
+    return res
+
+
+def _flip_close(ex, symbol: str, action: str, close_qty: float, key: str | None = None) -> dict:
+    """FLIP_MODE=close: 시장가 청산 → 평탄화 대기 → 정리 → 새 진입"""
+    closing = "SHORT" if action == "BUY" else "LONG"
+    entry_price = _entry_price(symbol)
+    logger.info(f"Closing {closing} {close_qty} @ market for {symbol}")
+    flip_started = time.perf_counter()
+    done, exit_price = _close_market(ex, symbol, closing, close_qty, key)
+    if not done:
+        return {"skipped": "close_failed"}
+
+    # 청산 시 손절 여부 기록
+    try:
+        _record_close_pnl(closing, entry_price, exit_price)
+    except Exception:
+        logger.exception(f"Failed to calc SL PnL on {closing.lower()} close")
+
+    if action == "BUY":
+        res = execute_buy(symbol, ex=ex, key=key)
+    else:
+        res = execute_sell(symbol, ex=ex, key=key)
+    close_to_open_ms = round((time.perf_counter() - flip_started) * 1000, 1)
+    logger.info(f"Flip {closing}→{action} {symbol} (close mode): {close_to_open_ms}ms")
+    res["reversal"] = {"mode": "close", "closed": close_qty, "close_to_open_ms": close_to_open_ms}
+    return res
+
+
+def _venue(ex, res: dict) -> dict:
+    """결과에 주문을 보낸 거래소 이름을 남김 (포지션 등록 시 사용)"""
+    res["venue"] = ex.name
+    return res
+
+
+def switch_position(symbol: str, action: str, key: str | None = None) -> dict:
     """
     symbol 예: "ETHUSDT"
     action: "BUY" 또는 "SELL"
     항상 진입 전에 남아 있는 모든 reduceOnly 주문을 취소하고,
-    반대 포지션이 있으면 시장가로 청산 후 다시 한 번 정리하고,
-    새 신호에 맞게 진입합니다.
+    반대 포지션이 있으면 FLIP_MODE=reverse 는 주문 한 번으로 뒤집고,
+    close 는 시장가로 청산 후 다시 한 번 정리하고 새 신호에 맞게 진입합니다.
+    key 는 신호 키 (이 신호로 나가는 모든 주문의 clientOrderId 접두어)
     """
-    client = get_binance_client()
+    # 포지션이 있으면 그 거래소, 없으면 지연/상태 기준으로 거래소 선택
+    holder = ((monitor_state.get("positions") or {}).get(symbol) or {}).get("venue")
+    ex = get_router().pick(symbol, holder)
+    logger.info(f"Routing {action} {symbol} to {ex.name}")
 
-    # Dry-run 스킵
-    if DRY_RUN:
-        logger.info(f"[DRY_RUN] switch_position {action} {symbol}")
-        return {"skipped": "dry_run"}
+    action = action.upper()
+    if action not in ("BUY", "SELL"):
+        # 알 수 없는 action
+        logger.error(f"Unknown action for switch: {action}")
+        return {"skipped": "unknown_action"}
 
     # 0) 진입 전, 모든 기존 reduceOnly 주문 취소
-    _cancel_open_reduceonly_orders(symbol)
+    _cancel_open_reduceonly_orders(ex, symbol)
 
     # 신호 받을 때마다 전체 거래 횟수 카운터 증가
-    monitor_state["trade_count"] += 1
+    monitor_state.incr("trade_count")
 
     # 1) 현재 포지션 조회
-    positions = client.futures_position_information(symbol=symbol)
-    current_amt = next(
-        (float(p["positionAmt"]) for p in positions if p["symbol"] == symbol),
-        0.0
-    )
-
-    # BUY 신호 처리
-    if action.upper() == "BUY":
-        # 이미 롱 포지션이 있으면 스킵
-        if current_amt > 0:
-            return {"skipped": "already_long"}
-
-        # 숏 포지션이 있으면 청산
-        if current_amt < 0:
-            qty = abs(current_amt)
-            logger.info(f"Closing SHORT {qty} @ market for {symbol}")
-            client.futures_create_order(
-                symbol=symbol,
-                side=SIDE_BUY,
-                type=ORDER_TYPE_MARKET,
-                quantity=qty,
-                reduceOnly=True
-            )
-            if not _wait_for(symbol, 0.0):
-                return {"skipped": "close_failed"}
-            # 청산 후에도 남아 있을 수 있는 TP/SL 주문 정리
-            _cancel_open_reduceonly_orders(symbol)
-
-            # 청산 시 손절 여부 기록
-            try:
-                entry_price   = monitor_state.get("entry_price", 0.0)
-                current_price = float(client.futures_symbol_ticker(symbol=symbol)["price"])
-                pnl = (current_price / entry_price - 1) * 100
-                if pnl < 0:
-                    monitor_state["sl_count"]  += 1
-                    monitor_state["daily_pnl"] += pnl
-                    now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-                    logger.info(f"Stop-loss on switch SHORT→LONG: {pnl:.2f}% at {now}")
-            except Exception:
-                logger.exception("Failed to calc SL PnL on short close")
-
-        # 새 롱 진입
-        return execute_buy(symbol)
-
-    # SELL 신호 처리
-    if action.upper() == "SELL":
-        # 이미 숏 포지션이 있으면 스킵
-        if current_amt < 0:
-            return {"skipped": "already_short"}
-
-        # 롱 포지션이 있으면 청산
-        if current_amt > 0:
-            qty = current_amt
-            logger.info(f"Closing LONG {qty} @ market for {symbol}")
-            client.futures_create_order(
-                symbol=symbol,
-                side=SIDE_SELL,
-                type=ORDER_TYPE_MARKET,
-                quantity=qty,
-                reduceOnly=True
-            )
-            if not _wait_for(symbol, 0.0):
-                return {"skipped": "close_failed"}
-            # 청산 후 TP/SL 주문 정리
-            _cancel_open_reduceonly_orders(symbol)
-
-            # 청산 시 손절 여부 기록
-            try:
-                entry_price   = monitor_state.get("entry_price", 0.0)
-                current_price = float(client.futures_symbol_ticker(symbol=symbol)["price"])
-                pnl = (entry_price / current_price - 1) * 100
-                if pnl < 0:
-                    monitor_state["sl_count"]  += 1
-                    monitor_state["daily_pnl"] += pnl
-                    now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-                    logger.info(f"Stop-loss on switch LONG→SHORT: {pnl:.2f}% at {now}")
-            except Exception:
-                logger.exception("Failed to calc SL PnL on long close")
-
-        # 새 숏 진입
-        return execute_sell(symbol)
-
-    # 알 수 없는 action
-    logger.error(f"Unknown action for switch: {action}")
-    return {"skipped": "unknown_action"}
\ No newline at end of file
+    current_amt = ex.position_amt(symbol)
+
+    # 이미 같은 방향 포지션이 있으면 스킵
+    if action == "BUY" and current_amt > 0:
+        return {"skipped": "already_long"}
+    if action == "SELL" and current_amt < 0:
+        return {"skipped": "already_short"}
+
+    # 반대 포지션이 있으면 뒤집기
+    if current_amt != 0:
+        if FLIP_MODE == "reverse":
+            return _venue(ex, _reverse(ex, symbol, action, abs(current_amt), key))
+        return _venue(ex, _flip_close(ex, symbol, action, abs(current_amt), key))
+
+    # 새 진입
+    if action == "BUY":
+        return _venue(ex, execute_buy(symbol, ex=ex, key=key))
+    return _venue(ex, execute_sell(symbol, ex=ex, key=key))
@@ -0,0 +1,239 @@
+# app/services/triggers.py
+
+import heapq
+import itertools
+import math
+import threading
+
+# 트리거 방향: 가격이 level 이상이 되면(ABOVE) / 이하가 되면(BELOW) 발동
+ABOVE = "ABOVE"
+BELOW = "BELOW"
+
+# 스테일 힙 항목이 살아 있는 항목의 이 배수를 넘으면 힙을 재구성
+_COMPACT_FACTOR = 2
+
+
+class Trigger:
+    """
+    가격 트리거 하나.
+    trail > 0 이면 트레일링 스탑: 롱은 최고가 × (1 − trail), 숏은 최저가 × (1 + trail).
+    """
+    __slots__ = ("id", "symbol", "direction", "level", "kind", "qty", "tag",
+                 "trail", "extreme", "active")
+
+    def __init__(self, tid, symbol, direction, level, kind, qty, tag, trail=0.0, extreme=0.0):
+        self.id        = tid
+        self.symbol    = symbol
+        self.direction = direction
+        self.level     = level
+        self.kind      = kind
+        self.qty       = qty
+        self.tag       = tag
+        self.trail     = trail
+        self.extreme   = extreme
+        self.active    = True
+
+    def __repr__(self):
+        return (f"Trigger(id={self.id}, {self.symbol} {self.kind} {self.direction} "
+                f"@ {self.level}, tag={self.tag})")
+
+
+class _SymbolBook:
+    """
+    심볼별 트리거. 고정 레벨은 힙(취소는 지연 삭제), 트레일링 스탑은 목록
+    (포지션당 하나라 레벨이 움직일 때마다 힙에 다시 넣는 것보다 싸다).
+    lo < 가격 < hi 이면 이 심볼에서는 아무 일도 일어나지 않는 틱입니다.
+    """
+    __slots__ = ("above", "below", "trailing", "live", "stale", "lo", "hi")
+
+    def __init__(self):
+        self.above = []        # (level, id)    최소 힙: level ≤ price 면 발동
+        self.below = []        # (-level, id)   최대 힙: level ≥ price 면 발동
+        self.trailing: list[Trigger] = []
+        self.live  = 0
+        self.stale = 0
+        self.lo    = -math.inf
+        self.hi    = math.inf
+
+
+class TriggerEngine:
+    """
+    여러 포지션의 TP/SL/트레일링 레벨을 심볼별 가격 힙으로 색인합니다.
+    심볼마다 "아무것도 넘지 않는 가격 구간"(lo, hi)을 유지해, 대부분의 틱은
+    비교 두 번으로 끝나고 실제로 넘어선 트리거만 힙에서 꺼냅니다 (트리거 하나당 O(log n)).
+    한 번의 시세 조회로 받은 여러 심볼 가격은 on_prices() 로 잠금 한 번에 처리하세요.
+
+    (benchmarks/ ticks.trigger_engine_50: 포지션 50개, 아무것도 넘지 않는 틱 기준. 심볼마다
+    on_price 를 부르면 호출당 잠금 비용이 붙어 on_prices 한 번보다 약 5배 느림)
+    """
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._books: dict[str, _SymbolBook] = {}
+        self._triggers: dict[int, Trigger] = {}
+        self._seq      = itertools.count(1)
+
+    # ── 등록 / 취소 ──────────────────────────────────
+    def add(self, symbol: str, direction: str, level: float, kind: str,
+            qty: float = 0.0, tag=None) -> int:
+        """고정 레벨 트리거 등록. 발동 시 on_price() 결과로 반환됩니다."""
+        with self._lock:
+            t = Trigger(next(self._seq), symbol, direction, level, kind, qty, tag)
+            self._insert(t)
+            return t.id
+
+    def add_trailing(self, symbol: str, side: str, trail: float, ref_price: float,
+                     kind: str = "TRAIL", qty: float = 0.0, tag=None) -> int:
+        """
+        트레일링 스탑 등록.
+        side="LONG" : 최고가에서 trail 만큼 떨어지면 발동
+        side="SHORT": 최저가에서 trail 만큼 오르면 발동
+        """
+        with self._lock:
+            if side == "LONG":
+                t = Trigger(next(self._seq), symbol, BELOW, ref_price * (1 - trail),
+                            kind, qty, tag, trail=trail, extreme=ref_price)
+            else:
+                t = Trigger(next(self._seq), symbol, ABOVE, ref_price * (1 + trail),
+                            kind, qty, tag, trail=trail, extreme=ref_price)
+            self._insert(t)
+            return t.id
+
+    def cancel(self, trigger_id: int) -> bool:
+        with self._lock:
+            t = self._triggers.pop(trigger_id, None)
+            if t is None:
+                return False
+            self._retire(t)
+            return True
+
+    def cancel_tag(self, tag) -> int:
+        """같은 tag(예: 포지션 키)의 트리거를 모두 취소합니다."""
+        with self._lock:
+            ids = [tid for tid, t in self._triggers.items() if t.tag == tag]
+            for tid in ids:
+                self._retire(self._triggers.pop(tid))
+            return len(ids)
+
+    def get(self, trigger_id: int) -> Trigger | None:
+        return self._triggers.get(trigger_id)
+
+    def symbols(self) -> list[str]:
+        """활성 트리거가 있는 심볼 목록"""
+        with self._lock:
+            return [s for s, b in self._books.items() if b.live > 0]
+
+    def __len__(self):
+        return len(self._triggers)
+
+    # ── 가격 처리 ────────────────────────────────────
+    def on_price(self, symbol: str, price: float) -> list[Trigger]:
+        """가격을 반영하고 이번 가격에 발동한 트리거를 레벨 순서대로 반환합니다."""
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None or book.lo < price < book.hi:
+                return []
+            fired = []
+            self._tick(book, price, fired)
+            return fired
+
+    def on_prices(self, prices: dict[str, float]) -> list[Trigger]:
+        """여러 심볼 가격을 잠금 한 번에 반영 (발동 순서는 심볼별 레벨 순)"""
+        fired = []
+        books = self._books
+        with self._lock:
+            for symbol, price in prices.items():
+                book = books.get(symbol)
+                if book is None or book.lo < price < book.hi:
+                    continue
+                self._tick(book, price, fired)
+        return fired
+
+    # ── 내부 구현 (잠금 안에서 호출) ──────────────────
+    def _tick(self, book: _SymbolBook, price: float, fired: list) -> None:
+        # 트레일링: 새 고점/저점이면 레벨을 옮기고, 넘어섰으면 발동
+        for t in list(book.trailing):
+            if t.direction == BELOW:
+                if price > t.extreme:
+                    t.extreme = price
+                    t.level   = price * (1 - t.trail)
+                hit = price <= t.level
+            else:
+                if price < t.extreme:
+                    t.extreme = price
+                    t.level   = price * (1 + t.trail)
+                hit = price >= t.level
+            if hit:
+                del self._triggers[t.id]
+                t.active = False
+                book.trailing.remove(t)
+                book.live -= 1
+                fired.append(t)
+
+        above, below = book.above, book.below
+        while above and above[0][0] <= price:
+            self._take(book, heapq.heappop(above)[1], fired)
+        while below and -below[0][0] >= price:
+            self._take(book, heapq.heappop(below)[1], fired)
+
+        if book.stale > _COMPACT_FACTOR * max(book.live, 8):
+            self._compact(book)
+        self._bounds(book)
+
+    def _insert(self, t: Trigger) -> None:
+        book = self._books.get(t.symbol)
+        if book is None:
+            book = self._books[t.symbol] = _SymbolBook()
+        self._triggers[t.id] = t
+        book.live += 1
+        if t.trail > 0:
+            book.trailing.append(t)
+        elif t.direction == ABOVE:
+            heapq.heappush(book.above, (t.level, t.id))
+        else:
+            heapq.heappush(book.below, (-t.level, t.id))
+        self._bounds(book)
+
+    def _retire(self, t: Trigger) -> None:
+        t.active = False
+        book = self._books[t.symbol]
+        book.live -= 1
+        if t.trail > 0:
+            book.trailing.remove(t)
+        else:
+            book.stale += 1
+        self._bounds(book)
+
+    def _take(self, book: _SymbolBook, tid: int, fired: list) -> None:
+        t = self._triggers.get(tid)
+        if t is None or not t.active:
+            book.stale -= 1
+            return
+        del self._triggers[tid]
+        t.active = False
+        book.live -= 1
+        fired.append(t)
+
+    def _bounds(self, book: _SymbolBook) -> None:
+        """
+        이 가격 구간 밖으로 나가야 무언가 일어남. 힙 꼭대기가 스테일 항목이면
+        구간이 좁게 잡힐 뿐(다음 틱에 정리됨) 트리거를 놓치지는 않습니다.
+        """
+        hi = book.above[0][0] if book.above else math.inf
+        lo = -book.below[0][0] if book.below else -math.inf
+        for t in book.trailing:
+            if t.direction == BELOW:
+                hi = min(hi, t.extreme)     # 새 고점 → 레벨 이동
+                lo = max(lo, t.level)
+            else:
+                hi = min(hi, t.level)
+                lo = max(lo, t.extreme)     # 새 저점 → 레벨 이동
+        book.lo, book.hi = lo, hi
+
+    def _compact(self, book: _SymbolBook) -> None:
+        for name in ("above", "below"):
+            heap = [e for e in getattr(book, name)
+                    if (t := self._triggers.get(e[1])) is not None and t.active]
+            heapq.heapify(heap)
+            setattr(book, name, heap)
+        book.stale = 0
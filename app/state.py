@@ -1,12 +1,13 @@
 # app/state.py
 
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from collections.abc import MutableMapping
+from app.store import StateStore, get_store
 
-monitor_state = {
+DEFAULT_STATE = {
     "symbol": "ETHUSDT",
 
     # 진입 정보
+    "side": "LONG",
     "entry_price": 0.0,
     "position_qty": 0.0,
     "entry_time": "",
@@ -42,5 +43,61 @@ monitor_state = {
     "second_tp_count": 0,   # 2차 익절 시 +1  
     "sl_count": 0,          # 손절 시 +1  
     "daily_pnl": 0.0,       # 모든 익절/손절 PnL 합산(%)  
-    "last_reset": ""        # 마지막 리셋 일자(YYYY-MM-DD)  
-}
\ No newline at end of file
+    "last_reset": "",       # 마지막 리셋 일자(YYYY-MM-DD)  
+
+    # 모니터가 관리하는 포지션들: {symbol: {side, entry_price, qty, ...}}
+    "positions": {},
+    "positions_version": 0,  # 포지션 등록/삭제 시 +1 (리더가 재동기화)
+}
+
+
+class SharedState(MutableMapping):
+    """
+    StateStore 위에 얹은 dict 형태의 상태.
+    모든 워커가 같은 저장소를 보므로 어느 프로세스에서 읽고 써도 같은 값이 보입니다.
+    카운터 증가는 반드시 incr() 로 해야 워커 간에 값이 유실되지 않습니다.
+    """
+
+    def __init__(self, store: StateStore, defaults: dict):
+        self.store = store
+        store.setdefaults(defaults)
+
+    def __getitem__(self, key):
+        value = self.store.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.store.update({key: value})
+
+    def __delitem__(self, key):
+        self.store.delete(key)
+
+    def __iter__(self):
+        return iter(self.store.snapshot())
+
+    def __len__(self):
+        return len(self.store.snapshot())
+
+    def update(self, other=(), **kwargs):
+        # 여러 키를 한 번의 잠금으로 기록
+        self.store.update(dict(other, **kwargs))
+
+    def snapshot(self) -> dict:
+        return self.store.snapshot()
+
+    def swap(self, values: dict) -> dict:
+        return self.store.swap(values)
+
+    def transact(self, fn):
+        """fn(state)를 잠금 안에서 실행 (중첩 dict 를 원자적으로 수정할 때)"""
+        return self.store.transact(lambda d: fn(d["state"]))
+
+    def incr(self, key, delta=1):
+        return self.store.incr(key, delta)
+
+
+_MISSING = object()
+
+monitor_state = SharedState(get_store(), DEFAULT_STATE)
@@ -0,0 +1,219 @@
+# app/store.py
+
+import fcntl
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from app.config import STATE_BACKEND, STATE_SHM_NAME, STATE_SHM_SIZE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 공유 메모리 앞 4바이트는 JSON 본문 길이
+_HEADER = struct.Struct("<I")
+
+
+class StateStore:
+    """
+    프로세스 간에 공유 가능한 상태 저장소의 공통 인터페이스.
+    하위 클래스는 _locked / _load / _save 만 구현하면 되고,
+    모든 읽기·쓰기는 잠금 안에서 원자적으로 수행됩니다.
+
+    내부 구조: {"state": {...}, "leases": {...}}
+    """
+
+    @contextmanager
+    def _locked(self):
+        raise NotImplementedError
+
+    def _load(self) -> dict:
+        raise NotImplementedError
+
+    def _save(self, data: dict) -> None:
+        raise NotImplementedError
+
+    def transact(self, fn):
+        """fn(data)를 잠금 안에서 실행하고 변경 내용을 저장합니다."""
+        with self._locked():
+            data = self._load()
+            result = fn(data)
+            self._save(data)
+            return result
+
+    def read(self, fn):
+        """fn(data)를 잠금 안에서 실행합니다 (저장하지 않음)."""
+        with self._locked():
+            return fn(self._load())
+
+    # ── 상태(state) 네임스페이스 ─────────────────────
+    def snapshot(self) -> dict:
+        return self.read(lambda d: dict(d["state"]))
+
+    def get(self, key, default=None):
+        return self.read(lambda d: d["state"].get(key, default))
+
+    def update(self, values: dict) -> None:
+        self.transact(lambda d: d["state"].update(values))
+
+    def delete(self, key) -> None:
+        self.transact(lambda d: d["state"].pop(key, None))
+
+    def setdefaults(self, defaults: dict) -> None:
+        def _fn(d):
+            for k, v in defaults.items():
+                d["state"].setdefault(k, v)
+        self.transact(_fn)
+
+    def swap(self, values: dict) -> dict:
+        """values 를 기록하고 덮어쓰기 전의 값들을 반환합니다."""
+        def _fn(d):
+            old = {k: d["state"].get(k) for k in values}
+            d["state"].update(values)
+            return old
+        return self.transact(_fn)
+
+    def incr(self, key, delta=1):
+        def _fn(d):
+            d["state"][key] = d["state"].get(key, 0) + delta
+            return d["state"][key]
+        return self.transact(_fn)
+
+    # ── 리더 임대(lease) ─────────────────────────────
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> int | None:
+        """
+        임대를 새로 얻거나 갱신합니다.
+        성공 시 펜싱 토큰을 반환하고, 다른 소유자가 유효한 임대를 갖고 있으면 None.
+        소유자가 바뀔 때마다 토큰은 1씩 증가합니다.
+        """
+        def _fn(d):
+            now = time.time()
+            lease = d["leases"].get(name)
+            if lease and lease["owner"] == owner and lease["expires"] > now:
+                lease["expires"] = now + ttl
+                return lease["token"]
+            if lease and lease["expires"] > now:
+                return None
+            token = (lease["token"] if lease else 0) + 1
+            d["leases"][name] = {"owner": owner, "token": token, "expires": now + ttl}
+            return token
+        return self.transact(_fn)
+
+    def release_lease(self, name: str, owner: str) -> None:
+        def _fn(d):
+            lease = d["leases"].get(name)
+            if lease and lease["owner"] == owner:
+                lease["expires"] = 0.0
+        self.transact(_fn)
+
+    def lease_holder(self, name: str) -> tuple[str, int] | None:
+        """현재 유효한 임대의 (소유자, 토큰). 없으면 None."""
+        def _fn(d):
+            lease = d["leases"].get(name)
+            if lease and lease["expires"] > time.time():
+                return lease["owner"], lease["token"]
+            return None
+        return self.read(_fn)
+
+
+class LocalStore(StateStore):
+    """단일 프로세스용 저장소 (기본값, 테스트 대용)."""
+
+    def __init__(self):
+        self._data = {"state": {}, "leases": {}}
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            yield
+
+    def _load(self) -> dict:
+        return self._data
+
+    def _save(self, data: dict) -> None:
+        pass
+
+
+class SharedMemoryStore(StateStore):
+    """
+    같은 노드의 여러 uvicorn 워커가 공유하는 저장소.
+    상태는 이름 있는 공유 메모리에 JSON으로 저장되고,
+    프로세스 간 잠금은 flock, 스레드 간 잠금은 Lock 으로 처리합니다.
+    """
+
+    def __init__(self, name: str = STATE_SHM_NAME, size: int = STATE_SHM_SIZE):
+        try:
+            self._shm = SharedMemory(name=name, create=True, size=size)
+            logger.info(f"Created shared state segment {name} ({size} bytes)")
+        except FileExistsError:
+            self._shm = SharedMemory(name=name)
+            logger.info(f"Attached to shared state segment {name}")
+        # 한 워커가 종료될 때 resource_tracker 가 세그먼트를 지우지 않도록 해제
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        self._tlock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._tlock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _load(self) -> dict:
+        buf = self._shm.buf
+        (length,) = _HEADER.unpack_from(buf, 0)
+        if length == 0:
+            return {"state": {}, "leases": {}}
+        return json.loads(bytes(buf[_HEADER.size:_HEADER.size + length]))
+
+    def _save(self, data: dict) -> None:
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        if _HEADER.size + len(raw) > self._shm.size:
+            raise RuntimeError(
+                f"Shared state too large: {len(raw)} bytes (STATE_SHM_SIZE={self._shm.size})"
+            )
+        buf = self._shm.buf
+        buf[_HEADER.size:_HEADER.size + len(raw)] = raw
+        _HEADER.pack_into(buf, 0, len(raw))
+
+    def unlink(self) -> None:
+        """세그먼트 삭제 (모든 워커 종료 후 운영자가 호출)."""
+        self._shm.close()
+        # 생성 시 해제한 추적 등록을 되돌려야 unlink 가 resource_tracker 에러를 내지 않음
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+# 싱글톤으로 저장소 인스턴스 관리
+_store: StateStore | None = None
+
+def get_store() -> StateStore:
+    """
+    STATE_BACKEND 설정에 맞는 저장소를 반환합니다.
+    local: 프로세스 내부 dict (워커 1개일 때)
+    shm:   같은 노드의 워커들이 공유하는 공유 메모리
+    """
+    global _store
+
+    if _store is None:
+        if STATE_BACKEND == "shm":
+            _store = SharedMemoryStore()
+        elif STATE_BACKEND == "local":
+            _store = LocalStore()
+        else:
+            raise RuntimeError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+
+    return _store
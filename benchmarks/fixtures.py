@@ -0,0 +1,138 @@
+# benchmarks/fixtures.py
+
+import random
+
+# 실제 USDⓈ-M 선물 거래소 정보와 비슷한 규모
+EXCHANGE_INFO_SYMBOLS = 420
+BALANCE_ASSETS = ("BTC", "BNB", "ETH", "USDC", "FDUSD", "BFUSD", "XRP", "SOL", "DOGE", "ADA",
+                  "TRX", "LINK", "DOT", "LTC", "BCH", "AVAX", "MATIC", "ATOM", "ETC", "FIL",
+                  "NEAR", "APT", "ARB", "OP", "USDT")
+
+_STEPS = ("1", "0.1", "0.01", "0.001")
+_TICKS = ("0.1", "0.01", "0.001", "0.0001", "0.00001", "0.000001")
+
+
+def _symbol_info(symbol: str, rng: random.Random) -> dict:
+    step = rng.choice(_STEPS)
+    tick = rng.choice(_TICKS)
+    return {
+        "symbol":            symbol,
+        "pair":              symbol,
+        "contractType":      "PERPETUAL",
+        "deliveryDate":      4133404800000,
+        "onboardDate":       1569398400000,
+        "status":            "TRADING",
+        "maintMarginPercent": "2.5000",
+        "requiredMarginPercent": "5.0000",
+        "baseAsset":         symbol[:-4],
+        "quoteAsset":        "USDT",
+        "marginAsset":       "USDT",
+        "pricePrecision":    len(tick.split(".")[-1]) if "." in tick else 0,
+        "quantityPrecision": len(step.split(".")[-1]) if "." in step else 0,
+        "baseAssetPrecision": 8,
+        "quotePrecision":    8,
+        "underlyingType":    "COIN",
+        "underlyingSubType": [],
+        "triggerProtect":    "0.0500",
+        "liquidationFee":    "0.012500",
+        "marketTakeBound":   "0.05",
+        "maxMoveOrderLimit": 10000,
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": tick, "maxPrice": "1000000", "tickSize": tick},
+            {"filterType": "LOT_SIZE", "minQty": step, "maxQty": "10000000", "stepSize": step},
+            {"filterType": "MARKET_LOT_SIZE", "minQty": step, "maxQty": "1000000", "stepSize": step},
+            {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+            {"filterType": "MAX_NUM_ALGO_ORDERS", "limit": 10},
+            {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            {"filterType": "PERCENT_PRICE", "multiplierUp": "1.0500",
+             "multiplierDown": "0.9500", "multiplierDecimal": "4"},
+        ],
+        "orderTypes":  ["LIMIT", "MARKET", "STOP", "STOP_MARKET", "TAKE_PROFIT",
+                        "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET"],
+        "timeInForce": ["GTC", "IOC", "FOK", "GTX", "GTD"],
+    }
+
+
+def exchange_info(n_symbols: int = EXCHANGE_INFO_SYMBOLS, seed: int = 7) -> dict:
+    """futures_exchange_info 응답 모양의 고정 픽스처 (seed 가 같으면 항상 같은 내용)"""
+    rng = random.Random(seed)
+    symbols = ["BTCUSDT", "ETHUSDT"] + [f"C{i:03d}USDT" for i in range(n_symbols - 2)]
+    return {
+        "timezone":   "UTC",
+        "serverTime": 1700000000000,
+        "rateLimits": [],
+        "assets":     [],
+        "symbols":    [_symbol_info(s, rng) for s in symbols],
+    }
+
+
+def middle_symbol(info: dict) -> str:
+    """순차 탐색 비교용: 목록 가운데 심볼"""
+    return info["symbols"][len(info["symbols"]) // 2]["symbol"]
+
+
+def account_balance() -> list[dict]:
+    """futures_account_balance 응답 모양 (USDT 가 목록 끝)"""
+    return [
+        {"accountAlias": "SgsR", "asset": a, "balance": "1234.56789", "crossWalletBalance": "1234.56789",
+         "crossUnPnl": "0.0", "availableBalance": "1234.56789", "maxWithdrawAmount": "1234.56789",
+         "marginAvailable": True, "updateTime": 1700000000000}
+        for a in BALANCE_ASSETS
+    ]
+
+
+def position_information(info: dict, positions: dict[str, dict]) -> list[dict]:
+    """
+    futures_position_information 응답 모양: 바이낸스처럼 모든 심볼이 나오고
+    positions({symbol: {side, entry_price, qty}}) 에 있는 심볼만 수량이 있음
+    """
+    rows = []
+    for s in info["symbols"]:
+        pos = positions.get(s["symbol"])
+        amt = (pos["qty"] if pos["side"] == "LONG" else -pos["qty"]) if pos else 0.0
+        rows.append({
+            "symbol": s["symbol"], "positionAmt": f"{amt:.3f}",
+            "entryPrice": f"{pos['entry_price'] if pos else 0.0}", "markPrice": "0.0",
+            "unRealizedProfit": "0.0", "liquidationPrice": "0", "leverage": "10",
+            "marginType": "cross", "isolatedMargin": "0.0", "positionSide": "BOTH",
+            "updateTime": 1700000000000,
+        })
+    return rows
+
+
+def open_orders(positions: dict[str, dict]) -> list[dict]:
+    """futures_get_open_orders 응답 모양: 포지션마다 reduceOnly TP 두 개 + SL 하나"""
+    orders, oid = [], 1000
+    for symbol, pos in positions.items():
+        close_side = "SELL" if pos["side"] == "LONG" else "BUY"
+        for otype in ("TAKE_PROFIT_MARKET", "TAKE_PROFIT_MARKET", "STOP_MARKET"):
+            oid += 1
+            orders.append({
+                "orderId": oid, "symbol": symbol, "status": "NEW", "clientOrderId": f"bench_{oid}",
+                "type": otype, "origType": otype, "side": close_side, "reduceOnly": True,
+                "closePosition": False, "origQty": f"{pos['qty']:.3f}", "stopPrice": "1.0",
+            })
+    return orders
+
+
+class FixtureClient:
+    """벤치마크용 최소 Client (거래소 정보/잔고/포지션/미체결 주문을 픽스처로 응답)"""
+
+    def __init__(self, info: dict | None = None, balances: list[dict] | None = None,
+                 positions: list[dict] | None = None, orders: list[dict] | None = None):
+        self._info      = info
+        self._balances  = balances or []
+        self._positions = positions or []
+        self._orders    = orders or []
+
+    def futures_exchange_info(self) -> dict:
+        return self._info
+
+    def futures_account_balance(self, **_) -> list[dict]:
+        return self._balances
+
+    def futures_position_information(self, **_) -> list[dict]:
+        return self._positions
+
+    def futures_get_open_orders(self, **_) -> list[dict]:
+        return self._orders
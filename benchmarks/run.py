@@ -0,0 +1,147 @@
+# benchmarks/run.py
+"""
+마이크로 벤치마크 실행/비교.
+
+    python -m benchmarks.run                  # 측정 후 baseline.json 과 비교
+    python -m benchmarks.run --save           # 측정 결과를 기준값으로 저장
+    python -m benchmarks.run -k exchange_info # 이름에 포함된 단위만
+    python -m benchmarks.run --threshold 0.3  # 30% 이상 느려지면 회귀로 표시
+
+회귀가 하나라도 있으면 종료 코드 1. 절대 시간은 머신마다 다르므로 기준값과 비교는
+같은 라운드에서 번갈아 잰 보정 작업(CALIBRATION) 대비 배수로 합니다. 머신이 바뀌어도
+배수는 크게 변하지 않지만, 파이썬 버전이 다르면 경고를 출력합니다 (필요하면 --save 로 다시 만들 것).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from benchmarks.units import UNITS
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+CALIBRATION = "_calibration"
+
+
+def _calibration():
+    """인터프리터 속도 기준: 정수/실수 연산, dict 쓰기, 문자열 포맷이 섞인 고정 작업"""
+    def run():
+        acc, d = 0.0, {}
+        for i in range(64):
+            acc += i * 1.0001 / 3.7
+            d[i & 15] = f"{acc:.4f}"
+        return len(d)
+    return run, None
+
+
+def _environment() -> dict:
+    return {
+        "python":  platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor() or ''}".strip(),
+    }
+
+
+def measure(names: list[str], rounds: int = 5, repeat: int = 5, budget: float = 0.05) -> dict[str, float]:
+    """
+    단위별 1 op 당 시간(ns). 한 번의 측정이 budget 초 안팎이 되도록 반복 횟수를 정하고,
+    전체 단위를 rounds 번 번갈아 돌려 (머신 부하 변동이 한 단위에만 몰리지 않도록) 최솟값을 씁니다.
+    보정 작업도 같은 라운드 안에서 재며 결과의 CALIBRATION 키로 들어갑니다.
+    """
+    timers, teardowns = {}, []
+    factories = {CALIBRATION: _calibration, **{name: UNITS[name] for name in names}}
+    try:
+        for name, factory in factories.items():
+            fn, teardown = factory()
+            if teardown:
+                teardowns.append(teardown)
+            timer = timeit.Timer(fn)
+            number, elapsed = timer.autorange()
+            timers[name] = (timer, max(1, int(number * budget / max(elapsed, 1e-9))))
+
+        best = {}
+        for _ in range(rounds):
+            for name, (timer, number) in timers.items():
+                ns = min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+                best[name] = min(ns, best.get(name, ns))
+        return best
+    finally:
+        for teardown in teardowns:
+            teardown()
+
+
+def normalize(results: dict[str, float]) -> dict[str, float]:
+    """ns/op → 보정 작업 대비 배수"""
+    calibration = results[CALIBRATION]
+    return {name: ns / calibration for name, ns in results.items() if name != CALIBRATION}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """results 는 measure() 결과(ns), baseline 은 저장된 배수"""
+    regressions = []
+    ratios = normalize(results)
+    print(f"calibration: {results[CALIBRATION]:,.1f} ns/op")
+    print(f"{'unit':32} {'ns/op':>14} {'× calib':>10} {'baseline':>10} {'change':>9}")
+    for name, ratio in ratios.items():
+        ns, base = results[name], baseline.get(name)
+        if base:
+            change = ratio / base - 1
+            flag = "  REGRESSION" if change > threshold else ""
+            print(f"{name:32} {ns:14,.1f} {ratio:10,.3f} {base:10,.3f} {change:+8.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:32} {ns:14,.1f} {ratio:10,.3f} {'-':>10} {'new':>9}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문 경로 CPU 작업 마이크로 벤치마크")
+    parser.add_argument("-k", dest="pattern", default="", help="이름에 이 문자열이 들어간 단위만")
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀 판정 비율 (기본 0.25 = 25%%)")
+    parser.add_argument("--rounds", type=int, default=5, help="전체 단위를 번갈아 도는 횟수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = [n for n in UNITS if args.pattern in n]
+    results = measure(names, args.rounds, args.repeat)
+
+    saved = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fp:
+            saved = json.load(fp)
+        if saved.get("unit") != "ratio":
+            print("warning: baseline holds absolute ns from an older format, "
+                  "ignoring it (re-record with --save)", file=sys.stderr)
+            saved = {}
+        elif saved.get("environment", {}).get("python") != _environment()["python"]:
+            print(f"warning: baseline was recorded on {saved.get('environment')}, "
+                  f"this is {_environment()}", file=sys.stderr)
+
+    regressions = compare(results, saved.get("results", {}), args.threshold)
+
+    if args.save:
+        merged = {**saved.get("results", {}), **normalize(results)}
+        merged = {k: v for k, v in merged.items() if k in UNITS}
+        with open(args.baseline, "w") as fp:
+            json.dump({
+                "environment": _environment(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "unit":        "ratio",
+                "calibration_ns": round(results[CALIBRATION], 1),
+                "results":     {k: round(v, 4) for k, v in sorted(merged.items())},
+            }, fp, indent=2)
+            fp.write("\n")
+        print(f"saved {len(results)} result(s) to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# benchmarks/units.py
+"""
+주문 경로의 CPU 작업을 I/O 없이 호출할 수 있는 단위로 분리한 벤치마크 목록.
+각 단위는 (실행 함수, 정리 함수 | None) 을 만드는 팩토리이며,
+실행 함수 한 번 호출이 측정 단위 1 op 입니다.
+"""
+
+import math
+import os
+import random
+from contextlib import ExitStack
+from app.clients.exchange import BinanceAdapter
+from app.clients.venues import BINANCE
+from app.routers.dashboard import render_dashboard
+from app.services import filters, monitor, reconcile, replay
+from app.services.history import lttb, minmax
+from app.state import SharedState, DEFAULT_STATE, monitor_state
+from app.store import LocalStore, SharedMemoryStore
+from benchmarks import fixtures
+
+UNITS = {}
+
+
+def unit(name: str):
+    def _register(factory):
+        UNITS[name] = factory
+        return factory
+    return _register
+
+
+# ── 수량/가격 라운딩 (execute_buy / execute_sell) ─────────
+@unit("rounding.precision_log10")
+def _precision_log10():
+    steps = [0.1, 0.01, 0.001, 0.0001]
+
+    def run():
+        for step in steps:
+            int(round(-math.log10(step), 0))
+    return run, None
+
+
+@unit("rounding.order_sizing")
+def _order_sizing():
+    """잔고/마크가격 → 진입 수량, 체결 결과 → 롱·숏 브래킷 (execute_buy / execute_sell 이 부르는 함수)"""
+    f = {"step_size": 0.001, "min_qty": 0.001, "qty_precision": 3, "price_precision": 2}
+    balance, mark, leverage = 1234.56789, 3456.78, 10
+
+    def run():
+        qty = filters.entry_qty(balance, mark, leverage, f["step_size"])
+        filters.bracket_plan("LONG", mark * 1.0002, qty, f)
+        filters.bracket_plan("SHORT", mark * 0.9998, qty, f)
+    return run, None
+
+
+# ── 거래소 정보 / 잔고 탐색 ──────────────────────────────
+@unit("exchange_info.scan_next")
+def _scan_next():
+    """이전 방식: 주문마다 전체 목록을 next() 로 순차 탐색 (가운데 심볼)"""
+    info = fixtures.exchange_info()
+    symbol = fixtures.middle_symbol(info)
+
+    def run():
+        sym_info = next(s for s in info["symbols"] if s["symbol"] == symbol)
+        lot   = next(f for f in sym_info["filters"] if f["filterType"] == "LOT_SIZE")
+        price = next(f for f in sym_info["filters"] if f["filterType"] == "PRICE_FILTER")
+        return (float(lot["stepSize"]), float(lot["minQty"]), float(price["tickSize"]),
+                int(round(-math.log10(float(lot["stepSize"])), 0)),
+                int(round(-math.log10(float(price["tickSize"])), 0)))
+    return run, None
+
+
+@unit("exchange_info.build_index")
+def _build_index():
+    """캐시 갱신 시 한 번: 전체 거래소 정보 → 심볼별 필터 색인"""
+    info = fixtures.exchange_info()
+
+    def run():
+        filters._index_exchange_info(info)
+    return run, None
+
+
+@unit("exchange_info.cached_lookup")
+def _cached_lookup():
+    """현재 방식: 캐시된 색인에서 심볼 필터 조회"""
+    info = fixtures.exchange_info()
+    client = fixtures.FixtureClient(info)
+    symbol = fixtures.middle_symbol(info)
+    filters.get_symbol_filters(client, symbol)
+
+    def run():
+        filters.get_symbol_filters(client, symbol)
+    return run, None
+
+
+@unit("balances.adapter_balance")
+def _adapter_balance():
+    """execute_buy / execute_sell 의 잔고 조회 (BinanceAdapter.balance, 응답 처리만)"""
+    ex = BinanceAdapter(fixtures.FixtureClient(balances=fixtures.account_balance()))
+
+    def run():
+        ex.balance("USDT")
+    return run, None
+
+
+# ── 가격 틱 처리 (_poll_price_loop) / 정합성 점검 (_reconcile_loop) ──
+def _positions(n: int, seed: int = 11) -> dict[str, dict]:
+    rng = random.Random(seed)
+    return {
+        f"C{i:03d}USDT": {"side": rng.choice(("LONG", "SHORT")), "entry_price": round(rng.uniform(1, 1000), 4),
+                          "qty": round(rng.uniform(1, 100), 3), "first_tp_done": False, "second_tp_done": False,
+                          "entry_time": "2025-01-01 09:00:00", "venue": BINANCE}
+        for i in range(n)
+    }
+
+
+_monitor = {"users": 0, "close": None, "positions": None}
+
+
+def _monitor_positions(n: int = 50):
+    """
+    ticks.* / reconcile.* 가 함께 쓰는 모니터 상태: 재생과 같은 격리(replay._isolated) 안에서
+    포지션 n 개를 등록하고 _sync_positions() 로 트리거를 겁니다. 모든 단위가 정리하면 원래대로.
+    """
+    if _monitor["users"] == 0:
+        stack = ExitStack()
+        stack.enter_context(replay._isolated())
+        positions = _positions(n)
+        monitor_state.update({"positions": positions, "positions_version": 1})
+        monitor._sync_positions()
+        _monitor.update(close=stack.close, positions=positions)
+    _monitor["users"] += 1
+
+    def release():
+        _monitor["users"] -= 1
+        if _monitor["users"] == 0:
+            reconcile._last_fingerprint = None
+            reconcile._suspects.clear()
+            _monitor["close"]()
+    return _monitor["positions"], release
+
+
+@unit("ticks.on_prices_50")
+def _on_prices():
+    """모니터의 틱 처리 전체 (monitor._on_prices: 차트 기록 + 트리거), 아무것도 넘지 않는 틱"""
+    positions, release = _monitor_positions(50)
+    prices = {s: p["entry_price"] * 1.001 for s, p in positions.items()}
+
+    def run():
+        monitor._on_prices(None, prices)
+    return run, release
+
+
+@unit("ticks.trigger_engine_50")
+def _trigger_engine():
+    """그중 트리거 부분: monitor._arm 이 건 트리거에 대한 _engine.on_prices"""
+    positions, release = _monitor_positions(50)
+    prices = {s: p["entry_price"] * 1.001 for s, p in positions.items()}
+
+    def run():
+        monitor._engine.on_prices(prices)
+    return run, release
+
+
+@unit("reconcile.steady_50")
+def _reconcile_steady():
+    """
+    정합성 점검 한 주기 (reconcile_once), 거래소와 로컬이 일치하는 평상시:
+    포지션 정보(전체 심볼) + 미체결 주문을 모아 지문을 비교하고 끝남
+    """
+    positions, release = _monitor_positions(50)
+    info = fixtures.exchange_info()
+    client = fixtures.FixtureClient(
+        info,
+        positions=fixtures.position_information(info, positions),
+        orders=fixtures.open_orders(positions),
+    )
+    if reconcile.reconcile_once(client) or reconcile._last_fingerprint is None:
+        release()
+        raise RuntimeError("reconcile fixture is not in a steady state")
+
+    def run():
+        reconcile.reconcile_once(client)
+    return run, release
+
+
+# ── 공유 상태 갱신 ───────────────────────────────────────
+@unit("state.update_local")
+def _update_local():
+    state = SharedState(LocalStore(), DEFAULT_STATE)
+
+    def run():
+        state.update({"current_price": 3456.78, "pnl": 0.12})
+    return run, None
+
+
+@unit("state.incr_local")
+def _incr_local():
+    state = SharedState(LocalStore(), DEFAULT_STATE)
+
+    def run():
+        state.incr("daily_pnl", 0.1)
+    return run, None
+
+
+@unit("state.update_shm")
+def _update_shm():
+    store = SharedMemoryStore(name=f"tvbot_bench_{os.getpid()}", size=1 << 20)
+    state = SharedState(store, DEFAULT_STATE)
+    state.update({"positions": _positions(20)})
+
+    def run():
+        state.update({"current_price": 3456.78, "pnl": 0.12})
+    return run, store.unlink
+
+
+@unit("state.snapshot_shm")
+def _snapshot_shm():
+    store = SharedMemoryStore(name=f"tvbot_bench_snap_{os.getpid()}", size=1 << 20)
+    state = SharedState(store, DEFAULT_STATE)
+    state.update({"positions": _positions(20)})
+
+    def run():
+        state.snapshot()
+    return run, store.unlink
+
+
+# ── 대시보드 / 차트 ─────────────────────────────────────
+@unit("dashboard.render")
+def _dashboard_render():
+    data = {**DEFAULT_STATE, "entry_price": 3456.78, "position_qty": 1.234, "pnl": 0.42,
+            "entry_time": "2025-01-01 09:00:00", "first_tp_done": True, "first_tp_price": 3474.06}
+
+    def run():
+        render_dashboard(data)
+    return run, None
+
+
+def _series(n: int, seed: int = 5) -> tuple[list[float], list[float]]:
+    rng = random.Random(seed)
+    price, ys = 3000.0, []
+    for _ in range(n):
+        price += rng.gauss(0, 1.5)
+        ys.append(price)
+    return [float(i) for i in range(n)], ys
+
+
+@unit("chart.lttb_86400_500")
+def _chart_lttb():
+    xs, ys = _series(86400)
+
+    def run():
+        lttb(xs, ys, 500)
+    return run, None
+
+
+@unit("chart.minmax_86400_500")
+def _chart_minmax():
+    _, ys = _series(86400)
+
+    def run():
+        minmax(ys, 500)
+    return run, None
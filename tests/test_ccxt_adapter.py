@@ -0,0 +1,103 @@
+# tests/test_ccxt_adapter.py
+"""CcxtAdapter 의 심볼 매핑과 계약 수 ↔ 기초자산 수량 변환 (네트워크 없이 가짜 ccxt 거래소로)"""
+
+import ccxt
+import pytest
+from app.clients.ccxt_adapter import CcxtAdapter
+
+
+def _market(symbol, id_, base, quote, settle, contract_size, swap=True, linear=True):
+    return {
+        "symbol": symbol, "id": id_, "base": base, "quote": quote, "settle": settle,
+        "swap": swap, "linear": linear, "active": True, "contractSize": contract_size,
+        "precision": {"amount": 1.0, "price": 0.01},
+        "limits": {"amount": {"min": 1.0}},
+    }
+
+
+class FakeExchange:
+    """OKX 처럼 고유 id 가 ETH-USDT-SWAP 이고 1계약 = 0.1 ETH 인 거래소"""
+
+    precisionMode = ccxt.TICK_SIZE
+
+    def __init__(self, config):
+        self.config = config
+        self.created = []
+        self.positions = []
+        self.fail_next_create = None
+
+    def load_markets(self):
+        return {
+            "ETH/USDT":      _market("ETH/USDT", "ETH-USDT", "ETH", "USDT", None, None, swap=False, linear=None),
+            "ETH/USDT:USDT": _market("ETH/USDT:USDT", "ETH-USDT-SWAP", "ETH", "USDT", "USDT", 0.1),
+            "ETH/USD:ETH":   _market("ETH/USD:ETH", "ETH-USD-SWAP", "ETH", "USD", "ETH", 10, linear=False),
+            "BTC/USDT:USDT": _market("BTC/USDT:USDT", "BTC-USDT-SWAP", "BTC", "USDT", "USDT", 0.01),
+        }
+
+    def create_order(self, symbol, type_, side, amount, price=None, params=None):
+        order = {
+            "id": str(len(self.created) + 1), "symbol": symbol, "type": type_, "side": side,
+            "status": "closed", "amount": amount, "filled": amount, "average": 3000.0,
+            "clientOrderId": (params or {}).get("clientOrderId"), "reduceOnly": (params or {}).get("reduceOnly"),
+        }
+        self.created.append(order)
+        if self.fail_next_create:
+            error, self.fail_next_create = self.fail_next_create, None
+            raise error
+        return order
+
+    def fetch_order(self, order_id, symbol, params=None):
+        cid = (params or {}).get("clientOrderId")
+        for o in self.created:
+            if o["id"] == order_id or (cid and o["clientOrderId"] == cid):
+                return o
+        raise ccxt.OrderNotFound(order_id or cid)
+
+    def fetch_positions(self, symbols):
+        return self.positions
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setattr(ccxt, "fakeswap", FakeExchange, raising=False)
+    return CcxtAdapter("fakeswap")
+
+
+def test_markets_keyed_by_base_and_quote(adapter):
+    assert adapter.has_symbol("ETHUSDT")
+    assert adapter._unified("ETHUSDT") == "ETH/USDT:USDT"     # 현물·인버스가 아닌 USDT 무기한
+    assert adapter._unified("BTCUSDT") == "BTC/USDT:USDT"
+    assert not adapter.has_symbol("ETH-USDT-SWAP")            # 거래소 고유 id 로는 찾지 않음
+    assert not adapter.has_symbol("ETHUSD")                   # 인버스 제외
+
+
+def test_symbol_filters_in_base_units(adapter):
+    f = adapter.symbol_filters("ETHUSDT")
+    assert f["step_size"] == pytest.approx(0.1)
+    assert f["min_qty"] == pytest.approx(0.1)
+    assert f["qty_precision"] == 1
+    assert f["price_precision"] == 2
+
+
+def test_orders_sent_in_contracts_and_reported_in_base(adapter):
+    order = adapter.market_order("ETHUSDT", "BUY", 1.25, client_id="k-e1")
+    sent = adapter.exchange.created[-1]
+    assert sent["amount"] == 12                               # 1.25 ETH → 12.5 계약 → 내림
+    assert sent["clientOrderId"] == "k-e1"
+    assert order["qty"] == pytest.approx(1.2)
+    assert order["executed_qty"] == pytest.approx(1.2)
+    assert order["status"] == "FILLED"
+
+
+def test_position_amt_in_base_units(adapter):
+    adapter.exchange.positions = [{"symbol": "ETH/USDT:USDT", "contracts": 163.0, "side": "short"}]
+    assert adapter.position_amt("ETHUSDT") == pytest.approx(-16.3)
+    adapter.exchange.positions = [{"symbol": "ETH/USDT:USDT", "contracts": 5.0, "side": "long"}]
+    assert adapter.position_amt("ETHUSDT") == pytest.approx(0.5)
+
+
+def test_ambiguous_failure_recovers_without_resubmitting(adapter):
+    adapter.exchange.fail_next_create = ccxt.RequestTimeout("response lost")
+    order = adapter.market_order("ETHUSDT", "SELL", 0.5, client_id="k-e2")
+    assert len(adapter.exchange.created) == 1
+    assert order["executed_qty"] == pytest.approx(0.5)
@@ -0,0 +1,53 @@
+# tests/test_venues.py
+"""VenueRouter.pick: 포지션 보유 거래소 우선, 건강/상장 여부, 지연 기준 선택"""
+
+import time
+from app.clients.exchange import ExchangeAdapter
+from app.clients.hedged import _MIN_SAMPLES
+from app.clients.venues import VenueRouter
+from app.config import VENUE_MAX_ERRORS
+
+
+class FakeVenue(ExchangeAdapter):
+    def __init__(self, name, symbols=("ETHUSDT",), latency=None):
+        super().__init__()
+        self.name = name
+        self.symbols = set(symbols)
+        if latency is not None:
+            for _ in range(_MIN_SAMPLES):
+                self.stats.observe(latency, ok=True)
+
+    def has_symbol(self, symbol):
+        return symbol in self.symbols
+
+
+def test_single_venue_is_always_primary():
+    only = FakeVenue("binance", symbols=())
+    assert VenueRouter([only]).pick("ETHUSDT") is only
+
+
+def test_holder_wins_over_latency():
+    slow, fast = FakeVenue("binance", latency=0.5), FakeVenue("okx", latency=0.01)
+    router = VenueRouter([slow, fast])
+    assert router.pick("ETHUSDT", holder="binance") is slow
+    assert router.pick("ETHUSDT") is fast
+
+
+def test_skips_unlisted_and_unhealthy_venues():
+    primary = FakeVenue("binance", latency=0.5)
+    unlisted = FakeVenue("okx", symbols=("BTCUSDT",), latency=0.01)
+    failing = FakeVenue("bybit", latency=0.01)
+    failing.consecutive_errors = VENUE_MAX_ERRORS
+    failing.last_error_at = time.time()
+    router = VenueRouter([primary, unlisted, failing])
+    assert router.pick("ETHUSDT") is primary
+
+
+def test_falls_back_to_primary_when_nobody_lists_symbol():
+    primary, other = FakeVenue("binance"), FakeVenue("okx")
+    assert VenueRouter([primary, other]).pick("DOGEUSDT") is primary
+
+
+def test_unmeasured_venues_keep_configured_order():
+    first, second = FakeVenue("binance"), FakeVenue("okx")
+    assert VenueRouter([first, second]).pick("ETHUSDT") is first